@@ -0,0 +1,9 @@
+# synthDrivers/_deltatalk/__init__.py
+# Support modules for the DeltaTalk synthesizer driver
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+# The leading underscore keeps NVDA from listing this package as a synthesizer.
+# Modules in here must not import NVDA, so that they can be used by the benchmarks on any platform.
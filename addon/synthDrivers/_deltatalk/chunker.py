@@ -0,0 +1,96 @@
+# synthDrivers/_deltatalk/chunker.py
+# Splits text into synthesis chunks at sentence, clause and word boundaries
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import re
+from collections import namedtuple
+
+# Maximum length of the first chunk of a text, kept small so that audio starts quickly
+FIRST_CHUNK_SIZE = 60
+# Maximum length of the following chunks, large enough to amortize each NEW_MULTI_BLOCK setup
+CHUNK_SIZE = 400
+# The same in ms of speech, for chunks measured with a duration model: about CHUNK_SIZE at the default rate
+CHUNK_MS = 25000
+# A word longer than this is split anyway
+HARD_LIMIT_FACTOR = 2
+
+# Portuguese abbreviations whose period does not end a sentence (lowercase, without the period)
+ABBREVIATIONS = frozenset({
+	"a.c", "al", "apto", "arq", "art", "av", "aprox", "cap", "cel", "cia", "cf", "d", "d.c", "dep", "dr", "dra",
+	"dras", "drs", "ed", "eng", "ex", "exa", "exma", "exmo", "fig", "gal", "gen", "ilma", "ilmo", "jr", "lt",
+	"ltda", "máx", "mín", "n", "nº", "obs", "p", "pág", "págs", "pe", "pp", "pres", "prof", "profa", "profs",
+	"r", "rev", "séc", "sr", "sra", "sras", "srs", "srta", "sta", "sto", "tel", "ten", "v", "vol", "vs",
+})
+
+_BOUNDARY = re.compile(
+	r"(?P<sentence>[.!?…]+[\"'”»)\]]*)(?=\s)"
+	r"|(?P<clause>[,;:)\]—–]+)(?=\s)"
+	r"|(?P<space>\s+)"
+)
+# The word right before a period, including inner periods as in "a.C."
+_LAST_WORD = re.compile(r"([\w.]+)\.+$")
+_WHITESPACE = re.compile(r"\s")
+
+Chunk = namedtuple("Chunk", ("text", "index"))
+Chunk.__doc__ = """A piece of text to synthesize, with the index of the IndexCommand it starts at (or None)."""
+
+
+def _is_abbreviation(text, end):
+	"""Checks whether the period ending at text[end - 1] belongs to an abbreviation or an initial."""
+	match = _LAST_WORD.search(text, max(0, end - 12), end)
+	if not match:
+		return False
+	word = match.group(1)
+	# Initials such as "J. Silva"
+	if len(word) == 1 and word.isupper():
+		return True
+	return word.lower() in ABBREVIATIONS
+
+
+def _split_point(text, start, limit):
+	"""Finds where to end a chunk starting at start, preferring sentences, then clauses, then words."""
+	best = {"sentence": None, "clause": None, "space": None}
+	minimum = start + (limit - start) // 3
+	for match in _BOUNDARY.finditer(text, start, limit):
+		kind = match.lastgroup
+		end = match.end()
+		if kind == "sentence" and text[end - 1] == "." and _is_abbreviation(text, end):
+			kind = "space"
+		if kind != "space" and end < minimum:
+			kind = "space"
+		best[kind] = end
+	for kind in ("sentence", "clause", "space"):
+		if best[kind] is not None:
+			return best[kind]
+	# A single word longer than the chunk: end at the next whitespace, within reason
+	match = _WHITESPACE.search(text, limit, start + (limit - start) * HARD_LIMIT_FACTOR)
+	return match.end() if match else min(len(text), start + (limit - start) * HARD_LIMIT_FACTOR)
+
+
+def chunk_text(text, index=None, first_size=FIRST_CHUNK_SIZE, size=CHUNK_SIZE, reach=None):
+	"""Yields the Chunks of text, lazily.
+
+	The first chunk is at most first_size characters long and the next ones at most size,
+	ending on the last sentence boundary in range, else on a clause boundary, else between words.
+	With reach, the next ones end at most at reach(text, start) instead, such as where some
+	duration of speech from start is estimated to end.
+	The index the text starts at is carried by the first chunk.
+	"""
+	start = 0
+	length = len(text)
+	limit = first_size
+	while start < length:
+		stop = start + limit if reach is None or start == 0 else reach(text, start)
+		if stop >= length:
+			end = length
+		else:
+			end = _split_point(text, start, stop)
+		piece = text[start:end].strip()
+		if piece:
+			yield Chunk(piece, index)
+			index = None
+		start = end
+		limit = size
@@ -0,0 +1,284 @@
+# synthDrivers/_deltatalk/dictionary.py
+# User dictionary rewriting the text before synthesis, with an Aho-Corasick automaton
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""User dictionary.
+
+The file is UTF-8 text with one entry per line: the text to replace, a tab, what the engine should
+read instead and, optionally, a tab and options; lines starting with # are comments. Options are
+letters: c matches the case exactly, p also matches inside words. By default entries match whole
+words in any case, and a replacement starts with a capital where the text replaced did.
+
+All entries are compiled into one Aho-Corasick automaton, so rewriting a text takes a single pass
+over it, however many entries there are. Where entries overlap, the one starting first wins, then
+the longest.
+"""
+
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+DictionaryEntry = namedtuple("DictionaryEntry", ("pattern", "replacement", "match_case", "whole_word"))
+
+# How often the file is checked for changes, in seconds
+CHECK_INTERVAL = 1.0
+
+
+class DictionaryError(Exception):
+	"""Raised for a dictionary file that cannot be read."""
+
+
+class Automaton:
+	"""Aho-Corasick automaton finding every occurrence of a set of keys in one pass over a text."""
+
+	def __init__(self, keys):
+		self._goto = [{}]
+		self._fail = [0]
+		self._out = [()]  # Lengths of the keys ending at each state
+		for key in keys:
+			state = 0
+			for char in key:
+				next_state = self._goto[state].get(char)
+				if next_state is None:
+					next_state = len(self._goto)
+					self._goto[state][char] = next_state
+					self._goto.append({})
+					self._fail.append(0)
+					self._out.append(())
+				state = next_state
+			if key and len(key) not in self._out[state]:
+				self._out[state] += (len(key),)
+		# Breadth first, so the failure state of a state is complete before its children need it
+		queue = deque(self._goto[0].values())
+		while queue:
+			state = queue.popleft()
+			for char, next_state in self._goto[state].items():
+				queue.append(next_state)
+				fail = self._fail[state]
+				while fail and char not in self._goto[fail]:
+					fail = self._fail[fail]
+				fail = self._goto[fail].get(char, 0)
+				self._fail[next_state] = fail
+				self._out[next_state] += self._out[fail]
+
+	@property
+	def states(self):
+		return len(self._goto)
+
+	def find(self, text):
+		"""Yields (start, end) for every occurrence of a key in text, ordered by end."""
+		goto = self._goto
+		fail = self._fail
+		out = self._out
+		state = 0
+		for position, char in enumerate(text):
+			while state and char not in goto[state]:
+				state = fail[state]
+			state = goto[state].get(char, 0)
+			if out[state]:
+				end = position + 1
+				for length in out[state]:
+					yield end - length, end
+
+
+def _is_word_char(text, position):
+	if position < 0 or position >= len(text):
+		return False
+	char = text[position]
+	return char.isalnum() or char == "_"
+
+
+def _lower(text):
+	"""Returns text in lower case, with every character where it was."""
+	lowered = text.lower()
+	if len(lowered) == len(text):
+		return lowered
+	# A few characters, such as the dotted capital I, lower to two
+	return "".join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+
+class UserDictionary:
+	"""The entries of a user dictionary, compiled for rewriting text."""
+
+	def __init__(self, entries=(), automaton=None):
+		self.entries = list(entries)
+		self._entries = {}  # Key in lower case: its entries, those matching the case first
+		for entry in self.entries:
+			self._entries.setdefault(entry.pattern.lower(), []).append(entry)
+		for candidates in self._entries.values():
+			candidates.sort(key=lambda entry: not entry.match_case)
+		self.automaton = automaton or Automaton(self._entries)
+
+	@classmethod
+	def read(cls, path, previous=None):
+		"""Reads the dictionary file at path.
+
+		If previous has the same keys, its automaton is reused, so changing replacements or options is cheap.
+		@raise DictionaryError: for a line without a tab.
+		@raise OSError, UnicodeDecodeError: if the file cannot be read.
+		"""
+		entries = []
+		with open(path, encoding="utf-8-sig") as f:
+			for number, line in enumerate(f, 1):
+				line = line.rstrip("\r\n")
+				if not line.strip() or line.startswith("#"):
+					continue
+				fields = line.split("\t")
+				if len(fields) < 2 or not fields[0]:
+					raise DictionaryError(f"Line {number}: expected the text to replace, a tab and its replacement")
+				options = fields[2] if len(fields) > 2 else ""
+				entries.append(DictionaryEntry(fields[0], fields[1], "c" in options, "p" not in options))
+		automaton = None
+		if previous is not None and {entry.pattern.lower() for entry in entries} == set(previous._entries):
+			automaton = previous.automaton
+		return cls(entries, automaton)
+
+	def __len__(self):
+		return len(self.entries)
+
+	def _entry_at(self, text, start, end):
+		"""Returns the entry matching text[start:end] there, or None."""
+		for entry in self._entries.get(_lower(text[start:end]), ()):
+			if entry.match_case and text[start:end] != entry.pattern:
+				continue
+			if entry.whole_word and (_is_word_char(text, start - 1) or _is_word_char(text, end)):
+				continue
+			return entry
+		return None
+
+	def rewrite(self, text):
+		"""Returns text with the entries replaced, and the number of replacements."""
+		if not self.entries:
+			return text, 0
+		matches = []
+		for start, end in self.automaton.find(_lower(text)):
+			entry = self._entry_at(text, start, end)
+			if entry:
+				matches.append((start, start - end, entry))
+		if not matches:
+			return text, 0
+		matches.sort(key=lambda match: match[:2])
+		pieces = []
+		position = 0
+		count = 0
+		for start, negative_length, entry in matches:
+			if start < position:
+				continue
+			pieces.append(text[position:start])
+			replacement = entry.replacement
+			if not entry.match_case and text[start].isupper():
+				replacement = replacement[:1].upper() + replacement[1:]
+			pieces.append(replacement)
+			position = start - negative_length
+			count += 1
+		pieces.append(text[position:])
+		return "".join(pieces), count
+
+
+class RewriteTiming:
+	"""Time spent rewriting utterances."""
+
+	def __init__(self):
+		self.utterances = 0
+		self.replacements = 0
+		self.total = 0.0
+		self.max = 0.0
+		self.last = 0.0
+
+	def add(self, seconds, replacements):
+		self.utterances += 1
+		self.replacements += replacements
+		self.total += seconds
+		self.max = max(self.max, seconds)
+		self.last = seconds
+
+	def as_dict(self):
+		return {
+			"utterances": self.utterances,
+			"replacements": self.replacements,
+			"mean_us": self.total / self.utterances * 1e6 if self.utterances else 0.0,
+			"max_us": self.max * 1e6,
+		}
+
+
+def _stamp(path):
+	try:
+		stat = os.stat(path)
+	except OSError:
+		return None
+	return stat.st_mtime_ns, stat.st_size
+
+
+class DictionaryFile:
+	"""A user dictionary file, reloaded in the background when it changes.
+
+	current checks the file at most every check_interval seconds, and keeps returning the
+	dictionary loaded before until the new one is ready. on_reload(dictionary, error) is called
+	from the loading thread after each load; a file that cannot be read leaves the previous
+	dictionary in place, and a missing one empties it.
+	"""
+
+	def __init__(self, path, check_interval=CHECK_INTERVAL, on_reload=None, clock=time.monotonic):
+		self.path = path
+		self.check_interval = check_interval
+		self.dictionary = UserDictionary()
+		self.reloads = 0
+		self.timing = RewriteTiming()
+		self._on_reload = on_reload
+		self._clock = clock
+		self._stamp = None
+		self._next_check = 0.0
+		self._lock = threading.Lock()
+		self._loading = False
+		self.current(wait=True)
+
+	def current(self, wait=False):
+		"""Returns the dictionary, starting a reload if the file changed. With wait, the reload is done first."""
+		now = self._clock()
+		if now < self._next_check:
+			return self.dictionary
+		self._next_check = now + self.check_interval
+		stamp = _stamp(self.path)
+		with self._lock:
+			if stamp == self._stamp or self._loading:
+				return self.dictionary
+			self._loading = True
+		if wait:
+			self._load(stamp)
+		else:
+			threading.Thread(target=self._load, args=(stamp,), daemon=True).start()
+		return self.dictionary
+
+	def _load(self, stamp):
+		error = None
+		try:
+			if stamp is None:
+				self.dictionary = UserDictionary()
+			else:
+				self.dictionary = UserDictionary.read(self.path, self.dictionary)
+			self.reloads += 1
+		except (OSError, UnicodeDecodeError, DictionaryError) as e:
+			error = e
+		finally:
+			with self._lock:
+				self._stamp = stamp
+				self._loading = False
+		if self._on_reload:
+			self._on_reload(self.dictionary, error)
+
+	def rewrite(self, texts):
+		"""Rewrites the texts of one utterance, recording the time taken. Returns the list of rewritten texts."""
+		dictionary = self.current()
+		start = time.perf_counter()
+		rewritten = []
+		count = 0
+		for text in texts:
+			text, replacements = dictionary.rewrite(text)
+			rewritten.append(text)
+			count += replacements
+		self.timing.add(time.perf_counter() - start, count)
+		return rewritten
@@ -0,0 +1,143 @@
+# synthDrivers/_deltatalk/duration.py
+# Spoken length of texts, estimated from the durations of their phonemes
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Duration model.
+
+The nominal duration of a text adds up the brazil.alp durations of the symbols of its words, as
+phonemes transcribes them, a digit name for each digit of its numbers other than zeros (1000 is
+read mil), and a pause for punctuation ending a clause or a sentence. The engine is taken to speak at the nominal durations at NOMINAL_RATE and faster in
+proportion to its rate, as SimulatedBackend does, and the tempo of the rate boost speeds it up further.
+
+What the audio actually played measures is recorded per rate, and the median ratio of the recent
+measures to the estimates corrects the next estimates at that rate, so the model converges on the
+engine it is used with.
+"""
+
+import re
+import statistics
+import threading
+from collections import deque
+
+from .lexicon import WORD_PATTERN
+from .phonemes import DIGIT_NAMES, PAUSE, PUNCTUATION_PAUSES
+
+NOMINAL_RATE = 10
+# Ratios of played to estimated durations kept per rate, and how many correct the estimates
+HISTORY = 50
+MIN_SAMPLES = 5
+# Corrections stay within this factor of the nominal durations
+MAX_CORRECTION = 4.0
+# Relative errors kept for the error distribution
+ERROR_HISTORY = 500
+# Tokens whose duration is remembered, before they are forgotten all at once
+MAX_TOKENS = 50000
+
+# Words, numbers, and punctuation followed by a space or the end of the text
+_TOKEN = re.compile(WORD_PATTERN.pattern + r"|\d+|[,;:.!?…]+(?=\s|$)")
+
+
+def error_distribution(errors):
+	"""Summarizes relative errors (estimated - actual) / actual as percentages: median, 90th percentile and worst of
+	their absolute values, and their median as the bias."""
+	if not errors:
+		return {"samples": 0, "median_pct": 0.0, "p90_pct": 0.0, "max_pct": 0.0, "bias_pct": 0.0}
+	absolute = sorted(abs(error) for error in errors)
+	return {
+		"samples": len(errors),
+		"median_pct": statistics.median(absolute) * 100,
+		"p90_pct": absolute[min(len(absolute) - 1, int(len(absolute) * 0.9))] * 100,
+		"max_pct": absolute[-1] * 100,
+		"bias_pct": statistics.median(errors) * 100,
+	}
+
+
+class DurationModel:
+	"""Estimates how long the engine takes to speak texts, in ms, without calling it.
+
+	Each word, number and punctuation mark is transcribed once, then its nominal duration is a dict
+	lookup, so estimating a text costs one regular expression pass over it.
+	"""
+
+	def __init__(self, phonetizer):
+		self.phonetizer = phonetizer
+		self._tokens = {}  # Token: its nominal duration
+		pause = phonetizer.alphabet.phonemes.get(PAUSE)
+		self._pause_ms = pause.duration if pause else 0
+		self._digit_ms = statistics.fmean(phonetizer.word(name).duration for name in DIGIT_NAMES)
+		self._lock = threading.Lock()
+		self._ratios = {}  # Rate: recent ratios of played to nominal durations
+		self._corrections = {}  # Rate: the median of its ratios, once there are enough
+		self.errors = deque(maxlen=ERROR_HISTORY)
+
+	def _token_ms(self, token):
+		duration = self._tokens.get(token)
+		if duration is None:
+			if len(self._tokens) >= MAX_TOKENS:
+				self._tokens.clear()
+				self.phonetizer.forget()
+			if token.isdigit():
+				duration = self._digit_ms * max(1, len(token) - token.count("0"))
+			elif not token[0].isalpha():
+				duration = self._pause_ms * max(PUNCTUATION_PAUSES.get(char, 2) for char in token)
+			else:
+				duration = self.phonetizer.word(token).duration
+			self._tokens[token] = duration
+		return duration
+
+	def nominal_ms(self, text):
+		"""Returns the duration of text at the nominal durations of the alphabet."""
+		token_ms = self._token_ms
+		return sum(map(token_ms, _TOKEN.findall(text)))
+
+	def _scale(self, rate, tempo):
+		return NOMINAL_RATE / max(1, rate) / tempo * self._corrections.get(rate, 1.0)
+
+	def estimate(self, text, rate=NOMINAL_RATE, tempo=1.0):
+		"""Returns how long the engine takes to speak text at DeltaTalk rate, with the audio played at tempo."""
+		return self.nominal_ms(text) * self._scale(rate, tempo)
+
+	def estimate_many(self, texts, rate=NOMINAL_RATE, tempo=1.0):
+		"""Returns the estimates of texts spoken with the same settings, as a list."""
+		scale = self._scale(rate, tempo)
+		nominal_ms = self.nominal_ms
+		return [nominal_ms(text) * scale for text in texts]
+
+	def reach(self, text, start, ms, rate=NOMINAL_RATE, tempo=1.0):
+		"""Returns the position in text at which about ms of speech from start have been read.
+
+		It is the start of the first word that would go past ms, or the end of the text.
+		"""
+		budget = ms / self._scale(rate, tempo)
+		token_ms = self._token_ms
+		total = 0.0
+		for match in _TOKEN.finditer(text, start):
+			total += token_ms(match.group())
+			if total > budget:
+				# At least one word, however long
+				return max(match.start(), _TOKEN.search(text, start).end())
+		return len(text)
+
+	def record(self, rate, estimated_ms, played_ms, tempo=1.0):
+		"""Records that a text estimated at estimated_ms at rate and tempo played for played_ms."""
+		if estimated_ms <= 0 or played_ms <= 0:
+			return
+		with self._lock:
+			self.errors.append((estimated_ms - played_ms) / played_ms)
+			nominal = estimated_ms / self._scale(rate, tempo)
+			ratios = self._ratios.setdefault(rate, deque(maxlen=HISTORY))
+			ratios.append(played_ms / (nominal * NOMINAL_RATE / max(1, rate) / tempo))
+			if len(ratios) >= MIN_SAMPLES:
+				self._corrections[rate] = max(1 / MAX_CORRECTION, min(MAX_CORRECTION, statistics.median(ratios)))
+
+	def correction(self, rate):
+		"""Returns the factor the nominal durations are corrected by at rate."""
+		return self._corrections.get(rate, 1.0)
+
+	def error_stats(self):
+		"""Returns the error_distribution of the estimates recorded."""
+		with self._lock:
+			return error_distribution(list(self.errors))
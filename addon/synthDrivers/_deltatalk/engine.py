@@ -0,0 +1,367 @@
+# synthDrivers/_deltatalk/engine.py
+# Engine backends for the DeltaTalk synthesizer
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 1997-2001 Denis R. Costa <denis@micropowerglobal.com> & MicroPower Software <www.micropower.ai>
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import array
+import ctypes
+import math
+import threading
+import time
+from collections import defaultdict, deque
+
+# Result codes of the TTSENG_* functions (ERROR_CODES in deltatalk.py has their descriptions)
+TTS_SUCCESSFUL = 0
+TTS_NOT_INITIALIZED = -1
+TTS_BUSY = -2
+TTS_BAD_COMMAND = -3
+TTS_MEM_ALLOC_ERROR = -8
+TTS_VALUE_OUT_OF_RANGE = -16
+TTS_PCM_FINISHED = -17
+TTS_NO_LICENSE = -106
+
+# Supported DSP modes
+DSP_MODES = {
+	"MULTIMEDIA": 0,
+	"TELEPHONY": 1
+}
+
+# Constants for TTSENG_GenAudioBuffer
+TTS_GENPCM_NEW_SIMPLE_BLOCK = 0
+TTS_GENPCM_NEW_MULTI_BLOCK = 1
+TTS_GENPCM_NEXT_BLOCK = 2
+TTS_GENPCM_16BITS = 0
+TTS_GENPCM_8BITS = 1
+TTS_GENPCM_ULAW = 2
+TTS_GENPCM_ALAW = 3
+
+
+class EngineError(Exception):
+	"""Raised when a TTSENG_* call returns an error code."""
+
+	def __init__(self, code, operation):
+		super().__init__(f"{operation} failed with code {code}")
+		self.code = code
+		self.operation = operation
+
+
+class EngineBackend:
+	"""Interface to a DeltaTalk engine.
+
+	Every method mirrors one TTSENG_* function of Dtalk32.dll and returns its result code.
+	Text is passed already encoded in the ANSI code page.
+	"""
+
+	def init(self, dsp_mode):
+		"""Creates an engine instance, returning its handle (greater than 0) or an error code."""
+		raise NotImplementedError
+
+	def set_mode(self, instance, rate, volume, pitch):
+		raise NotImplementedError
+
+	def set_voice(self, instance, voice_id, param=10):
+		raise NotImplementedError
+
+	def gen_audio_buffer(self, instance, text, block_mode, pcm_format, buffer, size):
+		"""Fills buffer with the next block of audio, returning (result, bytes written)."""
+		raise NotImplementedError
+
+	def play_text(self, instance, text, asynchronous=True):
+		raise NotImplementedError
+
+	def append_text(self, instance, text):
+		raise NotImplementedError
+
+	def stop(self, instance):
+		raise NotImplementedError
+
+	def pause(self, instance):
+		raise NotImplementedError
+
+	def resume(self, instance):
+		raise NotImplementedError
+
+	def close(self, instance):
+		raise NotImplementedError
+
+
+class Dtalk32Backend(EngineBackend):
+	"""The real engine, Dtalk32.dll loaded through ctypes."""
+
+	def __init__(self, dll_path):
+		self.dll = ctypes.WinDLL(dll_path)
+
+	def init(self, dsp_mode):
+		return self.dll.TTSENG_Init(False, None, dsp_mode)
+
+	def set_mode(self, instance, rate, volume, pitch):
+		return self.dll.TTSENG_SetMode(instance, rate, volume, pitch)
+
+	def set_voice(self, instance, voice_id, param=10):
+		return self.dll.TTSENG_SetVoice(instance, voice_id, param)
+
+	def gen_audio_buffer(self, instance, text, block_mode, pcm_format, buffer, size):
+		bytes_written = ctypes.c_int(0)
+		result = self.dll.TTSENG_GenAudioBuffer(
+			instance,
+			ctypes.c_char_p(text) if text is not None else None,
+			block_mode,
+			pcm_format,
+			buffer,
+			size,
+			ctypes.byref(bytes_written)
+		)
+		return result, bytes_written.value
+
+	def play_text(self, instance, text, asynchronous=True):
+		return self.dll.TTSENG_PlayText(instance, ctypes.c_char_p(text), asynchronous)
+
+	def append_text(self, instance, text):
+		return self.dll.TTSENG_AppendText(instance, ctypes.c_char_p(text))
+
+	def stop(self, instance):
+		return self.dll.TTSENG_StopText(instance)
+
+	def pause(self, instance):
+		return self.dll.TTSENG_PauseText(instance)
+
+	def resume(self, instance):
+		return self.dll.TTSENG_ResumeText(instance)
+
+	def close(self, instance):
+		return self.dll.TTSENG_Close(instance)
+
+
+# Output sample rate of each voice id, as set by TTSENG_SetVoice
+VOICE_SAMPLE_RATES = {0: 16000, 1: 22050, 2: 22050}
+TELEPHONY_SAMPLE_RATE = 8000
+
+
+class _SimulatedInstance:
+	def __init__(self, dsp_mode):
+		self.dsp_mode = dsp_mode
+		self.rate = 10
+		self.voice_id = 0
+		self.pending = 0  # PCM bytes left in the current multi-block generation
+		self.busy_until = 0.0  # End of the simulated PlayText/AppendText playback
+		self.paused = False
+
+
+class SimulatedBackend(EngineBackend):
+	"""A deterministic engine written in Python, for benchmarks off Windows.
+
+	Audio length is proportional to the text length and to the DT rate set with set_mode,
+	and the PCM is a fixed tone. Latencies are slept, so they overlap across threads
+	the same way calls into the DLL do.
+	@param block_size: bytes produced by each GenAudioBuffer call, at most the buffer size.
+	@param block_latency: seconds spent producing each block.
+	@param setup_latency: extra seconds spent on each NEW_MULTI_BLOCK call.
+	@param char_latency: extra seconds per character of text spent on each NEW_MULTI_BLOCK call,
+		as the engine analyses the whole text before producing the first block.
+	@param char_ms: milliseconds of speech per character at DT rate 10.
+	@param max_instances: instances allowed before init returns TTS_NO_LICENSE.
+	@param hang_after: GenAudioBuffer calls after which every call blocks forever, to test watchdogs.
+	"""
+
+	def __init__(
+		self,
+		block_size=16384,
+		block_latency=0.0,
+		setup_latency=0.0,
+		char_latency=0.0,
+		char_ms=65.0,
+		max_instances=8,
+		hang_after=None,
+	):
+		self.block_size = block_size
+		self.block_latency = block_latency
+		self.setup_latency = setup_latency
+		self.char_latency = char_latency
+		self.char_ms = char_ms
+		self.max_instances = max_instances
+		self.hang_after = hang_after
+		self.calls = defaultdict(int)
+		self._instances = {}
+		self._next_handle = 1
+		self._faults = defaultdict(deque)
+		self._lock = threading.Lock()
+		tone = array.array("h", (int(8000 * math.sin(2 * math.pi * i / 64)) for i in range(64)))
+		self._pattern = tone.tobytes() * (block_size // len(tone.tobytes()) + 1)
+
+	def fail(self, operation, code, times=1):
+		"""Makes the next calls to the named method return code instead of running."""
+		self._faults[operation].extend([code] * times)
+
+	def _enter(self, operation, instance=None):
+		"""Counts the call and returns an injected or validation error code, if any."""
+		with self._lock:
+			self.calls[operation] += 1
+			if self._faults[operation]:
+				return self._faults[operation].popleft()
+		if instance is not None and instance not in self._instances:
+			return TTS_NOT_INITIALIZED
+		return TTS_SUCCESSFUL
+
+	def audio_bytes(self, instance, text, pcm_format=TTS_GENPCM_16BITS):
+		"""Returns how many PCM bytes text produces with the current settings of instance."""
+		state = self._instances[instance]
+		sample_rate = (
+			TELEPHONY_SAMPLE_RATE if state.dsp_mode == DSP_MODES["TELEPHONY"]
+			else VOICE_SAMPLE_RATES.get(state.voice_id, 22050)
+		)
+		sample_width = 2 if pcm_format == TTS_GENPCM_16BITS else 1
+		duration = len(text) * self.char_ms * 10 / state.rate / 1000
+		return int(duration * sample_rate) * sample_width
+
+	def init(self, dsp_mode):
+		result = self._enter("init")
+		if result != TTS_SUCCESSFUL:
+			return result
+		with self._lock:
+			if len(self._instances) >= self.max_instances:
+				return TTS_NO_LICENSE
+			handle = self._next_handle
+			self._next_handle += 1
+			self._instances[handle] = _SimulatedInstance(dsp_mode)
+		return handle
+
+	def set_mode(self, instance, rate, volume, pitch):
+		result = self._enter("set_mode", instance)
+		if result != TTS_SUCCESSFUL:
+			return result
+		if not all(1 <= value <= 20 for value in (rate, volume, pitch)):
+			return TTS_VALUE_OUT_OF_RANGE
+		self._instances[instance].rate = rate
+		return TTS_SUCCESSFUL
+
+	def set_voice(self, instance, voice_id, param=10):
+		result = self._enter("set_voice", instance)
+		if result != TTS_SUCCESSFUL:
+			return result
+		if voice_id not in VOICE_SAMPLE_RATES:
+			return TTS_VALUE_OUT_OF_RANGE
+		self._instances[instance].voice_id = voice_id
+		return TTS_SUCCESSFUL
+
+	def gen_audio_buffer(self, instance, text, block_mode, pcm_format, buffer, size):
+		result = self._enter("gen_audio_buffer", instance)
+		if result != TTS_SUCCESSFUL:
+			return result, 0
+		if self.hang_after is not None and self.calls["gen_audio_buffer"] > self.hang_after:
+			threading.Event().wait()
+		state = self._instances[instance]
+		if block_mode == TTS_GENPCM_NEW_MULTI_BLOCK:
+			if text is None:
+				return TTS_BAD_COMMAND, 0
+			state.pending = self.audio_bytes(instance, text, pcm_format)
+			if self.setup_latency or self.char_latency:
+				time.sleep(self.setup_latency + self.char_latency * len(text))
+		elif block_mode != TTS_GENPCM_NEXT_BLOCK:
+			return TTS_BAD_COMMAND, 0
+		if state.pending <= 0:
+			return TTS_PCM_FINISHED, 0
+		length = min(size, self.block_size, state.pending)
+		if self.block_latency:
+			time.sleep(self.block_latency * length / self.block_size)
+		ctypes.memmove(buffer, self._pattern, length)
+		state.pending -= length
+		return TTS_SUCCESSFUL, length
+
+	def play_text(self, instance, text, asynchronous=True):
+		result = self._enter("play_text", instance)
+		if result != TTS_SUCCESSFUL:
+			return result
+		state = self._instances[instance]
+		now = time.monotonic()
+		if state.busy_until > now:
+			return TTS_BUSY
+		state.busy_until = now + self.audio_bytes(instance, text) / 2 / VOICE_SAMPLE_RATES[state.voice_id]
+		return TTS_SUCCESSFUL
+
+	def append_text(self, instance, text):
+		result = self._enter("append_text", instance)
+		if result != TTS_SUCCESSFUL:
+			return result
+		state = self._instances[instance]
+		start = max(state.busy_until, time.monotonic())
+		state.busy_until = start + self.audio_bytes(instance, text) / 2 / VOICE_SAMPLE_RATES[state.voice_id]
+		return TTS_SUCCESSFUL
+
+	def stop(self, instance):
+		result = self._enter("stop", instance)
+		if result == TTS_SUCCESSFUL:
+			state = self._instances[instance]
+			state.busy_until = 0.0
+			state.pending = 0
+		return result
+
+	def pause(self, instance):
+		result = self._enter("pause", instance)
+		if result == TTS_SUCCESSFUL:
+			self._instances[instance].paused = True
+		return result
+
+	def resume(self, instance):
+		result = self._enter("resume", instance)
+		if result == TTS_SUCCESSFUL:
+			self._instances[instance].paused = False
+		return result
+
+	def close(self, instance):
+		result = self._enter("close", instance)
+		if result == TTS_SUCCESSFUL:
+			with self._lock:
+				del self._instances[instance]
+		return result
+
+
+def generate_blocks(engine, instance, text, next_buffer, pcm_format=TTS_GENPCM_16BITS, release=None):
+	"""Runs a multi-block TTSENG_GenAudioBuffer generation, each block into a buffer of its own.
+
+	next_buffer() returns the PCMBuffer for the next block, or None to stop the generation there.
+	Yields (buffer, number of bytes written) for each block; a buffer yielded belongs to the caller.
+	release(buffer), if given, takes back the buffers that are not: the one the generation finishes
+	or fails in, and those the engine writes nothing into.
+	@raise EngineError: if the engine returns an error code.
+	"""
+	block_mode = TTS_GENPCM_NEW_MULTI_BLOCK
+	while True:
+		pcm = next_buffer()
+		if pcm is None:
+			return
+		yielded = False
+		try:
+			result, length = engine.gen_audio_buffer(instance, text, block_mode, pcm_format, pcm.buffer, pcm.size)
+			if result == TTS_PCM_FINISHED:
+				return
+			if result != TTS_SUCCESSFUL:
+				raise EngineError(result, "TTSENG_GenAudioBuffer")
+			if length > 0:
+				yielded = True
+				yield pcm, length
+		finally:
+			if not yielded and release is not None:
+				release(pcm)
+		block_mode = TTS_GENPCM_NEXT_BLOCK
+		text = None
+
+
+def generate_pcm(engine, instance, text, pcm, pcm_format=TTS_GENPCM_16BITS):
+	"""Runs a multi-block TTSENG_GenAudioBuffer generation into pcm.
+
+	Yields the number of bytes written for each block, which stays valid until the next one is requested.
+	@raise EngineError: if the engine returns an error code.
+	"""
+	for _pcm, length in generate_blocks(engine, instance, text, lambda: pcm, pcm_format):
+		yield length
+
+
+def render_pcm(engine, instance, text, pcm, pcm_format=TTS_GENPCM_16BITS):
+	"""Synthesizes the whole of text and returns its PCM as bytes."""
+	audio = bytearray()
+	for length in generate_pcm(engine, instance, text, pcm, pcm_format):
+		audio += pcm.block(length)
+	return bytes(audio)
@@ -0,0 +1,31 @@
+# synthDrivers/_deltatalk/epoch.py
+# Cancellation epochs, which tell in-flight synthesis that it was cancelled
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+
+class CancelEpoch:
+	"""Numbers the periods between two cancels.
+
+	Work is tagged with the current epoch when it is queued; once cancel advances the epoch,
+	the worker sees the tag is stale and drops the work, even in the middle of a generation.
+	Only the thread that cancels calls advance, so reads from other threads need no lock.
+	"""
+
+	def __init__(self):
+		self.current = 0
+		# Queued items dropped before they started
+		self.skipped = 0
+		# Generations stopped between two blocks
+		self.aborted = 0
+		# Blocks generated but never fed, because a cancel came while they were generated
+		self.discarded_blocks = 0
+
+	def advance(self):
+		self.current += 1
+		return self.current
+
+	def is_stale(self, epoch):
+		return epoch != self.current
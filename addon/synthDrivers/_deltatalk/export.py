@@ -0,0 +1,310 @@
+# synthDrivers/_deltatalk/export.py
+# Batch export of texts to WAV, mu-law and A-law files
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Batch export of texts to audio files, without NVDA.
+
+The manifest is a text file with one JSON object per line; blank lines and lines starting with #
+are ignored. Each object has the text to speak and optionally:
+	id: the name of the output file, without extension (by default the line number);
+	voice: br1, br2 or br3 (br1);
+	rate, pitch, volume: on the NVDA scale, 0 to 100 (50, 50, 100);
+	format: pcm (16-bit), pcm8, ulaw or alaw, all written as WAV files (by default the encoding of the profile).
+
+The output profile (--profile) sets the DSP mode of the engine: the telephony profiles generate
+8 kHz audio, mu-law or A-law in the telephony-ulaw and telephony-alaw profiles.
+
+Files are written under a temporary name and renamed once complete, so an interrupted export
+resumes where it stopped when run again: items whose file exists are skipped.
+
+Run from the synthDrivers folder with: python -m _deltatalk.export manifest.jsonl output_folder
+[--instances N] [--profile NAME] [--format pcm|pcm8|ulaw|alaw] [--dll Dtalk32.dll | --simulated]
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+from .engine import (
+	TTS_NOT_INITIALIZED,
+	TTS_SUCCESSFUL,
+	Dtalk32Backend,
+	EngineError,
+	SimulatedBackend,
+	generate_pcm,
+)
+from .pcm import PCMBuffer
+from .pool import EnginePool
+from .profiles import ENCODINGS, PROFILES, WAVE_FORMAT_PCM, OutputProfile, sample_rate
+from .prosody import ProsodyMap
+
+# Voice ids of TTSENG_SetVoice, as in VOICE_MAP of the driver
+VOICE_IDS = {"br1": 0, "br3": 1, "br2": 2}
+# The ANSI code page of Portuguese Windows, which the engine expects
+TEXT_ENCODING = "cp1252"
+# NVDA settings to engine steps, as the driver converts them; files get the engine audio, without effects
+PROSODY_MAP = ProsodyMap()
+
+ExportItem = namedtuple("ExportItem", ("id", "text", "voice", "rate", "pitch", "volume", "format"))
+
+
+class ManifestError(ValueError):
+	"""Raised for a manifest line that cannot be exported."""
+
+
+def read_manifest(path, default_format="pcm"):
+	"""Returns the ExportItems of the manifest at path.
+
+	@raise ManifestError: for the first invalid line.
+	"""
+	items = []
+	ids = set()
+	with open(path, encoding="utf-8") as f:
+		for number, line in enumerate(f, 1):
+			line = line.strip()
+			if not line or line.startswith("#"):
+				continue
+			try:
+				entry = json.loads(line)
+				item = ExportItem(
+					id=str(entry.get("id", f"{number:05d}")),
+					text=entry["text"],
+					voice=entry.get("voice", "br1"),
+					rate=int(entry.get("rate", 50)),
+					pitch=int(entry.get("pitch", 50)),
+					volume=int(entry.get("volume", 100)),
+					format=entry.get("format", default_format),
+				)
+			except (ValueError, TypeError, KeyError, AttributeError) as e:
+				raise ManifestError(f"Line {number}: {e!r}")
+			if item.voice not in VOICE_IDS:
+				raise ManifestError(f"Line {number}: unknown voice {item.voice!r}")
+			if item.format not in ENCODINGS:
+				raise ManifestError(f"Line {number}: unknown format {item.format!r}")
+			if not item.id or os.path.basename(item.id) != item.id or item.id in ids:
+				raise ManifestError(f"Line {number}: invalid or repeated id {item.id!r}")
+			ids.add(item.id)
+			items.append(item)
+	return items
+
+
+class WaveFileWriter:
+	"""Streams audio into a mono WAV file, including the mu-law and A-law format tags the wave module cannot write."""
+
+	def __init__(self, path, sample_rate, format_tag=WAVE_FORMAT_PCM, sample_width=2):
+		self.sample_rate = sample_rate
+		self.format_tag = format_tag
+		self.sample_width = sample_width
+		self.data_bytes = 0
+		self._file = open(path, "wb")
+		self._file.write(self._header())
+
+	def _header(self):
+		width = self.sample_width
+		fmt = struct.pack("<HHIIHH", self.format_tag, 1, self.sample_rate, self.sample_rate * width, width, width * 8)
+		chunks = []
+		if self.format_tag != WAVE_FORMAT_PCM:
+			# Compressed formats carry an empty extension and the number of samples
+			fmt += struct.pack("<H", 0)
+			chunks.append(b"fact" + struct.pack("<II", 4, self.data_bytes // width))
+		chunks.insert(0, b"fmt " + struct.pack("<I", len(fmt)) + fmt)
+		chunks.append(b"data" + struct.pack("<I", self.data_bytes))
+		body = b"WAVE" + b"".join(chunks)
+		padding = self.data_bytes % 2
+		return b"RIFF" + struct.pack("<I", len(body) + self.data_bytes + padding) + body
+
+	def write(self, data):
+		self._file.write(data)
+		self.data_bytes += len(data)
+
+	@property
+	def duration(self):
+		return self.data_bytes / self.sample_width / self.sample_rate
+
+	def close(self):
+		if self._file.closed:
+			return
+		if self.data_bytes % 2:
+			self._file.write(b"\0")
+		self._file.seek(0)
+		self._file.write(self._header())
+		self._file.close()
+
+
+class ExportReport:
+	"""Counts and throughput of an export."""
+
+	def __init__(self, total):
+		self.total = total
+		self.exported = 0
+		self.skipped = 0  # Already exported by a previous run
+		self.failed = []  # (item id, error)
+		self.characters = 0
+		self.audio_seconds = 0.0
+		self.elapsed = 0.0
+
+	def add(self, item, seconds):
+		self.exported += 1
+		self.characters += len(item.text)
+		self.audio_seconds += seconds
+
+	@property
+	def characters_per_second(self):
+		return self.characters / self.elapsed if self.elapsed else 0.0
+
+	@property
+	def realtime_factor(self):
+		"""Seconds spent per second of audio; below 1 is faster than real time."""
+		return self.elapsed / self.audio_seconds if self.audio_seconds else 0.0
+
+
+class _Stopped(Exception):
+	pass
+
+
+def output_path(output_dir, item):
+	return os.path.join(output_dir, item.id + ".wav")
+
+
+def export_item(pool, instance, item, path, pcm, profile=PROFILES["multimedia"], stop=None):
+	"""Synthesizes item into the file at path with an instance of pool, returning the seconds of audio written.
+
+	@raise EngineError: if the engine returns an error code; nothing is left at path then.
+	"""
+	prosody = PROSODY_MAP.lookup(item.rate, item.pitch, item.volume)
+	result = pool.configure_instance(instance, VOICE_IDS[item.voice], prosody.rate, prosody.volume, prosody.pitch)
+	if result != TTS_SUCCESSFUL:
+		raise EngineError(result, "TTSENG_SetMode")
+	encoding = ENCODINGS[item.format]
+	partial_path = path + ".part"
+	writer = WaveFileWriter(
+		partial_path,
+		sample_rate(OutputProfile(profile.dsp_mode, item.format), VOICE_IDS[item.voice]),
+		encoding.format_tag,
+		encoding.sample_width,
+	)
+	try:
+		text = item.text.encode(TEXT_ENCODING, errors="replace")
+		for length in generate_pcm(pool.engine, instance, text, pcm, encoding.pcm_format):
+			if stop is not None and stop.is_set():
+				raise _Stopped
+			writer.write(pcm.block(length))
+	except BaseException:
+		writer.close()
+		os.remove(partial_path)
+		raise
+	writer.close()
+	os.replace(partial_path, path)
+	return writer.duration
+
+
+def export(items, engine, output_dir, instances=1, profile=PROFILES["multimedia"], on_item=None, stop=None):
+	"""Exports items into output_dir, in parallel on up to instances engine instances in the DSP mode of profile.
+
+	on_item(item, seconds of audio) is called from the worker threads after each file.
+	Setting the stop event ends the export after the blocks being generated.
+	Returns an ExportReport.
+	@raise EngineError: if no engine instance can be opened.
+	"""
+	stop = stop or threading.Event()
+	os.makedirs(output_dir, exist_ok=True)
+	report = ExportReport(len(items))
+	todo = deque()
+	for item in items:
+		if os.path.exists(output_path(output_dir, item)):
+			report.skipped += 1
+		else:
+			todo.append(item)
+	pool = EnginePool(engine, instances, profile.dsp_mode)
+	if not len(pool):
+		raise EngineError(pool.failures[-1] if pool.failures else TTS_NOT_INITIALIZED, "TTSENG_Init")
+	lock = threading.Lock()
+
+	def work(instance):
+		pcm = PCMBuffer()
+		while not stop.is_set():
+			try:
+				item = todo.popleft()
+			except IndexError:
+				return
+			try:
+				seconds = export_item(pool, instance, item, output_path(output_dir, item), pcm, profile, stop)
+			except _Stopped:
+				return
+			except (EngineError, OSError) as e:
+				with lock:
+					report.failed.append((item.id, e))
+				continue
+			with lock:
+				report.add(item, seconds)
+			if on_item:
+				on_item(item, seconds)
+
+	start = time.perf_counter()
+	threads = [threading.Thread(target=work, args=(instance,), daemon=True) for instance in pool.instances]
+	for thread in threads:
+		thread.start()
+	try:
+		for thread in threads:
+			# Short joins, so that KeyboardInterrupt reaches the main thread
+			while thread.is_alive():
+				thread.join(0.2)
+	finally:
+		stop.set()
+		for thread in threads:
+			thread.join()
+		report.elapsed = time.perf_counter() - start
+		pool.close()
+	return report
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Exports the texts of a manifest to audio files with DeltaTalk.")
+	parser.add_argument("manifest", help="text file with one JSON object per line")
+	parser.add_argument("output", help="folder receiving the files")
+	parser.add_argument("--instances", type=int, default=3, help="engine instances working in parallel")
+	parser.add_argument("--profile", choices=sorted(PROFILES), default="multimedia", help="output profile")
+	parser.add_argument("--format", choices=sorted(ENCODINGS), help="format of items without one")
+	parser.add_argument(
+		"--dll",
+		default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "deltatalk", "Dtalk32.dll"),
+	)
+	parser.add_argument("--simulated", action="store_true", help="use the simulated engine instead of the DLL")
+	args = parser.parse_args(argv)
+	try:
+		items = read_manifest(args.manifest, args.format or PROFILES[args.profile].encoding)
+	except (OSError, ManifestError) as e:
+		parser.error(str(e))
+	engine = SimulatedBackend() if args.simulated else Dtalk32Backend(args.dll)
+
+	def on_item(item, seconds):
+		print(f"{item.id}: {seconds:.1f}s", flush=True)
+
+	try:
+		report = export(items, engine, args.output, args.instances, PROFILES[args.profile], on_item)
+	except KeyboardInterrupt:
+		print("Interrupted, run again to resume", file=sys.stderr)
+		return 1
+	except EngineError as e:
+		print(e, file=sys.stderr)
+		return 1
+	for item_id, error in report.failed:
+		print(f"{item_id} failed: {error}", file=sys.stderr)
+	print(
+		f"{report.exported} exported, {report.skipped} already done, {len(report.failed)} failed; "
+		f"{report.audio_seconds:.1f}s of audio in {report.elapsed:.1f}s, "
+		f"{report.characters_per_second:.0f} chars/s, real-time factor {report.realtime_factor:.3f}"
+	)
+	return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
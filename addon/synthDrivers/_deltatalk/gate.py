@@ -0,0 +1,93 @@
+# synthDrivers/_deltatalk/gate.py
+# Exclusive access to an engine instance
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class GateStats:
+	"""Metrics collected by EngineGate."""
+
+	def __init__(self):
+		self.acquisitions = 0
+		# Acquisitions that found the engine taken and had to wait
+		self.contended = 0
+		# Attempts that gave up, because they did not want to wait
+		self.refused = 0
+		self.total_wait = 0.0
+		self.max_wait = 0.0
+		self.total_hold = 0.0
+		self.max_hold = 0.0
+
+	def as_dict(self):
+		return {
+			"acquisitions": self.acquisitions,
+			"contended": self.contended,
+			"refused": self.refused,
+			"wait_ms": self.total_wait * 1000,
+			"max_wait_ms": self.max_wait * 1000,
+			"hold_ms": self.total_hold * 1000,
+			"max_hold_ms": self.max_hold * 1000,
+		}
+
+
+class EngineGate:
+	"""Lets one thread at a time use an engine instance.
+
+	Waiters sleep on a condition variable and are woken as soon as the owner releases the engine,
+	so waiting costs no CPU and no polling delay.
+	"""
+
+	def __init__(self, clock=time.monotonic):
+		self.stats = GateStats()
+		self._clock = clock
+		self._cond = threading.Condition()
+		self._owner = None
+		self._acquired_at = 0.0
+
+	@property
+	def busy(self):
+		return self._owner is not None
+
+	def acquire(self, blocking=True, timeout=None):
+		"""Takes the engine, waiting for it if blocking. Returns False if it could not be taken."""
+		with self._cond:
+			start = self._clock()
+			if self._owner is not None:
+				if not blocking:
+					self.stats.refused += 1
+					return False
+				self.stats.contended += 1
+				if not self._cond.wait_for(lambda: self._owner is None, timeout):
+					self.stats.refused += 1
+					return False
+			now = self._clock()
+			waited = now - start
+			self.stats.acquisitions += 1
+			self.stats.total_wait += waited
+			self.stats.max_wait = max(self.stats.max_wait, waited)
+			self._owner = threading.get_ident()
+			self._acquired_at = now
+			return True
+
+	def release(self):
+		with self._cond:
+			held = self._clock() - self._acquired_at
+			self.stats.total_hold += held
+			self.stats.max_hold = max(self.stats.max_hold, held)
+			self._owner = None
+			self._cond.notify()
+
+	@contextmanager
+	def hold(self):
+		"""Holds the engine for the duration of a with block, waiting for it as long as needed."""
+		self.acquire()
+		try:
+			yield
+		finally:
+			self.release()
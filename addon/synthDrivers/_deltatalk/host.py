@@ -0,0 +1,483 @@
+# synthDrivers/_deltatalk/host.py
+# Engine backends loaded in helper processes, returning PCM through shared memory
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Out-of-process synthesis.
+
+A host is a Python process started with "python -m _deltatalk.host", which loads an engine
+backend and opens one instance. It connects back to the driver through a
+multiprocessing.connection pipe, and writes PCM straight into a shared-memory segment owned by
+the driver, split into slots of one GenAudioBuffer block each. Only slot numbers and lengths go
+through the pipe, so PCM is never copied between the processes.
+
+Messages from the driver:
+	("synth", request, text, pcm_format, settings): generates text, settings being
+		(voice_id, rate, volume, pitch) on the DeltaTalk scale, applied if they changed.
+	("free", slot): the driver is done with a slot.
+	("cancel", request): stops the generation of request.
+	("quit",)
+Messages from the host:
+	("ready", code): the engine instance was opened (code 0) or not (an error code).
+	("block", request, slot, length): a block of request was written into slot.
+	("done", request, code): request is finished, code being TTS_SUCCESSFUL or an error code.
+
+A host waits for a free slot before each block, so the slots bound the audio it is ahead by.
+"""
+
+import ctypes
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing import connection, shared_memory
+
+from .engine import (
+	DSP_MODES,
+	TTS_GENPCM_16BITS,
+	TTS_GENPCM_NEW_MULTI_BLOCK,
+	TTS_GENPCM_NEXT_BLOCK,
+	TTS_PCM_FINISHED,
+	TTS_SUCCESSFUL,
+	Dtalk32Backend,
+	EngineError,
+	SimulatedBackend,
+)
+from .pcm import PCM_BLOCK_SIZE
+from .pool import PoolJob
+
+DEFAULT_SLOTS = 8
+# Seconds a host may go without sending anything while it has a free slot to write into
+DEFAULT_HANG_TIMEOUT = 5.0
+# Seconds a host has to connect back and open its engine instance
+START_TIMEOUT = 15.0
+# Restarts after which a HostPool gives up on a host
+MAX_RESTARTS = 3
+
+
+class HostError(Exception):
+	"""Raised when a host process dies, hangs or cannot be started."""
+
+
+def make_backend(spec):
+	"""Creates the engine backend described by spec: ("dtalk32", dll_path) or ("simulated", keyword arguments)."""
+	kind, argument = spec
+	if kind == "dtalk32":
+		return Dtalk32Backend(argument)
+	if kind == "simulated":
+		return SimulatedBackend(**argument)
+	raise ValueError(f"Unknown engine backend {kind!r}")
+
+
+def _attach(name):
+	"""Opens the shared memory created by the driver, which stays the one to free it."""
+	shm = shared_memory.SharedMemory(name=name)
+	if os.name != "nt":
+		# Otherwise the resource tracker of this process unlinks it when the host exits
+		from multiprocessing import resource_tracker
+		resource_tracker.unregister(shm._name, "shared_memory")
+	return shm
+
+
+class _Host:
+	"""The host side: one engine instance writing blocks into the shared slots."""
+
+	def __init__(self, conn, shm, slots, block_size, engine, dsp_mode, free_slots):
+		self.conn = conn
+		self.engine = engine
+		self.block_size = block_size
+		self.buffers = [
+			(ctypes.c_ubyte * block_size).from_buffer(shm.buf, slot * block_size)
+			for slot in range(slots)
+		]
+		self.free = deque(free_slots)
+		self.pending = deque()  # Messages received while generating, handled afterwards
+		self.settings = None
+		self.instance = engine.init(dsp_mode)
+		self.quitting = False
+
+	def run(self):
+		self.conn.send(("ready", min(self.instance, 0)))
+		if self.instance <= 0:
+			return
+		try:
+			while not self.quitting:
+				message = self.pending.popleft() if self.pending else self.conn.recv()
+				if message[0] == "synth":
+					self.synthesize(*message[1:])
+				else:
+					self.handle(message)
+		finally:
+			self.engine.close(self.instance)
+
+	def handle(self, message, request=None):
+		"""Handles a message other than synth. Returns True if it cancels request."""
+		kind = message[0]
+		if kind == "free":
+			self.free.append(message[1])
+		elif kind == "cancel":
+			if message[1] == request:
+				return True
+			# Not started yet
+			self.pending = deque(
+				item for item in self.pending if not (item[0] == "synth" and item[1] == message[1]))
+		elif kind == "quit":
+			self.quitting = True
+			return True
+		else:
+			self.pending.append(message)
+		return False
+
+	def apply(self, settings):
+		if settings is None or settings == self.settings:
+			return TTS_SUCCESSFUL
+		voice_id, rate, volume, pitch = settings
+		result = self.engine.set_voice(self.instance, voice_id, 10)
+		if result == TTS_SUCCESSFUL:
+			result = self.engine.set_mode(self.instance, rate, volume, pitch)
+		self.settings = settings if result == TTS_SUCCESSFUL else None
+		return result
+
+	def synthesize(self, request, text, pcm_format, settings):
+		code = self.apply(settings)
+		block_mode = TTS_GENPCM_NEW_MULTI_BLOCK
+		cancelled = False
+		while code == TTS_SUCCESSFUL:
+			# Handle cancels and freed slots as they come, and wait for a slot if none is free
+			while not cancelled and (not self.free or self.conn.poll()):
+				cancelled = self.handle(self.conn.recv(), request)
+			if cancelled:
+				break
+			slot = self.free.popleft()
+			result, length = self.engine.gen_audio_buffer(
+				self.instance, text, block_mode, pcm_format, self.buffers[slot], self.block_size)
+			if result != TTS_SUCCESSFUL or not length:
+				self.free.appendleft(slot)
+				if result != TTS_PCM_FINISHED:
+					code = result
+				break
+			self.conn.send(("block", request, slot, length))
+			block_mode = TTS_GENPCM_NEXT_BLOCK
+			text = None
+		self.conn.send(("done", request, code))
+
+	def close(self):
+		# The arrays export the shared memory, which cannot be closed while they exist
+		self.buffers.clear()
+
+
+def _host_main(address):
+	"""Entry point of a host process: connects to address, using the authentication key read from stdin."""
+	authkey = bytes.fromhex(sys.stdin.readline().strip())
+	conn = connection.Client(address, authkey=authkey)
+	try:
+		_kind, shm_name, slots, block_size, backend_spec, dsp_mode, free_slots = conn.recv()
+		shm = _attach(shm_name)
+		host = _Host(conn, shm, slots, block_size, make_backend(backend_spec), dsp_mode, free_slots)
+		try:
+			host.run()
+		finally:
+			host.close()
+			shm.close()
+	except (EOFError, OSError):
+		# The driver went away
+		pass
+	finally:
+		conn.close()
+
+
+class SynthesisHost:
+	"""A host process and the shared memory it writes PCM into.
+
+	The memory belongs to this object rather than to the process, so that blocks the driver still
+	holds survive a restart. It exposes address and view like a PCMBuffer, so make_pcm_feeder
+	can feed a block of slot from offset(slot).
+	synthesize and render must be called by one thread at a time; release may be called from any thread.
+	@param backend: the backend spec of make_backend.
+	@param python: the interpreter running the host; NVDA itself cannot, so it must be given there.
+	"""
+
+	def __init__(
+		self,
+		backend,
+		slots=DEFAULT_SLOTS,
+		block_size=PCM_BLOCK_SIZE,
+		dsp_mode=DSP_MODES["MULTIMEDIA"],
+		hang_timeout=DEFAULT_HANG_TIMEOUT,
+		python=None,
+	):
+		self.backend = backend
+		self.slots = slots
+		self.block_size = block_size
+		self.dsp_mode = dsp_mode
+		self.hang_timeout = hang_timeout
+		self.python = python or sys.executable
+		self.settings = None
+		self.restarts = 0
+		self._shm = shared_memory.SharedMemory(create=True, size=slots * block_size)
+		self._array = (ctypes.c_ubyte * (slots * block_size)).from_buffer(self._shm.buf)
+		self.address = ctypes.addressof(self._array)
+		self.view = memoryview(self._array).cast("B")
+		self._held = set()  # Slots given to the driver and not released yet
+		self._lock = threading.Lock()  # Guards _held and sending
+		self._request = 0
+		self._process = None
+		self._conn = None
+		try:
+			self._start()
+		except BaseException:
+			self._free_memory()
+			raise
+
+	def _start(self):
+		authkey = secrets.token_bytes(32)
+		listener = connection.Listener(authkey=authkey)
+		try:
+			package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+			env = dict(os.environ, PYTHONPATH=package_dir)
+			self._process = subprocess.Popen(
+				[self.python, "-m", "_deltatalk.host", listener.address],
+				stdin=subprocess.PIPE,
+				env=env,
+				creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+			)
+			self._process.stdin.write(authkey.hex().encode("ascii") + b"\n")
+			self._process.stdin.close()
+			self._conn = self._accept(listener, authkey)
+		finally:
+			listener.close()
+		with self._lock:
+			free_slots = [slot for slot in range(self.slots) if slot not in self._held]
+		self._conn.send(("start", self._shm.name, self.slots, self.block_size, self.backend, self.dsp_mode, free_slots))
+		if not self._conn.poll(START_TIMEOUT):
+			self._kill()
+			raise HostError("The host did not open the engine in time")
+		try:
+			_kind, code = self._conn.recv()
+		except EOFError:
+			self._kill()
+			raise HostError(f"The host exited with code {self._process.wait()}")
+		if code != TTS_SUCCESSFUL:
+			self._kill()
+			raise EngineError(code, "TTSENG_Init")
+
+	def _accept(self, listener, authkey):
+		"""Waits for the host to connect, giving up if it exits or takes too long."""
+		accepted = []
+		thread = threading.Thread(target=lambda: accepted.append(listener.accept()), daemon=True)
+		thread.start()
+		deadline = time.monotonic() + START_TIMEOUT
+		while thread.is_alive() and self._process.poll() is None and time.monotonic() < deadline:
+			thread.join(0.05)
+		if thread.is_alive():
+			# accept cannot be interrupted, so connect to it in place of the host
+			connection.Client(listener.address, authkey=authkey).close()
+			thread.join()
+			accepted.pop().close()
+			self._kill()
+			raise HostError("The host did not start")
+		return accepted[0]
+
+	def offset(self, slot):
+		return slot * self.block_size
+
+	def block(self, slot, length):
+		"""Returns a memoryview over the length bytes written into slot."""
+		return self.view[slot * self.block_size:slot * self.block_size + length]
+
+	def configure(self, voice_id, rate, volume, pitch):
+		"""Sets the voice and the DeltaTalk scale settings of the next syntheses."""
+		self.settings = (voice_id, rate, volume, pitch)
+
+	def _send(self, message):
+		with self._lock:
+			self._conn.send(message)
+
+	def release(self, slot):
+		"""Gives slot back to the host once its block was fed."""
+		with self._lock:
+			if slot not in self._held:
+				return
+			self._held.discard(slot)
+			try:
+				self._conn.send(("free", slot))
+			except OSError:
+				# The host died; the slot is free for the next one
+				pass
+
+	def _receive(self):
+		"""Returns the next message of the host.
+
+		@raise HostError: if the host died, or sent nothing for hang_timeout while it had a slot to write into.
+		In both cases it is restarted first.
+		"""
+		waited = 0.0
+		while True:
+			try:
+				if self._conn.poll(0.1):
+					return self._conn.recv()
+			except (EOFError, OSError):
+				pass
+			if self._process.poll() is not None:
+				self.restart()
+				raise HostError("The host exited")
+			with self._lock:
+				starved = len(self._held) == self.slots
+			# Waiting for the driver to free a slot is not a hang
+			waited = 0.0 if starved else waited + 0.1
+			if waited >= self.hang_timeout:
+				self.restart()
+				raise HostError("The host stopped responding and was restarted")
+
+	def synthesize(self, text, pcm_format=TTS_GENPCM_16BITS):
+		"""Generates text, encoded in the ANSI code page, yielding (slot, length) for each block.
+
+		Each slot must be released once its block was used. Closing the generator early cancels the generation.
+		@raise EngineError: if the engine returns an error code.
+		@raise HostError: if the host fails; it is restarted first.
+		"""
+		self._request += 1
+		request = self._request
+		self._send(("synth", request, text, pcm_format, self.settings))
+		finished = False
+		try:
+			while True:
+				message = self._receive()
+				if message[0] == "block":
+					_kind, block_request, slot, length = message
+					with self._lock:
+						self._held.add(slot)
+					if block_request != request:
+						# Generated for a request closed before the end
+						self.release(slot)
+						continue
+					yield slot, length
+				elif message[0] == "done" and message[1] == request:
+					finished = True
+					if message[2] != TTS_SUCCESSFUL:
+						raise EngineError(message[2], "TTSENG_GenAudioBuffer")
+					return
+		except HostError:
+			finished = True
+			raise
+		finally:
+			if not finished and self._conn:
+				try:
+					self._send(("cancel", request))
+				except OSError:
+					pass
+
+	def render(self, text, pcm_format=TTS_GENPCM_16BITS):
+		"""Synthesizes the whole of text and returns its PCM as bytes."""
+		audio = bytearray()
+		for slot, length in self.synthesize(text, pcm_format):
+			audio += self.block(slot, length)
+			self.release(slot)
+		return bytes(audio)
+
+	@property
+	def alive(self):
+		return self._process is not None and self._process.poll() is None
+
+	def restart(self):
+		"""Kills the host process and starts a new one, keeping the slots the driver holds."""
+		self._kill()
+		self.restarts += 1
+		self._start()
+
+	def _kill(self):
+		if self._conn:
+			self._conn.close()
+			self._conn = None
+		if self._process:
+			if self._process.poll() is None:
+				self._process.kill()
+			self._process.wait()
+
+	def _free_memory(self):
+		self.view.release()
+		del self._array
+		self._shm.close()
+		self._shm.unlink()
+
+	def close(self, timeout=2.0):
+		if self._shm is None:
+			return
+		if self.alive:
+			try:
+				self._send(("quit",))
+				self._process.wait(timeout)
+			except (OSError, subprocess.TimeoutExpired):
+				pass
+		self._kill()
+		self._free_memory()
+		self._shm = None
+
+
+class HostPool:
+	"""Several synthesis hosts, used like an EnginePool to synthesize consecutive chunks in parallel.
+
+	A host that fails is restarted by its watchdog and keeps its place, up to MAX_RESTARTS times.
+	failures keeps the errors of the hosts lost, or that could not be started.
+	"""
+
+	def __init__(self, size, backend, **options):
+		self.hosts = []
+		self.failures = []
+		self._lock = threading.Lock()
+		for _ in range(size):
+			try:
+				self.hosts.append(SynthesisHost(backend, **options))
+			except (HostError, EngineError, OSError) as e:
+				self.failures.append(e)
+				break
+
+	def __len__(self):
+		return len(self.hosts)
+
+	def configure(self, voice_id, rate, volume, pitch):
+		for host in self.hosts:
+			host.configure(voice_id, rate, volume, pitch)
+
+	def render(self, texts, pcm_format=TTS_GENPCM_16BITS, lookahead=None, stale=None):
+		"""Starts synthesizing texts on every host and returns the PoolJob yielding their PCM in order."""
+		return PoolJob(
+			lambda host, pcm, text: host.render(text, pcm_format),
+			list(self.hosts),
+			texts,
+			lookahead,
+			self._job_failed,
+			stale,
+		)
+
+	def _job_failed(self, host, error):
+		if isinstance(error, HostError) and host.restarts <= MAX_RESTARTS and host.alive:
+			return False
+		self.retire(host, error)
+		return True
+
+	def retire(self, host, error):
+		with self._lock:
+			if host not in self.hosts:
+				return
+			self.hosts.remove(host)
+			self.failures.append(error)
+		host.close()
+
+	@property
+	def restarts(self):
+		return sum(host.restarts for host in self.hosts)
+
+	def close(self):
+		for host in list(self.hosts):
+			host.close()
+		self.hosts = []
+
+
+if __name__ == "__main__":
+	_host_main(sys.argv[1])
@@ -0,0 +1,148 @@
+# synthDrivers/_deltatalk/indexing.py
+# Bookkeeping of IndexCommand positions in the PCM stream
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import threading
+import time
+from collections import deque
+
+# Share of the estimated duration of a text after which the index following it is reported; early
+# rather than late, so that NVDA hands over the next text before the engine runs out of speech
+EARLY_FACTOR = 0.9
+
+
+class IndexTracker:
+	"""Binds indexes to byte offsets of the PCM stream fed to the player.
+
+	An index is bound at the number of bytes fed so far, and its notification is attached to a
+	zero-length feed at that point, so the player calls it back once exactly those bytes have played.
+	"""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._bound = deque()
+		self.fed_bytes = 0
+		self.played_bytes = 0
+
+	def fed(self, length):
+		"""Records length bytes of PCM handed to the player."""
+		with self._lock:
+			self.fed_bytes += length
+
+	def bind(self, index):
+		"""Binds index to the current end of the stream and returns that offset."""
+		with self._lock:
+			offset = self.fed_bytes
+			self._bound.append((offset, index))
+			return offset
+
+	def reached(self, offset):
+		"""Called back by the player once the stream has played up to offset.
+
+		Returns the indexes bound up to there, in order, which are forgotten from now on.
+		"""
+		reached = []
+		with self._lock:
+			while self._bound and self._bound[0][0] <= offset:
+				reached.append(self._bound.popleft()[1])
+			self.played_bytes = max(self.played_bytes, offset)
+		return reached
+
+	def pending(self):
+		"""Returns the bound indexes whose audio has not played yet."""
+		with self._lock:
+			return [index for _offset, index in self._bound]
+
+	def reset(self):
+		"""Forgets every bound index, after the player was stopped."""
+		with self._lock:
+			self._bound.clear()
+			self.fed_bytes = 0
+			self.played_bytes = 0
+
+
+class EstimatedIndexes:
+	"""Reports indexes once the text queued before them is estimated to have been spoken.
+
+	For speech the engine plays itself, whose progress nothing reports. Each text queued moves the
+	estimated end of speech by its duration, an index is due at the end estimated when it is bound,
+	and a thread of its own calls notify(index) once it is due.
+	They are approximate: nothing tells when the engine actually reaches an index, so the
+	estimates are never corrected and can drift from the speech over a long text.
+	"""
+
+	def __init__(self, notify, early=EARLY_FACTOR, clock=time.monotonic):
+		self._notify = notify
+		self._early = early
+		self._clock = clock
+		self._cond = threading.Condition()
+		self._end = 0.0  # When the text queued so far is estimated to have been spoken
+		self._due = deque()  # (time, index), in order
+		self._paused_at = None
+		self._closed = False
+		self._thread = threading.Thread(target=self._run, daemon=True)
+		self._thread.start()
+
+	def _now(self):
+		return self._paused_at if self._paused_at is not None else self._clock()
+
+	def queued(self, ms):
+		"""Records text of ms estimated duration queued to the engine."""
+		with self._cond:
+			self._end = max(self._end, self._now()) + ms * self._early / 1000
+
+	def bind(self, index):
+		"""Reports index once the text queued so far has been spoken."""
+		with self._cond:
+			self._due.append((max(self._end, self._now()), index))
+			self._cond.notify_all()
+
+	def pending(self):
+		"""Returns the indexes not reported yet."""
+		with self._cond:
+			return [index for _due, index in self._due]
+
+	def pause(self, switch):
+		"""Holds the indexes while the engine is paused."""
+		with self._cond:
+			now = self._clock()
+			if switch and self._paused_at is None:
+				self._paused_at = now
+			elif not switch and self._paused_at is not None:
+				delay = now - self._paused_at
+				self._end += delay
+				self._due = deque((due + delay, index) for due, index in self._due)
+				self._paused_at = None
+			self._cond.notify_all()
+
+	def reset(self):
+		"""Forgets every index not reported yet, after the engine was stopped."""
+		with self._cond:
+			self._due.clear()
+			self._end = 0.0
+			self._paused_at = None
+			self._cond.notify_all()
+
+	def close(self):
+		with self._cond:
+			self._closed = True
+			self._cond.notify_all()
+		self._thread.join(timeout=2.0)
+
+	def _run(self):
+		while True:
+			with self._cond:
+				while not self._closed:
+					timeout = None
+					if self._due and self._paused_at is None:
+						timeout = self._due[0][0] - self._clock()
+						if timeout <= 0:
+							break
+					self._cond.wait(timeout)
+				if self._closed:
+					return
+				index = self._due.popleft()[1]
+			self._notify(index)
@@ -0,0 +1,346 @@
+# synthDrivers/_deltatalk/intonation.py
+# Decoding of the brazil.f0 and brazilf0.HHS intonation tables, and their memory-mapped cache
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Intonation tables.
+
+brazil.f0 and brazilf0.HHS are text with every byte but tabs and line ends shifted up by SHIFT.
+Decoded, they start with a NbPitchPoints line (NbPitchPoint in the .HHS) and a NbRules line, then
+have one rule per line: a contour ID, then pitch points separated by tabs, in steps of 0.25.
+The ID is a context number from 0 to 12 followed by the tones of the syllables of a stress group:
+l for an unstressed syllable, HH, HL, L-L-, H+H+ or H/H for a stressed one, and . for the edge of
+the phrase, which has no syllable. Every syllable has NbPitchPoints points, and the rules of
+brazilf0.HHS have one more, leading point, where the contour starts. Several rules can share an
+ID, as variants the engine chooses among.
+
+Decoding and parsing the text takes a while, so load keeps a binary cache of the table, rebuilt
+whenever it changes, and maps it in memory. Layout, little-endian, every section 4-byte aligned:
+- header: magic, format version, reserved, fingerprint of the table, points per syllable, leading
+  points, rule count, ID count, point count, length of the IDs;
+- uint32: rule count + 1 offsets of the points of each rule, counted in points;
+- uint32: the number of the ID of each rule;
+- uint32: ID count + 1 offsets into the next section, one per ID;
+- uint32: rule numbers grouped by ID, in file order;
+- float32: the points of every rule, one after the other;
+- the sorted IDs in UTF-8, separated by newlines.
+The arrays are NumPy arrays where NumPy is installed, memoryviews of the map otherwise.
+
+Run from the synthDrivers folder with: python -m _deltatalk.intonation [--table brazil.f0]
+stats [--top N] | show ID...
+"""
+
+import argparse
+import array
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from collections import Counter, namedtuple
+
+from .phrasecache import fingerprint_files
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+MAGIC = b"DTF0"
+VERSION = 1
+_HEADER = struct.Struct("<4sHH20sHHIIII")
+SHIFT = 0x2F
+TABLE_ENCODING = "cp1252"
+BOUNDARY = "."
+UNSTRESSED = "l"
+_PLAIN = b"\t\r\n"
+_DECODE = bytes(byte if byte in _PLAIN else (byte - SHIFT) % 256 for byte in range(256))
+
+Rule = namedtuple("Rule", ("contour_id", "points"))
+Rule.__doc__ = """A contour ID and its pitch points: the leading points, then those of each syllable in turn."""
+
+
+class IntonationError(Exception):
+	"""Raised when an intonation table or its cache cannot be read."""
+
+
+def decode_table(data):
+	"""Returns the text of the bytes of a table."""
+	return data.translate(_DECODE).decode(TABLE_ENCODING)
+
+
+def split_contour_id(contour_id):
+	"""Returns the context number and the tones of the syllables of a contour ID."""
+	fields = contour_id.split()
+	return int(fields[0]), tuple(tone for tone in fields[1:] if tone != BOUNDARY)
+
+
+def parse_table(text):
+	"""Returns the points per syllable, the leading points and the Rules of the text of a table, in file order.
+
+	@raise IntonationError: if the text is not an intonation table.
+	"""
+	lines = text.splitlines()
+	header = {}
+	for line in lines[:2]:
+		fields = line.split()
+		if len(fields) != 2 or not fields[1].isdigit():
+			raise IntonationError("expected NbPitchPoints and NbRules lines")
+		header[fields[0].rstrip("s")] = int(fields[1])
+	points = header.get("NbPitchPoint")
+	count = header.get("NbRule")
+	if not points or count is None:
+		raise IntonationError("expected NbPitchPoints and NbRules lines")
+	rules = []
+	leading = None
+	for number, line in enumerate(lines[2:], 3):
+		fields = line.split("\t")
+		if not fields[0].strip():
+			continue
+		contour_id = " ".join(fields[0].split())
+		try:
+			_context, tones = split_contour_id(contour_id)
+			values = [float(value) for value in fields[1:] if value.strip()]
+		except ValueError:
+			raise IntonationError(f"Line {number}: expected a contour ID and its pitch points")
+		extra = len(values) - points * len(tones)
+		if leading is None:
+			leading = extra
+		if extra != leading or extra < 0:
+			raise IntonationError(f"Line {number}: {len(values)} pitch points for {len(tones)} syllables")
+		rules.append(Rule(contour_id, values))
+	if len(rules) != count:
+		raise IntonationError(f"{len(rules)} rules instead of {count}")
+	return points, leading or 0, rules
+
+
+def write_cache(path, fingerprint, points, leading, rules):
+	"""Writes the binary cache of a parsed table to path, replacing it once complete."""
+	contour_ids = sorted({rule.contour_id for rule in rules})
+	numbers = {contour_id: number for number, contour_id in enumerate(contour_ids)}
+	offsets = array.array("I", [0])
+	rule_ids = array.array("I")
+	values = array.array("f")
+	grouped = [[] for _ in contour_ids]
+	for position, rule in enumerate(rules):
+		values.extend(rule.points)
+		offsets.append(len(values))
+		rule_ids.append(numbers[rule.contour_id])
+		grouped[numbers[rule.contour_id]].append(position)
+	id_starts = array.array("I", [0])
+	by_id = array.array("I")
+	for positions in grouped:
+		by_id.extend(positions)
+		id_starts.append(len(by_id))
+	id_text = "\n".join(contour_ids).encode("utf-8")
+	if sys.byteorder != "little":
+		for section in (offsets, rule_ids, id_starts, by_id, values):
+			section.byteswap()
+	temp_path = path + ".tmp"
+	try:
+		with open(temp_path, "wb") as f:
+			f.write(_HEADER.pack(
+				MAGIC, VERSION, 0, fingerprint, points, leading, len(rules), len(contour_ids), len(values), len(id_text)))
+			for section in (offsets, rule_ids, id_starts, by_id, values):
+				f.write(section.tobytes())
+			f.write(id_text)
+	except BaseException:
+		if os.path.exists(temp_path):
+			os.remove(temp_path)
+		raise
+	os.replace(temp_path, path)
+
+
+class IntonationTable:
+	"""The rules of an intonation table, from its binary cache mapped in memory.
+
+	Opening it reads the header and the IDs only; the points stay in the map until used.
+	@raise IntonationError: if the cache is missing, corrupt or was built for another table.
+	"""
+
+	def __init__(self, cache_path, fingerprint=None):
+		self.path = cache_path
+		try:
+			with open(cache_path, "rb") as f:
+				self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		except (OSError, ValueError) as e:
+			raise IntonationError(str(e))
+		self._views = []
+		try:
+			(magic, version, _reserved, file_fingerprint, self.pitch_points, self.leading_points,
+				count, id_count, point_count, id_length) = _HEADER.unpack_from(self._mmap)
+		except struct.error as e:
+			self.close()
+			raise IntonationError(str(e))
+		if magic != MAGIC or version != VERSION:
+			self.close()
+			raise IntonationError("not an intonation cache of this version")
+		if fingerprint is not None and file_fingerprint != fingerprint:
+			self.close()
+			raise IntonationError("built for another table")
+		offset = _HEADER.size
+		sections = []
+		for code, length in (("I", count + 1), ("I", count), ("I", id_count + 1), ("I", count), ("f", point_count)):
+			sections.append((code, offset, length))
+			offset += 4 * length
+		if offset + id_length != len(self._mmap):
+			self.close()
+			raise IntonationError("truncated")
+		self.offsets, self.rule_ids, self._id_starts, self._by_id, self.points = (
+			self._array(*section) for section in sections)
+		self.contour_ids = self._mmap[offset:].decode("utf-8").split("\n") if id_count else []
+		self._numbers = {contour_id: number for number, contour_id in enumerate(self.contour_ids)}
+
+	@classmethod
+	def load(cls, table_path, cache_path):
+		"""Opens the cache of the table at table_path, building it at cache_path if it is missing or stale.
+
+		@raise IntonationError: if the table cannot be read or parsed.
+		"""
+		try:
+			fingerprint = fingerprint_files([table_path])
+			try:
+				return cls(cache_path, fingerprint)
+			except IntonationError:
+				pass
+			with open(table_path, "rb") as f:
+				points, leading, rules = parse_table(decode_table(f.read()))
+			write_cache(cache_path, fingerprint, points, leading, rules)
+		except OSError as e:
+			raise IntonationError(str(e))
+		return cls(cache_path, fingerprint)
+
+	def _array(self, code, offset, length):
+		if numpy is not None:
+			return numpy.frombuffer(self._mmap, dtype="<u4" if code == "I" else "<f4", count=length, offset=offset)
+		view = memoryview(self._mmap)[offset:offset + 4 * length]
+		self._views.append(view)
+		view = view.cast(code)
+		self._views.append(view)
+		return view
+
+	def __len__(self):
+		return len(self.offsets) - 1
+
+	def __contains__(self, contour_id):
+		return contour_id in self._numbers
+
+	def rule(self, position):
+		"""Returns the Rule at position, in file order, its points a view into the map."""
+		return Rule(self.contour_ids[self.rule_ids[position]], self.points[self.offsets[position]:self.offsets[position + 1]])
+
+	def variants(self, contour_id):
+		"""Returns the positions of the rules of contour_id, in file order; empty if there are none."""
+		number = self._numbers.get(contour_id)
+		if number is None:
+			return []
+		return list(self._by_id[self._id_starts[number]:self._id_starts[number + 1]])
+
+	def syllable_points(self, points, syllable):
+		"""Returns the points of the syllable-th syllable out of the points of a rule."""
+		start = self.leading_points + syllable * self.pitch_points
+		return points[start:start + self.pitch_points]
+
+	def close(self):
+		for attribute in ("offsets", "rule_ids", "_id_starts", "_by_id", "points"):
+			self.__dict__.pop(attribute, None)
+		for view in reversed(self.__dict__.pop("_views", [])):
+			view.release()
+		if getattr(self, "_mmap", None) is not None:
+			try:
+				self._mmap.close()
+			except BufferError:
+				# NumPy arrays taken from the table still use the map, which closes once they are gone
+				pass
+			self._mmap = None
+
+
+def default_cache_path(table_path):
+	"""Where load keeps the cache of table_path when the caller has no better place, the temporary folder."""
+	return os.path.join(tempfile.gettempdir(), "deltatalk-" + os.path.basename(table_path) + ".cache")
+
+
+def table_stats(table):
+	"""Returns how a table uses its contours: rules per contour ID, per context number and per number of syllables,
+	and (count, minimum, mean, maximum) of the points of the syllables of each tone."""
+	by_id = Counter()
+	by_context = Counter()
+	by_syllables = Counter()
+	tone_points = {}
+	points = table.points.tolist()
+	offsets = table.offsets.tolist()
+	for position, number in enumerate(table.rule_ids.tolist()):
+		contour_id = table.contour_ids[number]
+		context, tones = split_contour_id(contour_id)
+		by_id[contour_id] += 1
+		by_context[context] += 1
+		by_syllables[len(tones)] += 1
+		rule_points = points[offsets[position]:offsets[position + 1]]
+		for syllable, tone in enumerate(tones):
+			tone_points.setdefault(tone, []).extend(table.syllable_points(rule_points, syllable))
+	tones = {
+		tone: (len(values), min(values), sum(values) / len(values), max(values))
+		for tone, values in tone_points.items()
+	}
+	return {"ids": by_id, "contexts": by_context, "syllables": by_syllables, "tones": tones}
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Decodes and summarizes the DeltaTalk intonation tables.")
+	parser.add_argument(
+		"--table",
+		default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "deltatalk", "brazil.f0"),
+		help="brazil.f0 or brazilf0.HHS",
+	)
+	parser.add_argument("--cache", help="where to keep the binary cache (by default in the temporary folder)")
+	commands = parser.add_subparsers(dest="command", required=True)
+	stats = commands.add_parser("stats", help="how many rules use each contour, context and tone")
+	stats.add_argument("--top", type=int, default=15, help="contour IDs listed")
+	show = commands.add_parser("show", help="the variants of contour IDs, syllable by syllable")
+	show.add_argument("contour_ids", nargs="+", metavar="ID")
+	args = parser.parse_args(argv)
+	try:
+		table = IntonationTable.load(args.table, args.cache or default_cache_path(args.table))
+	except IntonationError as e:
+		print(e, file=sys.stderr)
+		return 1
+	try:
+		print(f"{os.path.basename(args.table)}: {len(table)} rules, {len(table.contour_ids)} contour IDs, "
+			f"{table.pitch_points} points per syllable, {table.leading_points} leading")
+		if args.command == "stats":
+			usage = table_stats(table)
+			print("Rules per contour ID:")
+			for contour_id, count in usage["ids"].most_common(args.top):
+				print(f"  {count:5d}  {contour_id}")
+			print("Rules per context: " + ", ".join(f"{context}: {count}" for context, count in sorted(usage["contexts"].items())))
+			print("Rules per syllables: " + ", ".join(f"{size}: {count}" for size, count in sorted(usage["syllables"].items())))
+			print("Points per tone:")
+			for tone, (count, low, mean, high) in sorted(usage["tones"].items(), key=lambda item: -item[1][0]):
+				print(f"  {tone:5s} {count:6d} points, {low:6.2f} to {high:5.2f}, mean {mean:5.2f}")
+			return 0
+		status = 0
+		for contour_id in args.contour_ids:
+			contour_id = " ".join(contour_id.split())
+			variants = table.variants(contour_id)
+			if not variants:
+				print(f"{contour_id}: no rule", file=sys.stderr)
+				status = 1
+				continue
+			print(f"{contour_id}: {len(variants)} variants")
+			_context, tones = split_contour_id(contour_id)
+			for position in variants:
+				points = table.rule(position).points.tolist()
+				leading = " ".join(f"{value:g}" for value in points[:table.leading_points])
+				syllables = " | ".join(
+					f"{tone} " + " ".join(f"{value:g}" for value in table.syllable_points(points, syllable))
+					for syllable, tone in enumerate(tones))
+				print(f"  {leading + ' | ' if leading else ''}{syllables}")
+		return status
+	finally:
+		table.close()
+
+
+if __name__ == "__main__":
+	sys.exit(main())
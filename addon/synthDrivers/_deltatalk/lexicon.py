@@ -0,0 +1,287 @@
+# synthDrivers/_deltatalk/lexicon.py
+# Index of the brport.lng pronunciation lexicon
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Pronunciation lexicon.
+
+brport.lng, in the engine's cp1252, has three sections separated by lines holding a single *:
+- words: word, class (V verb, - noun, D adverb, P pronoun...), transcription with ' before the
+  stressed vowel, then numeric flags;
+- class rules: pairs of classes and the class they resolve to;
+- suffix rules: ending, number of letters it replaces, ending of the lemma, transcription of the
+  ending, class, then flags. "uem 3 ar" reads apaguem as a form of apagar.
+The flags are kept as they are, since only the engine knows what they mean.
+
+Parsing takes a while, so load keeps a binary index of it, rebuilt whenever the lexicon changes.
+Layout, little-endian:
+- header: magic, format version, reserved, fingerprint of the lexicon, word count, suffix rule count,
+  class rule count, length of the text;
+- offsets: word count + 1 offsets into the text of the word records, sorted by word;
+- text: in UTF-8, the sorted words joined by newlines, then the records of the words, then the suffix
+  rules and the class rules, fields separated by tabs and records by newlines.
+
+Run from the synthDrivers folder with: python -m _deltatalk.lexicon [--lexicon brport.lng]
+[--dictionary file] word... to see how each word would be read, after the user dictionary.
+"""
+
+import argparse
+import array
+import os
+import re
+import struct
+import sys
+import tempfile
+from collections import namedtuple
+
+from .dictionary import DictionaryError, UserDictionary
+from .phrasecache import fingerprint_files
+
+MAGIC = b"DTLX"
+VERSION = 1
+_HEADER = struct.Struct("<4sHH20sIIII")
+LEXICON_ENCODING = "cp1252"
+SECTION_SEPARATOR = "*"
+# Words, as the engine splits them
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:-[^\W\d_]+)*")
+
+LexiconEntry = namedtuple("LexiconEntry", ("word", "word_class", "transcription", "flags"))
+SuffixRule = namedtuple("SuffixRule", ("suffix", "length", "ending", "transcription", "word_class", "flags"))
+SuffixRule.__doc__ = """Words ending in suffix are forms of the word with their last length letters replaced by ending."""
+SuffixMatch = namedtuple("SuffixMatch", ("rule", "lemma", "entries"))
+
+
+class LexiconError(Exception):
+	"""Raised when a lexicon or its index cannot be read."""
+
+
+def parse_lexicon(lines):
+	"""Returns the LexiconEntries, SuffixRules and class rules (tuples of fields) of the lines of a lexicon, in file order."""
+	entries = []
+	suffix_rules = []
+	class_rules = []
+	section = 0
+	for number, line in enumerate(lines, 1):
+		line = line.rstrip("\r\n")
+		if not line:
+			continue
+		if line == SECTION_SEPARATOR:
+			section += 1
+			continue
+		fields = line.split("\t")
+		if section == 0:
+			if len(fields) < 3:
+				raise LexiconError(f"Line {number}: expected a word, a class and a transcription")
+			entries.append(LexiconEntry(fields[0], fields[1], fields[2], tuple(fields[3:])))
+		elif section == 1:
+			class_rules.append(tuple(fields))
+		else:
+			try:
+				length = int(fields[1])
+			except (IndexError, ValueError):
+				raise LexiconError(f"Line {number}: expected a suffix and the number of letters it replaces")
+			fields += [""] * (5 - len(fields))
+			suffix_rules.append(SuffixRule(fields[0], length, fields[2], fields[3], fields[4], tuple(fields[5:])))
+	return entries, suffix_rules, class_rules
+
+
+def _join(records):
+	return "\n".join("\t".join(record) for record in records)
+
+
+def write_index(path, fingerprint, entries, suffix_rules, class_rules):
+	"""Writes the binary index of a parsed lexicon to path, replacing it once complete."""
+	entries = sorted(entries, key=lambda entry: entry.word)
+	records = [_join([(entry.word_class, entry.transcription) + entry.flags]) for entry in entries]
+	words = "\n".join(entry.word for entry in entries)
+	offsets = array.array("I")
+	offset = len(words.encode("utf-8")) + 1
+	for record in records:
+		offsets.append(offset)
+		offset += len(record.encode("utf-8")) + 1
+	offsets.append(offset)
+	text = "\n".join([words] + records) + "\n"
+	text += _join((rule.suffix, str(rule.length), rule.ending, rule.transcription, rule.word_class) + rule.flags
+		for rule in suffix_rules) + "\n"
+	text += _join(class_rules)
+	data = text.encode("utf-8")
+	temp_path = path + ".tmp"
+	try:
+		with open(temp_path, "wb") as f:
+			f.write(_HEADER.pack(
+				MAGIC, VERSION, 0, fingerprint, len(entries), len(suffix_rules), len(class_rules), len(data)))
+			f.write(offsets.tobytes())
+			f.write(data)
+	except BaseException:
+		if os.path.exists(temp_path):
+			os.remove(temp_path)
+		raise
+	os.replace(temp_path, path)
+
+
+class Lexicon:
+	"""The words and rules of a lexicon, from its binary index.
+
+	Words are kept sorted, with their records in one bytes object and an array of offsets into it;
+	a dict from each word to its position makes lookups cost one hash, and records are decoded
+	only when looked up.
+	"""
+
+	def __init__(self, index_path, fingerprint=None):
+		try:
+			with open(index_path, "rb") as f:
+				data = f.read()
+		except OSError as e:
+			raise LexiconError(str(e))
+		try:
+			magic, version, _reserved, file_fingerprint, count, suffix_count, class_count, length = (
+				_HEADER.unpack_from(data))
+		except struct.error as e:
+			raise LexiconError(str(e))
+		if magic != MAGIC or version != VERSION:
+			raise LexiconError("not a lexicon index of this version")
+		if fingerprint is not None and file_fingerprint != fingerprint:
+			raise LexiconError("built for another lexicon")
+		start = _HEADER.size + 4 * (count + 1)
+		if start + length != len(data):
+			raise LexiconError("truncated")
+		self._offsets = array.array("I")
+		self._offsets.frombytes(data[_HEADER.size:start])
+		self._data = data[start:]
+		self._found = {}  # Word: its entries, as they are looked up
+		words_end = self._offsets[0] - 1 if count else 0
+		self.words = self._data[:words_end].decode("utf-8").split("\n") if count else []
+		self._positions = {}
+		for position, word in enumerate(self.words):
+			# Homographs are adjacent; the first one leads to the others
+			self._positions.setdefault(word, position)
+		rules = self._data[self._offsets[-1] if count else 0:].decode("utf-8").split("\n")
+		self.suffix_rules = []
+		for line in rules[:suffix_count]:
+			fields = line.split("\t")
+			self.suffix_rules.append(SuffixRule(fields[0], int(fields[1]), fields[2], fields[3], fields[4], tuple(fields[5:])))
+		self.class_rules = [tuple(line.split("\t")) for line in rules[suffix_count:suffix_count + class_count]]
+		self._suffixes = {}  # Suffix: its rules
+		for rule in self.suffix_rules:
+			self._suffixes.setdefault(rule.suffix, []).append(rule)
+		# Longest first, so the most specific rule matches first
+		self._suffix_lengths = sorted({len(suffix) for suffix in self._suffixes}, reverse=True)
+
+	@classmethod
+	def load(cls, lexicon_path, index_path):
+		"""Opens the index of the lexicon at lexicon_path, building it at index_path if it is missing or stale.
+
+		@raise LexiconError: if the lexicon cannot be read or parsed.
+		"""
+		try:
+			fingerprint = fingerprint_files([lexicon_path])
+		except OSError as e:
+			raise LexiconError(str(e))
+		try:
+			return cls(index_path, fingerprint)
+		except LexiconError:
+			pass
+		with open(lexicon_path, encoding=LEXICON_ENCODING, newline="") as f:
+			entries, suffix_rules, class_rules = parse_lexicon(f)
+		try:
+			write_index(index_path, fingerprint, entries, suffix_rules, class_rules)
+		except OSError as e:
+			raise LexiconError(str(e))
+		return cls(index_path, fingerprint)
+
+	def __len__(self):
+		return len(self.words)
+
+	def __contains__(self, word):
+		return word in self._positions or word.lower() in self._positions
+
+	def _entry(self, position):
+		record = self._data[self._offsets[position]:self._offsets[position + 1] - 1].decode("utf-8").split("\t")
+		return LexiconEntry(self.words[position], record[0], record[1], tuple(record[2:]))
+
+	def lookup(self, word):
+		"""Returns the LexiconEntries of word, or of word in lower case, in file order; empty if it is not in the lexicon."""
+		found = self._found.get(word)
+		if found is not None:
+			return found
+		position = self._positions.get(word)
+		if position is None:
+			position = self._positions.get(word.lower())
+			if position is None:
+				return ()
+		entries = []
+		key = self.words[position]
+		while position < len(self.words) and self.words[position] == key:
+			entries.append(self._entry(position))
+			position += 1
+		self._found[word] = entries = tuple(entries)
+		return entries
+
+	def match_suffixes(self, word):
+		"""Yields a SuffixMatch for each suffix rule that reads word as a form of a word of the lexicon, longest suffix first."""
+		word = word.lower()
+		for length in self._suffix_lengths:
+			if length >= len(word):
+				continue
+			for rule in self._suffixes.get(word[-length:], ()):
+				if rule.length > len(word):
+					continue
+				lemma = word[:len(word) - rule.length] + rule.ending
+				entries = self.lookup(lemma)
+				if entries:
+					yield SuffixMatch(rule, lemma, entries)
+
+
+def default_index_path(lexicon_path):
+	"""Where load keeps the index of lexicon_path when the caller has no better place, the temporary folder."""
+	return os.path.join(tempfile.gettempdir(), "deltatalk-" + os.path.basename(lexicon_path) + ".idx")
+
+
+def explain(word, lexicon, dictionary=None):
+	"""Returns lines telling how the engine reads word: a user dictionary entry, a lexicon entry, a suffix rule or its letter rules."""
+	lines = []
+	if dictionary:
+		spoken, replacements = dictionary.rewrite(word)
+		if replacements:
+			lines.append(f"user dictionary: {spoken}")
+			word = spoken
+	entries = lexicon.lookup(word)
+	for entry in entries:
+		lines.append(f"lexicon: {entry.transcription} (class {entry.word_class or '-'})")
+	matches = [] if entries else list(lexicon.match_suffixes(word))
+	for match in matches:
+		lines.append(
+			f"suffix -{match.rule.suffix}: form of {match.lemma} ({match.entries[0].transcription}), "
+			f"ending read {match.rule.transcription or 'silently'}")
+	if not entries and not matches:
+		lines.append("not in the lexicon: read by the letter to sound rules")
+	return lines
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Tells how DeltaTalk reads words, from its lexicon and the user dictionary.")
+	parser.add_argument("words", nargs="+")
+	parser.add_argument(
+		"--lexicon",
+		default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "deltatalk", "brport.lng"),
+	)
+	parser.add_argument("--index", help="where to keep the binary index (by default in the temporary folder)")
+	parser.add_argument("--dictionary", help="user dictionary file")
+	args = parser.parse_args(argv)
+	try:
+		lexicon = Lexicon.load(args.lexicon, args.index or default_index_path(args.lexicon))
+		dictionary = UserDictionary.read(args.dictionary) if args.dictionary else None
+	except (OSError, UnicodeDecodeError, LexiconError, DictionaryError) as e:
+		print(e, file=sys.stderr)
+		return 1
+	for word in args.words:
+		print(word)
+		for line in explain(word, lexicon, dictionary):
+			print("  " + line)
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,152 @@
+# synthDrivers/_deltatalk/pacing.py
+# Buffer-level pacing of TTSENG_GenAudioBuffer calls
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import threading
+import time
+from collections import deque
+
+# Milliseconds of queued audio below which the next block is generated
+DEFAULT_LOW_WATER_MS = 300
+
+
+class PacingStats:
+	"""Metrics collected by PacingScheduler."""
+
+	def __init__(self, history=100):
+		# Seconds between the start of each utterance and its first block reaching the player
+		self.time_to_first_audio = deque(maxlen=history)
+		# Blocks fed after the player had already run out of audio in the middle of an utterance
+		self.underruns = 0
+		self.utterances = 0
+		self.blocks = 0
+
+	def last_time_to_first_audio_ms(self):
+		return self.time_to_first_audio[-1] * 1000 if self.time_to_first_audio else None
+
+
+class PacingScheduler:
+	"""Decides when the next block may be generated, based on how much audio is queued in the player.
+
+	nvwave does not report how much audio it still has to play, so it is estimated from the
+	duration of every block fed and the time elapsed since.
+	Generation runs freely while less than low_water_ms is queued,
+	otherwise wait_for_room sleeps exactly until the queue drains to that point.
+	An utterance may come with its expected duration, which tells how much of it is still to be
+	generated, and is compared with what it played once it ends.
+	"""
+
+	def __init__(self, low_water_ms=DEFAULT_LOW_WATER_MS, clock=time.monotonic):
+		self.low_water_ms = low_water_ms
+		self.stats = PacingStats()
+		self._clock = clock
+		self._cond = threading.Condition()
+		self._play_end = 0.0  # When the audio fed so far finishes playing
+		self._paused_at = None
+		self._resets = 0
+		self._utterance_start = None
+		self._bytes_per_second = 1
+		self._waiting_first_block = False
+		self._expected_ms = None
+		self._utterance_bytes = 0
+		self._utterance_resets = 0
+
+	def start_utterance(self, bytes_per_second, expected_ms=None):
+		"""Marks the start of a new utterance whose audio has the given byte rate, expected to last expected_ms."""
+		with self._cond:
+			self._utterance_start = self._clock()
+			self._bytes_per_second = bytes_per_second
+			self._waiting_first_block = True
+			self._expected_ms = expected_ms
+			self._utterance_bytes = 0
+			self._utterance_resets = self._resets
+			self.stats.utterances += 1
+
+	def end_utterance(self):
+		"""Ends the utterance, returning its expected and played durations in ms.
+
+		Returns None if it had no expected duration, played nothing or was interrupted by reset.
+		"""
+		with self._cond:
+			measured = None
+			if (
+				self._expected_ms and self._utterance_bytes and self._utterance_start is not None
+				and self._utterance_resets == self._resets
+			):
+				measured = (self._expected_ms, self._utterance_bytes / self._bytes_per_second * 1000)
+			self._utterance_start = None
+			self._waiting_first_block = False
+			self._expected_ms = None
+			return measured
+
+	def fed(self, length):
+		"""Records a block of length bytes handed to the player."""
+		with self._cond:
+			now = self._clock()
+			self.stats.blocks += 1
+			if self._waiting_first_block:
+				self.stats.time_to_first_audio.append(now - self._utterance_start)
+				self._waiting_first_block = False
+			elif self._paused_at is None and self._play_end < now:
+				self.stats.underruns += 1
+			start = self._play_end if self._paused_at is not None else max(self._play_end, now)
+			self._play_end = start + length / self._bytes_per_second
+			self._utterance_bytes += length
+
+	def queued_ms(self):
+		"""Estimated milliseconds of audio the player still has to play."""
+		with self._cond:
+			return self._queued_ms(self._clock())
+
+	def remaining_ms(self):
+		"""Estimated milliseconds until the current utterance has played: the audio queued, and the part
+		of its expected duration not generated yet."""
+		with self._cond:
+			remaining = self._queued_ms(self._clock())
+			if self._expected_ms is not None:
+				remaining += max(0.0, self._expected_ms - self._utterance_bytes / self._bytes_per_second * 1000)
+			return remaining
+
+	def _queued_ms(self, now):
+		if self._paused_at is not None:
+			now = self._paused_at
+		return max(0.0, self._play_end - now) * 1000
+
+	def wait_for_room(self):
+		"""Sleeps until the queued audio drops to the low-water mark, or until reset is called.
+
+		Returns the time slept, in seconds.
+		"""
+		with self._cond:
+			start = self._clock()
+			resets = self._resets
+			while resets == self._resets:
+				now = self._clock()
+				excess = self._queued_ms(now) - self.low_water_ms
+				if excess <= 0:
+					break
+				# While paused the queue does not drain, so just wait to be woken up
+				self._cond.wait(excess / 1000 if self._paused_at is None else None)
+			return self._clock() - start
+
+	def pause(self, switch):
+		"""Freezes the estimate while the player is paused."""
+		with self._cond:
+			now = self._clock()
+			if switch and self._paused_at is None:
+				self._paused_at = now
+			elif not switch and self._paused_at is not None:
+				self._play_end += now - self._paused_at
+				self._paused_at = None
+			self._cond.notify_all()
+
+	def reset(self):
+		"""Forgets the queued audio after the player was stopped, waking up any waiter."""
+		with self._cond:
+			self._play_end = 0.0
+			self._paused_at = None
+			self._resets += 1
+			self._cond.notify_all()
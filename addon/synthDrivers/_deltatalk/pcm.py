@@ -0,0 +1,52 @@
+# synthDrivers/_deltatalk/pcm.py
+# Reusable PCM buffer shared by Dtalk32.dll and nvwave
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import ctypes
+import inspect
+
+# Size in bytes of each block requested from TTSENG_GenAudioBuffer
+PCM_BLOCK_SIZE = 16384
+
+
+class PCMBuffer:
+	"""Block buffer allocated once per engine instance and filled in place by TTSENG_GenAudioBuffer."""
+
+	def __init__(self, size=PCM_BLOCK_SIZE):
+		self.size = size
+		self.buffer = (ctypes.c_ubyte * size)()
+		self.address = ctypes.addressof(self.buffer)
+		# The ctypes format of the array is "<B", cast it so slices behave like plain bytes
+		self.view = memoryview(self.buffer).cast("B")
+
+	def block(self, length):
+		"""Returns a memoryview over the first length bytes written by the engine."""
+		return self.view[:length]
+
+
+def make_pcm_feeder(player):
+	"""Returns a function feeding PCM to an nvwave player with as few copies as it allows.
+
+	The function takes a source exposing address and view attributes, such as a PCMBuffer,
+	a length and optionally an offset into the source.
+
+	Since NVDA 2023.2, WavePlayer.feed accepts a pointer and a size and copies the data itself,
+	so the block is handed over without any copy on our side.
+	Older players only take bytes, so the block is copied once with memoryview.tobytes().
+	Both paths copy before returning, which is what makes reusing the buffer safe.
+	"""
+	try:
+		accepts_pointer = "size" in inspect.signature(player.feed).parameters
+	except (TypeError, ValueError):
+		accepts_pointer = False
+
+	if accepts_pointer:
+		def feed(source, length, onDone=None, offset=0):
+			player.feed(ctypes.c_void_p(source.address + offset), size=length, onDone=onDone)
+	else:
+		def feed(source, length, onDone=None, offset=0):
+			player.feed(source.view[offset:offset + length].tobytes(), onDone=onDone)
+	return feed
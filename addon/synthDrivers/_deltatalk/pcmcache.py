@@ -0,0 +1,94 @@
+# synthDrivers/_deltatalk/pcmcache.py
+# In-memory LRU cache of synthesized PCM
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+# Longer texts are rarely repeated and would push the short ones out
+DEFAULT_MAX_TEXT_LENGTH = 64
+
+
+def normalize_text(text):
+	"""Collapses whitespace, which does not change what the engine says."""
+	return " ".join(text.split())
+
+
+class PCMCache:
+	"""Least recently used cache of the PCM of short utterances, bounded by a byte budget.
+
+	Keys are built with make_key from the text and the DeltaTalk scale settings it was spoken with,
+	as sent to TTSENG_SetMode, so a setting change never plays stale audio.
+	"""
+
+	def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_text_length=DEFAULT_MAX_TEXT_LENGTH):
+		self.max_bytes = max_bytes
+		self.max_text_length = max_text_length
+		self.size_bytes = 0
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self._entries = OrderedDict()
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def make_key(text, voice, rate, pitch, volume):
+		return (normalize_text(text), voice, rate, pitch, volume)
+
+	def cacheable(self, text):
+		return self.max_bytes > 0 and len(text) <= self.max_text_length
+
+	def get(self, key):
+		"""Returns the PCM stored for key, or None, counting the hit or miss."""
+		with self._lock:
+			pcm = self._entries.get(key)
+			if pcm is None:
+				self.misses += 1
+				return None
+			self._entries.move_to_end(key)
+			self.hits += 1
+			return pcm
+
+	def put(self, key, pcm):
+		"""Stores pcm under key, evicting the least recently used entries to stay within the budget."""
+		pcm = bytes(pcm)
+		if len(pcm) > self.max_bytes:
+			return
+		with self._lock:
+			previous = self._entries.pop(key, None)
+			if previous is not None:
+				self.size_bytes -= len(previous)
+			while self._entries and self.size_bytes + len(pcm) > self.max_bytes:
+				_key, evicted = self._entries.popitem(last=False)
+				self.size_bytes -= len(evicted)
+				self.evictions += 1
+			self._entries[key] = pcm
+			self.size_bytes += len(pcm)
+
+	def __contains__(self, key):
+		with self._lock:
+			return key in self._entries
+
+	def __len__(self):
+		return len(self._entries)
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self.size_bytes = 0
+
+	def stats(self):
+		with self._lock:
+			lookups = self.hits + self.misses
+			return {
+				"entries": len(self._entries),
+				"bytes": self.size_bytes,
+				"hits": self.hits,
+				"misses": self.misses,
+				"evictions": self.evictions,
+				"hit_ratio": self.hits / lookups if lookups else 0.0,
+			}
@@ -0,0 +1,360 @@
+# synthDrivers/_deltatalk/phonemes.py
+# The brazil.alp phoneme alphabet, transcriptions of words and durations estimated from them
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Phoneme alphabet, offline phonetization and duration estimates.
+
+brazil.alp starts with #ALP_FILE#, the name of the alphabet and the number of symbols, then has
+a line per symbol: the symbol, its class (1 vowel, 3 voiced stop, 4 voiceless stop, 5 nasal,
+6 liquid, 7 fricative, 8 glide, 9 pause), a flag set on the vowels and nasals, and its duration
+in milliseconds.
+
+The transcriptions of brport.lng write every symbol as one character, so the symbols of more than
+one letter have a character of their own (LEXICON_SYMBOLS); ' comes before the stressed vowel or its
+syllable and - separates syllables in a few entries.
+
+A word is transcribed from the lexicon, else as a form of a lexicon word through the suffix rules,
+else by rough letter rules. Durations add up the durations of the symbols, with pauses for
+punctuation and the name of each digit of a number other than its zeros (1000 is read mil, 0 zero);
+they follow the alphabet, not the engine, whose timing also depends on the rate and the prosody.
+
+Run from the synthDrivers folder with: python -m _deltatalk.phonemes
+validate | preview word... | check word_list [--processes N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import re
+import sys
+import unicodedata
+from collections import namedtuple
+
+from .lexicon import WORD_PATTERN, Lexicon, LexiconError, default_index_path
+
+ALP_MAGIC = "#ALP_FILE#"
+ALP_ENCODING = "cp1252"
+VOWEL = 1
+PAUSE = "_"
+STRESS = "'"
+SYLLABLE = "-"
+# Characters of the lexicon for symbols of more than one letter, as the words using them show:
+# acolher akoh'e%, abarrotar abaRot'a%, abafar abaf'a%, abocanhar abok@ñ'a%, abel ab'éw, acorde ak'ó%de
+LEXICON_SYMBOLS = {
+	"ä": "am",
+	"ë": "em",
+	"ï": "im",
+	"ö": "om",
+	"ü": "um",
+	"é": "ee",
+	"ó": "oo",
+	"ñ": "nh",
+	"h": "lh",
+	"R": "rr",
+	"%": "r2",
+	"S": "s2",
+}
+# Pauses for punctuation, in pause symbols
+PUNCTUATION_PAUSES = {",": 1, ";": 1, ":": 1, ".": 2, "!": 2, "?": 2}
+DIGIT_NAMES = ("zero", "um", "dois", "três", "quatro", "cinco", "seis", "sete", "oito", "nove")
+
+_NUMBER = re.compile(r"\d+")
+
+Phoneme = namedtuple("Phoneme", ("symbol", "phoneme_class", "flag", "duration"))
+WordReport = namedtuple("WordReport", ("word", "source", "symbols", "duration", "problems"))
+WordReport.__doc__ = """How a word is read: source is lexicon, suffix or letters, symbols are those of the alphabet and duration is in ms."""
+
+
+class AlphabetError(Exception):
+	"""Raised when an alphabet file cannot be read."""
+
+
+class Alphabet:
+	"""The symbols of a phoneme alphabet."""
+
+	def __init__(self, name, phonemes):
+		self.name = name
+		self.phonemes = {phoneme.symbol: phoneme for phoneme in phonemes}
+
+	@classmethod
+	def read(cls, path):
+		"""Reads an .alp file.
+
+		@raise AlphabetError: if the file cannot be read or is not an alphabet.
+		"""
+		try:
+			with open(path, encoding=ALP_ENCODING) as f:
+				lines = [line.strip() for line in f if line.strip()]
+		except OSError as e:
+			raise AlphabetError(str(e))
+		if len(lines) < 3 or lines[0] != ALP_MAGIC:
+			raise AlphabetError("not an alphabet file")
+		phonemes = []
+		for number, line in enumerate(lines[3:], 4):
+			fields = line.split()
+			try:
+				phonemes.append(Phoneme(fields[0], int(fields[1]), int(fields[2]), int(fields[3])))
+			except (IndexError, ValueError):
+				raise AlphabetError(f"Line {number}: expected a symbol, its class, its flag and its duration")
+		if str(len(phonemes)) != lines[2]:
+			raise AlphabetError(f"{len(phonemes)} symbols instead of {lines[2]}")
+		return cls(lines[1], phonemes)
+
+	def __len__(self):
+		return len(self.phonemes)
+
+	def __contains__(self, symbol):
+		return symbol in self.phonemes
+
+	def tokenize(self, transcription):
+		"""Returns the symbols and marks of a lexicon transcription, and the characters that are neither."""
+		tokens = []
+		unknown = []
+		for char in transcription:
+			symbol = LEXICON_SYMBOLS.get(char, char)
+			if symbol in self.phonemes or char in (STRESS, SYLLABLE):
+				tokens.append(symbol)
+			else:
+				unknown.append(char)
+		return tokens, unknown
+
+	def duration(self, symbols):
+		"""Returns the duration of symbols in ms, marks and unknown symbols counting for nothing."""
+		phonemes = self.phonemes
+		return sum(phonemes[symbol].duration for symbol in symbols if symbol in phonemes)
+
+	def is_vowel(self, symbol):
+		phoneme = self.phonemes.get(symbol)
+		return phoneme is not None and phoneme.phoneme_class == VOWEL
+
+	def check(self, transcription, stressed=True):
+		"""Returns the problems of a lexicon transcription; stressed requires a stress mark in words of more than one syllable."""
+		tokens, unknown = self.tokenize(transcription)
+		problems = [f"unknown symbol {char!r}" for char in unknown]
+		if stressed and STRESS not in tokens and sum(map(self.is_vowel, tokens)) > 1:
+			problems.append("no stress mark")
+		stresses = [position for position, token in enumerate(tokens) if token == STRESS] + [len(tokens)]
+		for start, end in zip(stresses, stresses[1:]):
+			if not any(map(self.is_vowel, tokens[start + 1:end])):
+				problems.append("stress mark without a vowel after it")
+		return problems
+
+
+def validate_lexicon(alphabet, lexicon):
+	"""Yields (kind, key, transcription, problems) for each word and suffix rule of lexicon with problems."""
+	for word in dict.fromkeys(lexicon.words):
+		for entry in lexicon.lookup(word):
+			problems = alphabet.check(entry.transcription)
+			if problems:
+				yield "word", word, entry.transcription, problems
+	for rule in lexicon.suffix_rules:
+		problems = alphabet.check(rule.transcription, stressed=False)
+		if problems:
+			yield "suffix", rule.suffix, rule.transcription, problems
+
+
+def _strip_accents(char):
+	return unicodedata.normalize("NFD", char)[0]
+
+
+_VOWEL_LETTERS = set("aeiouáàâãéêíóôõú")
+# Spelled vowels with a quality of their own
+_ACCENTED = {"â": "@", "ã": "am", "é": "ee", "ê": "e", "ó": "oo", "ô": "o", "õ": "om"}
+_LETTERS = {"y": "i", "w": "u", "q": "k"}
+_DIGRAPHS = {"ch": "x", "lh": "lh", "nh": "nh", "rr": "rr", "ss": "s", "qu": "k", "gu": "g"}
+
+
+def letters_to_symbols(word):
+	"""Returns rough alphabet symbols for a word, from its letters alone."""
+	word = word.lower()
+	symbols = []
+	position = 0
+	while position < len(word):
+		char = word[position]
+		pair = word[position:position + 2]
+		following = word[position + 1:position + 2]
+		if pair in _DIGRAPHS and not (pair in ("qu", "gu") and word[position + 2:position + 3] not in ("e", "i")):
+			symbols.append(_DIGRAPHS[pair])
+			position += 2
+			continue
+		if char in _ACCENTED:
+			symbols.append(_ACCENTED[char])
+		elif char == "ç":
+			symbols.append("s")
+		elif char == "c":
+			symbols.append("s" if following in ("e", "i", "é", "ê", "í") else "k")
+		elif char == "g":
+			symbols.append("j" if following in ("e", "i", "é", "ê", "í") else "g")
+		elif char == "h":
+			pass  # Silent
+		elif char == "r":
+			symbols.append("rr" if position == 0 else "r2" if following not in _VOWEL_LETTERS else "r")
+		elif char == "s":
+			between_vowels = position and word[position - 1] in _VOWEL_LETTERS and following in _VOWEL_LETTERS
+			symbols.append("z" if between_vowels else "s2" if not following else "s")
+		elif char in ("m", "n") and following not in _VOWEL_LETTERS and symbols and symbols[-1] in ("a", "e", "i", "o", "u"):
+			# Nasalizes the vowel before it
+			symbols[-1] += "m"
+		else:
+			symbol = _strip_accents(char)
+			symbol = _LETTERS.get(symbol, symbol)
+			if symbol.isalpha():
+				symbols.append(symbol)
+		position += 1
+	return symbols
+
+
+class Phonetizer:
+	"""Transcribes words and estimates durations with an alphabet and a lexicon, without the engine."""
+
+	def __init__(self, alphabet, lexicon):
+		self.alphabet = alphabet
+		self.lexicon = lexicon
+		self._reports = {}  # Word: its WordReport, as words are transcribed
+
+	def _symbols(self, tokens):
+		return tuple(token for token in tokens if token in self.alphabet)
+
+	def word(self, word):
+		"""Returns the WordReport of word."""
+		report = self._reports.get(word)
+		if report is None:
+			self._reports[word] = report = self._transcribe(word)
+		return report
+
+	def forget(self):
+		"""Forgets the words transcribed so far."""
+		self._reports.clear()
+
+	def _transcribe(self, word):
+		entries = self.lexicon.lookup(word)
+		if entries:
+			transcription = entries[0].transcription
+			symbols = self._symbols(self.alphabet.tokenize(transcription)[0])
+			problems = tuple(self.alphabet.check(transcription))
+			return WordReport(word, "lexicon", symbols, self.alphabet.duration(symbols), problems)
+		for match in self.lexicon.match_suffixes(word):
+			stem, _unknown = self.alphabet.tokenize(match.entries[0].transcription)
+			ending, unknown = self.alphabet.tokenize(match.rule.transcription)
+			# The last symbols of the lemma stand for the letters of its ending
+			dropped = 0
+			while stem and dropped < len(match.rule.ending):
+				if stem.pop() not in (STRESS, SYLLABLE):
+					dropped += 1
+			if STRESS in ending:
+				stem = [token for token in stem if token != STRESS]
+			symbols = self._symbols(stem + ending)
+			problems = tuple(f"unknown symbol {char!r}" for char in unknown)
+			return WordReport(word, "suffix", symbols, self.alphabet.duration(symbols), problems)
+		symbols = tuple(letters_to_symbols(word))
+		return WordReport(word, "letters", symbols, self.alphabet.duration(symbols), ())
+
+	def estimate_ms(self, text):
+		"""Returns the estimated duration of text in ms, its words, its digits and the pauses of its punctuation."""
+		duration = sum(self.word(word).duration for word in WORD_PATTERN.findall(text))
+		for number in _NUMBER.findall(text):
+			digits = number.replace("0", "") or "0"
+			duration += sum(self.word(DIGIT_NAMES[int(digit)]).duration for digit in digits)
+		pause = self.alphabet.phonemes.get(PAUSE)
+		if pause:
+			duration += pause.duration * sum(PUNCTUATION_PAUSES.get(char, 0) for char in text)
+		return duration
+
+
+def default_paths():
+	"""Returns the paths of the alphabet and the lexicon shipped with the driver."""
+	data = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "deltatalk")
+	return os.path.join(data, "brazil.alp"), os.path.join(data, "brport.lng")
+
+
+def load_phonetizer(alphabet_path, lexicon_path, index_path=None):
+	"""@raise AlphabetError, LexiconError: if either file cannot be read."""
+	alphabet = Alphabet.read(alphabet_path)
+	lexicon = Lexicon.load(lexicon_path, index_path or default_index_path(lexicon_path))
+	return Phonetizer(alphabet, lexicon)
+
+
+_worker_phonetizer = None
+
+
+def _init_worker(alphabet_path, lexicon_path, index_path):
+	global _worker_phonetizer
+	_worker_phonetizer = load_phonetizer(alphabet_path, lexicon_path, index_path)
+
+
+def _report_words(words):
+	return [_worker_phonetizer.word(word) for word in words]
+
+
+def check_words(words, alphabet_path, lexicon_path, index_path=None, processes=None, batch=500):
+	"""Yields the WordReport of each of words, in order, transcribed by processes worker processes.
+
+	Every process loads the alphabet and the lexicon index once; the index is built first if needed,
+	so the processes never race to write it.
+	"""
+	index_path = index_path or default_index_path(lexicon_path)
+	load_phonetizer(alphabet_path, lexicon_path, index_path)
+	words = list(words)
+	batches = [words[start:start + batch] for start in range(0, len(words), batch)]
+	with multiprocessing.Pool(processes, _init_worker, (alphabet_path, lexicon_path, index_path)) as pool:
+		for reports in pool.imap(_report_words, batches):
+			yield from reports
+
+
+def _format_report(report):
+	problems = "; ".join(report.problems)
+	return f"{report.word}\t{report.source}\t{' '.join(report.symbols)}\t{report.duration}\t{problems}"
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Checks and previews DeltaTalk transcriptions without the engine.")
+	alphabet_path, lexicon_path = default_paths()
+	parser.add_argument("--alphabet", default=alphabet_path)
+	parser.add_argument("--lexicon", default=lexicon_path)
+	parser.add_argument("--index", help="where to keep the binary index of the lexicon")
+	commands = parser.add_subparsers(dest="command", required=True)
+	commands.add_parser("validate", help="check every transcription of the lexicon against the alphabet")
+	preview = commands.add_parser("preview", help="show how words or sentences are transcribed")
+	preview.add_argument("texts", nargs="+")
+	check = commands.add_parser("check", help="transcribe a word list, one word per line, in parallel")
+	check.add_argument("word_list")
+	check.add_argument("--processes", type=int, help="worker processes (by default one per CPU)")
+	args = parser.parse_args(argv)
+	try:
+		phonetizer = load_phonetizer(args.alphabet, args.lexicon, args.index)
+	except (AlphabetError, LexiconError) as e:
+		print(e, file=sys.stderr)
+		return 1
+	if args.command == "validate":
+		count = 0
+		for kind, key, transcription, problems in validate_lexicon(phonetizer.alphabet, phonetizer.lexicon):
+			print(f"{kind} {key}\t{transcription}\t{'; '.join(problems)}")
+			count += 1
+		print(f"{count} problems in {len(phonetizer.lexicon)} words and {len(phonetizer.lexicon.suffix_rules)} suffix rules "
+			f"of {phonetizer.alphabet.name} ({len(phonetizer.alphabet)} symbols)", file=sys.stderr)
+		return 1 if count else 0
+	if args.command == "preview":
+		for text in args.texts:
+			for word in WORD_PATTERN.findall(text):
+				print(_format_report(phonetizer.word(word)))
+			print(f"{text}: about {phonetizer.estimate_ms(text)} ms")
+		return 0
+	try:
+		with open(args.word_list, encoding="utf-8-sig") as f:
+			words = [line.strip() for line in f if line.strip()]
+	except (OSError, UnicodeDecodeError) as e:
+		print(e, file=sys.stderr)
+		return 1
+	sources = {}
+	for report in check_words(words, args.alphabet, args.lexicon, args.index, args.processes):
+		print(_format_report(report))
+		sources[report.source] = sources.get(report.source, 0) + 1
+	print(", ".join(f"{count} from {source}" for source, count in sorted(sources.items())), file=sys.stderr)
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
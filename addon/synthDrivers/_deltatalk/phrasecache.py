@@ -0,0 +1,230 @@
+# synthDrivers/_deltatalk/phrasecache.py
+# Persistent, memory-mapped cache of pre-rendered phrases
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Phrase cache files.
+
+Layout, little-endian:
+- header: magic, format version, reserved, fingerprint, entry count, index offset;
+- data: for each entry, its key in UTF-8 followed by its PCM;
+- index: one record per entry (key hash, data offset, key length, PCM length), sorted by key hash.
+
+The fingerprint covers the engine files and the settings the phrases were rendered with
+(fingerprint_settings), so a file rendered for other settings is rebuilt rather than left to miss.
+Opening a file only maps it; lookups binary search the mapped index and return offsets into the map.
+"""
+
+import ctypes
+import hashlib
+import mmap
+import os
+import struct
+import threading
+
+MAGIC = b"DTPC"
+VERSION = 1
+_HEADER = struct.Struct("<4sHH20sII")
+_ENTRY = struct.Struct("<QIII")
+
+
+class PhraseCacheError(Exception):
+	"""Raised when a phrase cache file is missing, corrupt or stale."""
+
+
+def fingerprint_files(paths):
+	"""Returns the SHA-1 of the names and contents of paths, which changes whenever one of them does."""
+	digest = hashlib.sha1()
+	for path in sorted(paths):
+		digest.update(os.path.basename(path).encode("utf-8"))
+		with open(path, "rb") as f:
+			digest.update(f.read())
+	return digest.digest()
+
+
+def fingerprint_settings(fingerprint, settings):
+	"""Returns the SHA-1 of a fingerprint_files result and settings, a tuple of ints and strings."""
+	digest = hashlib.sha1(fingerprint)
+	digest.update(repr(settings).encode("utf-8"))
+	return digest.digest()
+
+
+def fingerprint_stats(paths):
+	"""Returns the SHA-1 of the names, sizes and modification times of paths, without reading them.
+
+	@raise OSError: if one of them cannot be read.
+	"""
+	digest = hashlib.sha1()
+	for path in sorted(paths):
+		stat = os.stat(path)
+		digest.update("{}\x1f{}\x1f{}\n".format(os.path.basename(path), stat.st_size, stat.st_mtime_ns).encode("utf-8"))
+	return digest.digest()
+
+
+def encode_key(key):
+	"""Serializes a key tuple, as built by PCMCache.make_key."""
+	return "\x1f".join(str(part) for part in key).encode("utf-8")
+
+
+def _hash_key(key_bytes):
+	return int.from_bytes(hashlib.blake2b(key_bytes, digest_size=8).digest(), "little")
+
+
+def write_phrase_cache(path, fingerprint, entries):
+	"""Writes entries, an iterable of (key, pcm) pairs, to path.
+
+	Entries are streamed to a temporary file that replaces path once complete,
+	so readers never see a partial file. If entries raises, nothing is written.
+	"""
+	temp_path = path + ".tmp"
+	index = []
+	try:
+		with open(temp_path, "wb") as f:
+			f.write(b"\0" * _HEADER.size)
+			offset = _HEADER.size
+			for key, pcm in entries:
+				key_bytes = encode_key(key)
+				f.write(key_bytes)
+				f.write(pcm)
+				index.append((_hash_key(key_bytes), offset, len(key_bytes), len(pcm)))
+				offset += len(key_bytes) + len(pcm)
+			index.sort()
+			for record in index:
+				f.write(_ENTRY.pack(*record))
+			f.seek(0)
+			f.write(_HEADER.pack(MAGIC, VERSION, 0, fingerprint, len(index), offset))
+	except BaseException:
+		os.remove(temp_path)
+		raise
+	os.replace(temp_path, path)
+	return len(index)
+
+
+class PhraseCache:
+	"""A phrase cache file mapped in memory.
+
+	It exposes address and view like PCMBuffer, so lookups can be fed to nvwave straight from the map.
+	Whoever feeds from it holds it with acquire until the block is fed, and close waits for the last
+	release, so replacing a cache never unmaps audio still queued for the player.
+	@raise PhraseCacheError: if the file does not exist, is corrupt or was built for other engine files or settings.
+	"""
+
+	def __init__(self, path, fingerprint):
+		self.path = path
+		self.fingerprint = fingerprint
+		self.hits = 0
+		self.misses = 0
+		self._lock = threading.Lock()
+		self._users = 0
+		self._closing = False
+		try:
+			self._file = open(path, "rb")
+		except OSError as e:
+			raise PhraseCacheError(str(e))
+		try:
+			# Copy-on-write, so ctypes can take the address of the map; nothing ever writes to it
+			self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_COPY)
+		except (OSError, ValueError) as e:
+			raise PhraseCacheError(str(e))
+		finally:
+			# The map holds a handle of its own, so a cache replaced by a rebuild keeps no file open
+			self._file.close()
+		try:
+			magic, version, _reserved, file_fingerprint, count, index_offset = _HEADER.unpack_from(self._mmap)
+		except struct.error as e:
+			self.close()
+			raise PhraseCacheError(str(e))
+		if magic != MAGIC or version != VERSION:
+			self.close()
+			raise PhraseCacheError("not a phrase cache file of this version")
+		if file_fingerprint != fingerprint:
+			self.close()
+			raise PhraseCacheError("built for other engine files or settings")
+		if index_offset + count * _ENTRY.size > len(self._mmap):
+			self.close()
+			raise PhraseCacheError("truncated")
+		self.count = count
+		self._index_offset = index_offset
+		self._base = ctypes.c_char.from_buffer(self._mmap)
+		self.address = ctypes.addressof(self._base)
+		self.view = memoryview(self._mmap)
+
+	def _entry(self, position):
+		return _ENTRY.unpack_from(self._mmap, self._index_offset + position * _ENTRY.size)
+
+	def _find(self, key):
+		key_bytes = encode_key(key)
+		key_hash = _hash_key(key_bytes)
+		low, high = 0, self.count
+		while low < high:
+			middle = (low + high) // 2
+			if self._entry(middle)[0] < key_hash:
+				low = middle + 1
+			else:
+				high = middle
+		while low < self.count:
+			entry_hash, offset, key_length, pcm_length = self._entry(low)
+			if entry_hash != key_hash:
+				break
+			if self._mmap[offset:offset + key_length] == key_bytes:
+				return offset + key_length, pcm_length
+			low += 1
+		return None
+
+	def acquire(self):
+		"""Keeps the map open until release is called. Returns False if the cache is closed or closing."""
+		with self._lock:
+			if self._closing:
+				return False
+			self._users += 1
+			return True
+
+	def release(self):
+		with self._lock:
+			self._users -= 1
+			if not (self._closing and self._users == 0):
+				return
+		self._unmap()
+
+	def lookup(self, key):
+		"""Returns (offset, length) of the PCM stored for a PCMCache key, or None, also once closed."""
+		if not self.acquire():
+			return None
+		try:
+			found = self._find(key)
+		finally:
+			self.release()
+		if found:
+			self.hits += 1
+		else:
+			self.misses += 1
+		return found
+
+	def __contains__(self, key):
+		if not self.acquire():
+			return False
+		try:
+			return self._find(key) is not None
+		finally:
+			self.release()
+
+	def close(self):
+		"""Unmaps the file, or has the last release do it if the cache is held."""
+		with self._lock:
+			self._closing = True
+			if self._users:
+				return
+		self._unmap()
+
+	def _unmap(self):
+		view = self.__dict__.pop("view", None)
+		if view is not None:
+			view.release()
+		# Drops the ctypes export of the map, which would keep it from closing
+		self.__dict__.pop("_base", None)
+		if getattr(self, "_mmap", None) is not None:
+			self._mmap.close()
+			self._mmap = None
+		self._file.close()
@@ -0,0 +1,74 @@
+# synthDrivers/_deltatalk/players.py
+# Long-lived audio players, one per sample rate
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from .pcm import make_pcm_feeder
+
+Output = namedtuple("Output", ("player", "feed", "sample_rate"))
+Output.__doc__ = """An open player, with the feed function make_pcm_feeder returned for it."""
+
+# The voices have two sample rates, so two players avoid every reopen
+DEFAULT_MAX_PLAYERS = 2
+
+
+class PlayerPool:
+	"""Players kept open across voice changes, so that switching voices does not reopen the audio device.
+
+	open_player(sample_rate) opens a player such as nvwave.WavePlayer. Beyond max_players,
+	the player used least recently is closed.
+	"""
+
+	def __init__(self, open_player, max_players=DEFAULT_MAX_PLAYERS, clock=time.perf_counter):
+		self.max_players = max_players
+		self._open_player = open_player
+		self._clock = clock
+		self._outputs = OrderedDict()
+		self._lock = threading.Lock()
+		self.opened = 0
+		self.reused = 0
+		self.open_time = 0.0  # Seconds spent opening players
+
+	def get(self, sample_rate):
+		"""Returns the Output for sample_rate, opening its player if needed."""
+		with self._lock:
+			output = self._outputs.get(sample_rate)
+			if output:
+				self._outputs.move_to_end(sample_rate)
+				self.reused += 1
+				return output
+			start = self._clock()
+			player = self._open_player(sample_rate)
+			self.open_time += self._clock() - start
+			self.opened += 1
+			output = self._outputs[sample_rate] = Output(player, make_pcm_feeder(player), sample_rate)
+			while len(self._outputs) > self.max_players:
+				_rate, evicted = self._outputs.popitem(last=False)
+				evicted.player.close()
+			return output
+
+	@property
+	def players(self):
+		with self._lock:
+			return [output.player for output in self._outputs.values()]
+
+	def stop(self):
+		for player in self.players:
+			player.stop()
+
+	def pause(self, switch):
+		for player in self.players:
+			player.pause(switch)
+
+	def close(self):
+		with self._lock:
+			outputs = list(self._outputs.values())
+			self._outputs.clear()
+		for output in outputs:
+			output.player.close()
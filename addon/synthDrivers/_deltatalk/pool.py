@@ -0,0 +1,196 @@
+# synthDrivers/_deltatalk/pool.py
+# Several engine instances synthesizing consecutive chunks in parallel
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import heapq
+import threading
+
+from .engine import DSP_MODES, TTS_GENPCM_16BITS, TTS_NOT_INITIALIZED, TTS_SUCCESSFUL, EngineError, render_pcm
+from .pcm import PCMBuffer
+
+
+class EnginePool:
+	"""Up to size instances of an engine backend, each with its own SetMode and SetVoice state.
+
+	Instances the engine refuses to open, such as past the license limit (TTS_NO_LICENSE),
+	just make the pool smaller; an instance that fails while synthesizing is closed and its
+	chunk goes to another one. failures keeps the error code of each instance lost.
+	"""
+
+	def __init__(self, engine, size, dsp_mode=DSP_MODES["MULTIMEDIA"]):
+		self.engine = engine
+		self.instances = []
+		self.failures = []
+		self._settings = {}
+		self._lock = threading.Lock()
+		for _ in range(size):
+			instance = engine.init(dsp_mode)
+			if instance <= 0:
+				# The engine will not open more instances than this
+				self.failures.append(instance)
+				break
+			self.instances.append(instance)
+
+	def __len__(self):
+		return len(self.instances)
+
+	def configure(self, voice_id, rate, volume, pitch):
+		"""Applies the voice and the DeltaTalk scale settings to every instance, skipping those already set."""
+		for instance in list(self.instances):
+			result = self.configure_instance(instance, voice_id, rate, volume, pitch)
+			if result != TTS_SUCCESSFUL:
+				self.retire(instance, result)
+
+	def configure_instance(self, instance, voice_id, rate, volume, pitch):
+		"""Applies the voice and the DeltaTalk scale settings to one instance, unless already set. Returns the result code."""
+		wanted = (voice_id, rate, volume, pitch)
+		if self._settings.get(instance) == wanted:
+			return TTS_SUCCESSFUL
+		result = self.engine.set_voice(instance, voice_id, 10)
+		if result == TTS_SUCCESSFUL:
+			result = self.engine.set_mode(instance, rate, volume, pitch)
+		if result == TTS_SUCCESSFUL:
+			self._settings[instance] = wanted
+		else:
+			self._settings.pop(instance, None)
+		return result
+
+	def retire(self, instance, code):
+		"""Closes an instance that failed with code, shrinking the pool."""
+		with self._lock:
+			if instance not in self.instances:
+				return
+			self.instances.remove(instance)
+			self._settings.pop(instance, None)
+			self.failures.append(code)
+		self.engine.close(instance)
+
+	def render(self, texts, pcm_format=TTS_GENPCM_16BITS, lookahead=None, stale=None):
+		"""Starts synthesizing texts on every instance and returns the PoolJob yielding their PCM in order."""
+		return PoolJob(
+			lambda instance, pcm, text: render_pcm(self.engine, instance, text, pcm, pcm_format),
+			self.instances,
+			texts,
+			lookahead,
+			self._job_failed,
+			stale,
+		)
+
+	def _job_failed(self, instance, error):
+		# Not only EngineError: ctypes and the PCM handling raise their own exceptions
+		self.retire(instance, getattr(error, "code", None))
+		return True
+
+	def close(self):
+		for instance in list(self.instances):
+			self.engine.close(instance)
+		self.instances = []
+		self._settings.clear()
+
+
+class PoolJob:
+	"""Consecutive texts synthesized in parallel, one thread per worker, each taking the next text free.
+
+	render(worker, pcm, text) returns the PCM of text as bytes, pcm being a PCMBuffer of the thread.
+	When it raises, failed(worker, error) is called and returns whether the worker must stop;
+	either way its text goes to the next worker free. A worker whose failed raises stops too.
+	Iterating yields the PCM of each text in the order of texts. Workers stay at most
+	lookahead texts ahead of the one last yielded, which bounds the memory held.
+	Iteration ends early once cancel is called or stale() returns True, such as when the epoch
+	the job was started in is advanced; whoever advances it calls cancel to wake the reader.
+	@raise Exception: from the iteration, the error of the last worker, if every worker stopped.
+	"""
+
+	def __init__(self, render, workers, texts, lookahead=None, failed=None, stale=None):
+		self.texts = list(texts)
+		self.lookahead = lookahead or 2 * max(1, len(workers))
+		self._render = render
+		self._failed = failed or (lambda worker, error: True)
+		self._stale = stale or (lambda: False)
+		self._cond = threading.Condition()
+		self._todo = list(range(len(self.texts)))
+		self._results = {}
+		self._rendered = 0
+		self._next = 0  # Position of the next text to yield
+		self._cancelled = False
+		self._error = None
+		self._threads = [
+			threading.Thread(target=self._work, args=(worker,), daemon=True)
+			for worker in workers
+		]
+		self._working = len(self._threads)
+		if not self._threads:
+			self._error = EngineError(TTS_NOT_INITIALIZED, "TTSENG_Init")
+		for thread in self._threads:
+			thread.start()
+
+	def _take(self):
+		"""Returns the position of the next text to synthesize, or None when there is nothing left to do."""
+		with self._cond:
+			while not self._cancelled and not self._stale():
+				if self._todo and self._todo[0] < self._next + self.lookahead:
+					return heapq.heappop(self._todo)
+				if self._rendered == len(self.texts):
+					return None
+				# Ahead of the reader, or the last texts are still in the hands of other workers, which may fail
+				self._cond.wait()
+			return None
+
+	def _work(self, worker):
+		pcm = PCMBuffer()
+		while True:
+			position = self._take()
+			if position is None:
+				return
+			try:
+				audio = self._render(worker, pcm, self.texts[position])
+			except Exception as e:
+				stop = True  # Also when failed itself raises
+				try:
+					stop = self._failed(worker, e)
+				finally:
+					with self._cond:
+						# Someone else will do it, unless this was the last worker
+						heapq.heappush(self._todo, position)
+						if stop:
+							self._working -= 1
+							if not self._working:
+								self._error = e
+						self._cond.notify_all()
+				if stop:
+					return
+				continue
+			with self._cond:
+				self._results[position] = audio
+				self._rendered += 1
+				self._cond.notify_all()
+
+	def __iter__(self):
+		try:
+			while self._next < len(self.texts):
+				with self._cond:
+					while self._next not in self._results and self._error is None:
+						if self._cancelled or self._stale():
+							return
+						self._cond.wait()
+					if self._next not in self._results:
+						raise self._error
+					audio = self._results.pop(self._next)
+					self._next += 1
+					self._cond.notify_all()
+				yield audio
+		finally:
+			self.cancel()
+
+	def cancel(self):
+		"""Stops the workers after the texts they are synthesizing."""
+		with self._cond:
+			self._cancelled = True
+			self._cond.notify_all()
+
+	def join(self, timeout=None):
+		for thread in self._threads:
+			thread.join(timeout)
@@ -0,0 +1,94 @@
+# synthDrivers/_deltatalk/profiles.py
+# Output profiles: DSP mode and sample encoding of the audio generated
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+from collections import namedtuple
+
+from .engine import (
+	DSP_MODES,
+	TELEPHONY_SAMPLE_RATE,
+	TTS_GENPCM_8BITS,
+	TTS_GENPCM_16BITS,
+	TTS_GENPCM_ALAW,
+	TTS_GENPCM_ULAW,
+	VOICE_SAMPLE_RATES,
+	generate_pcm,
+)
+from .pcm import PCMBuffer
+
+# Format tags of the WAV fmt chunk
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_ALAW = 6
+WAVE_FORMAT_MULAW = 7
+
+# Duration of the frames of stream_frames, the usual packet size of telephony
+DEFAULT_FRAME_MS = 20
+
+Encoding = namedtuple("Encoding", ("pcm_format", "sample_width", "format_tag", "silence"))
+Encoding.__doc__ = """Sample encoding: the TTSENG_GenAudioBuffer format, bytes per sample, WAV format tag and the byte of silence."""
+
+ENCODINGS = {
+	"pcm": Encoding(TTS_GENPCM_16BITS, 2, WAVE_FORMAT_PCM, b"\x00"),
+	"pcm8": Encoding(TTS_GENPCM_8BITS, 1, WAVE_FORMAT_PCM, b"\x80"),
+	"ulaw": Encoding(TTS_GENPCM_ULAW, 1, WAVE_FORMAT_MULAW, b"\xff"),
+	"alaw": Encoding(TTS_GENPCM_ALAW, 1, WAVE_FORMAT_ALAW, b"\xd5"),
+}
+
+OutputProfile = namedtuple("OutputProfile", ("dsp_mode", "encoding"))
+OutputProfile.__doc__ = """The DSP mode the engine is initialized in, and the name of the encoding it generates."""
+
+PROFILES = {
+	"multimedia": OutputProfile(DSP_MODES["MULTIMEDIA"], "pcm"),
+	# 8 kHz, whatever the voice; mu-law and A-law take a quarter of the bytes of 16-bit multimedia audio
+	"telephony": OutputProfile(DSP_MODES["TELEPHONY"], "pcm"),
+	"telephony-pcm8": OutputProfile(DSP_MODES["TELEPHONY"], "pcm8"),
+	"telephony-ulaw": OutputProfile(DSP_MODES["TELEPHONY"], "ulaw"),
+	"telephony-alaw": OutputProfile(DSP_MODES["TELEPHONY"], "alaw"),
+}
+
+
+def sample_rate(profile, voice_id):
+	if profile.dsp_mode == DSP_MODES["TELEPHONY"]:
+		return TELEPHONY_SAMPLE_RATE
+	return VOICE_SAMPLE_RATES[voice_id]
+
+
+def bytes_per_second(profile, voice_id):
+	return sample_rate(profile, voice_id) * ENCODINGS[profile.encoding].sample_width
+
+
+def frame_size(profile, voice_id, frame_ms=DEFAULT_FRAME_MS):
+	"""Returns the bytes in a frame of frame_ms, a whole number of samples."""
+	samples = sample_rate(profile, voice_id) * frame_ms // 1000
+	return samples * ENCODINGS[profile.encoding].sample_width
+
+
+def stream_frames(engine, instance, text, profile, voice_id, frame_ms=DEFAULT_FRAME_MS, pcm=None):
+	"""Synthesizes text, yielding its audio in frames of frame_ms each, as bytes.
+
+	instance must have been initialized in the DSP mode of profile. The last frame is padded with silence.
+	@raise EngineError: if the engine returns an error code.
+	"""
+	encoding = ENCODINGS[profile.encoding]
+	size = frame_size(profile, voice_id, frame_ms)
+	pcm = pcm or PCMBuffer()
+	pending = bytearray()  # Start of a frame left by the previous block
+	for length in generate_pcm(engine, instance, text, pcm, encoding.pcm_format):
+		block = pcm.block(length)
+		offset = 0
+		if pending:
+			offset = min(size - len(pending), length)
+			pending += block[:offset]
+			if len(pending) < size:
+				continue
+			yield bytes(pending)
+			pending.clear()
+		while offset + size <= length:
+			yield block[offset:offset + size].tobytes()
+			offset += size
+		pending += block[offset:]
+	if pending:
+		yield bytes(pending) + encoding.silence * (size - len(pending))
@@ -0,0 +1,192 @@
+# synthDrivers/_deltatalk/prosody.py
+# NVDA rate, pitch and volume to engine settings, and the gain and tempo applied to the audio after synthesis
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import array
+import functools
+import math
+from collections import namedtuple
+
+# Deprecated since Python 3.11 and removed in 3.13 (PEP 594), where it is None and the pure Python paths
+# below take over; NVDA still ships a Python that has it
+from .resample import audioop
+
+DT_MAX = 20
+# Speed of NVDA rate 100 with rate boost, as a multiple of DeltaTalk rate 20
+RATE_BOOST = 3
+# WSOLA segments, their overlap and how far around the nominal position a segment is looked for
+SEGMENT_MS = 40
+OVERLAP_MS = 10
+SEARCH_MS = 12
+# Samples compared when looking for a segment without audioop
+_DECIMATION = 4
+
+EngineProsody = namedtuple("EngineProsody", ("rate", "volume", "pitch", "gain", "tempo"))
+EngineProsody.__doc__ = """DeltaTalk scale rate, volume and pitch, and the gain and tempo applied to the audio they generate."""
+
+
+def _to_dt(value):
+	return max(1, min(DT_MAX, int(value * DT_MAX / 100)))
+
+
+class ProsodyMap:
+	"""Converts NVDA rate, pitch and volume (0-100) to EngineProsody, from tables computed once.
+
+	Without effects, the values are those of the 20 steps of the engine.
+	With effects, the engine volume is the step just above the one wanted and the gain brings
+	it down to the exact level, and with rate_boost the rates past DeltaTalk rate 20 are
+	reached by speeding up its audio, up to RATE_BOOST times.
+	Pitch always has the 20 steps of the engine.
+	"""
+
+	def __init__(self, effects=False, rate_boost=False):
+		self.effects = effects
+		self.rate_boost = rate_boost and effects
+		self._rates = [self._rate(value) for value in range(101)]
+		self._volumes = [self._volume(value) for value in range(101)]
+		self._pitches = [_to_dt(value) for value in range(101)]
+
+	def _rate(self, value):
+		"""Returns the engine rate and the tempo for the NVDA rate value."""
+		if not self.rate_boost:
+			return _to_dt(value), 1.0
+		speed = max(1.0, value * DT_MAX * RATE_BOOST / 100)
+		if speed <= DT_MAX:
+			return int(speed), 1.0
+		return DT_MAX, speed / DT_MAX
+
+	def _volume(self, value):
+		"""Returns the engine volume and the gain for the NVDA volume value."""
+		if not self.effects:
+			return _to_dt(value), 1.0
+		level = value * DT_MAX / 100
+		dt_volume = max(1, min(DT_MAX, math.ceil(level)))
+		return dt_volume, level / dt_volume
+
+	def lookup(self, rate, pitch, volume):
+		"""Returns the EngineProsody of the NVDA values, clamped to 0-100 first."""
+		dt_rate, tempo = self._rates[_clamp(rate)]
+		dt_volume, gain = self._volumes[_clamp(volume)]
+		return EngineProsody(dt_rate, dt_volume, self._pitches[_clamp(pitch)], gain, tempo)
+
+
+def _clamp(value):
+	return max(0, min(100, int(value)))
+
+
+@functools.lru_cache(maxsize=8)
+def _gain_table(gain):
+	"""Returns every 16-bit sample scaled by gain, indexed by the sample itself: negative ones wrap around the end."""
+	return array.array("h", (int(sample * gain) for sample in (*range(0, 32768), *range(-32768, 0))))
+
+
+def apply_gain(data, gain, use_audioop=True):
+	"""Returns 16-bit PCM data scaled by gain, which is at most 1."""
+	if gain == 1:
+		return data
+	if audioop and use_audioop:
+		return audioop.mul(data, 2, gain)
+	# One table lookup per sample, in C, rather than a multiplication in Python
+	return array.array("h", map(_gain_table(gain).__getitem__, memoryview(data).cast("h"))).tobytes()
+
+
+class TimeStretcher:
+	"""Speeds 16-bit mono PCM up by tempo without changing its pitch, block by block, with WSOLA.
+
+	The audio is cut into overlapping segments read tempo times faster than they are written;
+	each segment is taken where it best continues the previous one, within SEARCH_MS of its
+	nominal position, and cross-faded with it. audioop.findfit does the search where it exists.
+	Up to a segment of audio is held back until the next block or flush.
+	"""
+
+	def __init__(self, sample_rate, tempo, use_audioop=True):
+		self.tempo = tempo
+		self._audioop = audioop if use_audioop else None
+		self._segment = sample_rate * SEGMENT_MS // 1000
+		self._overlap = sample_rate * OVERLAP_MS // 1000
+		self._search = sample_rate * SEARCH_MS // 1000
+		self._hop = self._segment - self._overlap  # Samples written per segment
+		self._fade = [i / self._overlap for i in range(self._overlap)]
+		self._input = array.array("h")
+		self._position = 0.0  # Nominal start of the next segment in _input
+		self._tail = None  # End of the previous segment, cross-faded with the start of the next one
+
+	def process(self, data):
+		"""Returns the audio of data, and of the blocks before it, that can be written so far."""
+		self._input.frombytes(data)
+		return self._run(len(self._input)).tobytes()
+
+	def flush(self):
+		"""Returns the rest of the audio, at the end of the stream."""
+		end = len(self._input)
+		# Silence past the end, so the segments reach it
+		self._input.extend(array.array("h", bytes(2 * (self._search + self._segment))))
+		output = self._run(end)
+		if self._tail is not None:
+			output.extend(self._tail)
+		self._input = array.array("h")
+		self._position = 0.0
+		self._tail = None
+		return output.tobytes()
+
+	def _run(self, end):
+		output = array.array("h")
+		samples = self._input
+		while self._position < end and int(self._position) + self._search + self._segment <= len(samples):
+			start = int(self._position)
+			if self._tail is None:
+				output.extend(samples[start:start + self._hop])
+			else:
+				start += self._best_offset(start)
+				head = samples[start:start + self._overlap]
+				output.extend(int(a + (b - a) * weight) for a, b, weight in zip(self._tail, head, self._fade))
+				output.extend(samples[start + self._overlap:start + self._hop])
+			self._tail = samples[start + self._hop:start + self._segment]
+			self._position += self._hop * self.tempo
+		consumed = int(self._position)
+		if consumed:
+			del samples[:min(consumed, len(samples))]
+			self._position -= consumed
+		return output
+
+	def _best_offset(self, start):
+		"""Returns where, from start, a segment best continues the tail of the previous one."""
+		window = self._input[start:start + self._search + self._overlap]
+		if self._audioop:
+			offset, _factor = self._audioop.findfit(window.tobytes(), self._tail.tobytes())
+			return offset
+		tail = self._tail[::_DECIMATION]
+		best, best_score = 0, None
+		for offset in range(0, self._search, 2):
+			candidate = window[offset:offset + self._overlap:_DECIMATION]
+			energy = sum(sample * sample for sample in candidate) or 1
+			score = sum(a * b for a, b in zip(tail, candidate)) / math.sqrt(energy)
+			if best_score is None or score > best_score:
+				best, best_score = offset, score
+		return best
+
+
+class AudioEffects:
+	"""The gain and tempo of an EngineProsody, applied to the 16-bit audio of one utterance."""
+
+	def __init__(self, sample_rate, prosody, use_audioop=True):
+		self.gain = prosody.gain
+		self._use_audioop = use_audioop
+		self._stretcher = TimeStretcher(sample_rate, prosody.tempo, use_audioop) if prosody.tempo > 1 else None
+
+	@staticmethod
+	def needed(prosody):
+		return prosody.gain != 1 or prosody.tempo > 1
+
+	def process(self, data):
+		if self.gain != 1:
+			data = apply_gain(data, self.gain, self._use_audioop)
+		if self._stretcher:
+			data = self._stretcher.process(data)
+		return data
+
+	def flush(self):
+		return self._stretcher.flush() if self._stretcher else b""
@@ -0,0 +1,60 @@
+# synthDrivers/_deltatalk/resample.py
+# Sample rate conversion of 16-bit PCM streams
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import array
+import math
+import warnings
+
+try:
+	with warnings.catch_warnings():
+		warnings.simplefilter("ignore", DeprecationWarning)
+		import audioop
+except ImportError:
+	# Deprecated since Python 3.11 and removed in 3.13 (PEP 594); the pure Python paths are used then
+	audioop = None
+
+
+class Resampler:
+	"""Converts 16-bit mono PCM from one sample rate to another, block by block.
+
+	The state kept between blocks makes the blocks of an utterance join without clicks,
+	so one Resampler must be used per utterance.
+	audioop.ratecv does the work where it exists, otherwise linear interpolation in Python.
+	"""
+
+	def __init__(self, from_rate, to_rate, use_audioop=True):
+		self.from_rate = from_rate
+		self.to_rate = to_rate
+		self._audioop = audioop if use_audioop else None
+		self._state = None
+		self._step = from_rate / to_rate
+		self._time = 0.0  # Position of the next output sample, in input samples from the start of the next block
+		self._last = 0  # Last input sample, at position -1 of the next block
+
+	def convert(self, data):
+		"""Returns data, the next part of the stream, at the new sample rate."""
+		if self._audioop:
+			converted, self._state = self._audioop.ratecv(data, 2, 1, self.from_rate, self.to_rate, self._state)
+			return converted
+		samples = array.array("h")
+		samples.frombytes(data)
+		count = len(samples)
+		if not count:
+			return b""
+		converted = array.array("h")
+		previous = self._last
+		time = self._time
+		step = self._step
+		while time < count - 1:
+			index = math.floor(time)
+			first = previous if index < 0 else samples[index]
+			second = samples[index + 1]
+			converted.append(int(first + (second - first) * (time - index)))
+			time += step
+		self._time = time - count
+		self._last = samples[-1]
+		return converted.tobytes()
@@ -0,0 +1,60 @@
+# synthDrivers/_deltatalk/ring.py
+# Ring of PCM block buffers between the synthesis and playback stages
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import threading
+from collections import deque
+
+from .pcm import PCM_BLOCK_SIZE, PCMBuffer
+
+# Blocks synthesized ahead of the player, on top of what the player has queued itself
+DEFAULT_SLOTS = 6
+
+
+class PCMRing:
+	"""A fixed set of PCMBuffers that the producer fills and the consumer gives back once fed.
+
+	The producer waits in acquire when every buffer is in flight, which bounds both memory and
+	how far synthesis runs ahead of playback.
+	"""
+
+	def __init__(self, slots=DEFAULT_SLOTS, size=PCM_BLOCK_SIZE):
+		self.slots = slots
+		self._free = deque(PCMBuffer(size) for _ in range(slots))
+		self._cond = threading.Condition()
+		self._resets = 0
+		# Times the producer found the ring full and had to wait for the consumer
+		self.full_waits = 0
+		self.max_in_use = 0
+
+	def in_use(self):
+		with self._cond:
+			return self.slots - len(self._free)
+
+	def acquire(self):
+		"""Returns a free buffer, waiting for one if needed, or None if reset is called meanwhile."""
+		with self._cond:
+			resets = self._resets
+			if not self._free:
+				self.full_waits += 1
+			while not self._free:
+				self._cond.wait()
+				if resets != self._resets:
+					return None
+			buffer = self._free.popleft()
+			self.max_in_use = max(self.max_in_use, self.slots - len(self._free))
+			return buffer
+
+	def release(self, buffer):
+		with self._cond:
+			self._free.append(buffer)
+			self._cond.notify()
+
+	def reset(self):
+		"""Wakes up a producer waiting in acquire, after a cancel."""
+		with self._cond:
+			self._resets += 1
+			self._cond.notify_all()
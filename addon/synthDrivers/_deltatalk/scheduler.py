@@ -0,0 +1,115 @@
+# synthDrivers/_deltatalk/scheduler.py
+# Bounded, priority-aware queue between speak() and the audio worker
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import heapq
+import itertools
+import queue
+import threading
+from collections import deque
+
+# Priority classes, most urgent first
+PRIORITY_FOCUS = 0  # Speech that follows a cancel, such as the newly focused object
+PRIORITY_SAY_ALL = 1
+PRIORITY_BACKGROUND = 2  # Notifications spoken without interrupting anything
+PRIORITY_NAMES = ("focus", "say all", "background")
+
+# Sequences each class may hold; say-all reads ahead only a few lines, so it is rarely reached
+DEFAULT_BOUNDS = {
+	PRIORITY_FOCUS: 8,
+	PRIORITY_SAY_ALL: 64,
+	PRIORITY_BACKGROUND: 16,
+}
+
+
+class SpeechScheduler:
+	"""Queue of speech items with one bounded FIFO per priority class.
+
+	Only the most urgent class preempts: get returns its oldest item first, and otherwise the
+	oldest item of the other classes, so background speech queued during say-all is spoken
+	between the say-all lines it came between. put never blocks: when a class is full,
+	its oldest item is dropped, as the newest speech is the one the user is waiting for.
+	get raises queue.Empty on timeout, like queue.Queue, and returns None once closed.
+	"""
+
+	def __init__(self, bounds=None):
+		self.bounds = dict(DEFAULT_BOUNDS if bounds is None else bounds)
+		self._queues = {priority: deque() for priority in self.bounds}  # (submission number, item) pairs
+		self._order = sorted(self.bounds)
+		self._submissions = itertools.count()
+		self._cond = threading.Condition()
+		self._closed = False
+		self.enqueued = dict.fromkeys(self.bounds, 0)
+		self.dropped = dict.fromkeys(self.bounds, 0)
+		self.max_depth = dict.fromkeys(self.bounds, 0)
+
+	def put(self, item, priority):
+		"""Queues item in its class and returns the item dropped to make room, or None."""
+		with self._cond:
+			items = self._queues[priority]
+			dropped = None
+			if len(items) >= self.bounds[priority]:
+				_number, dropped = items.popleft()
+				self.dropped[priority] += 1
+			items.append((next(self._submissions), item))
+			self.enqueued[priority] += 1
+			self.max_depth[priority] = max(self.max_depth[priority], len(items))
+			self._cond.notify()
+			return dropped
+
+	def get(self, timeout=None):
+		with self._cond:
+			while True:
+				if self._closed:
+					return None
+				items = self._next_queue()
+				if items:
+					return items.popleft()[1]
+				if not self._cond.wait(timeout):
+					raise queue.Empty
+
+	def _next_queue(self):
+		"""Returns the FIFO get takes from, or None when all are empty. Needs the lock."""
+		urgent, *others = (self._queues[priority] for priority in self._order)
+		if urgent:
+			return urgent
+		return min((items for items in others if items), key=lambda items: items[0][0], default=None)
+
+	def clear(self):
+		"""Forgets every queued item and returns them in the order get would have."""
+		with self._cond:
+			urgent, *others = (self._queues[priority] for priority in self._order)
+			items = [item for _number, item in itertools.chain(urgent, heapq.merge(*others))]
+			for priority in self._order:
+				self._queues[priority].clear()
+			return items
+
+	def close(self):
+		"""Makes get return None, to stop the worker."""
+		with self._cond:
+			self._closed = True
+			self._cond.notify_all()
+
+	def empty(self):
+		with self._cond:
+			return not any(self._queues.values())
+
+	def depth(self):
+		"""Returns the number of items queued in each class."""
+		with self._cond:
+			return {priority: len(items) for priority, items in self._queues.items()}
+
+	def stats(self):
+		with self._cond:
+			return {
+				PRIORITY_NAMES[priority]: {
+					"depth": len(self._queues[priority]),
+					"max_depth": self.max_depth[priority],
+					"enqueued": self.enqueued[priority],
+					"dropped": self.dropped[priority],
+				}
+				for priority in self._order
+			}
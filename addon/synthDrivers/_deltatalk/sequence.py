@@ -0,0 +1,85 @@
+# synthDrivers/_deltatalk/sequence.py
+# Compiles NVDA speech sequences into as few engine requests as possible
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Speech sequence compiler.
+
+Commands are recognized by their attributes rather than their classes, so that this module does
+not import NVDA: prosody commands have settingName, offset and multiplier, index commands have
+index, and character mode commands have state. Other commands are ignored.
+"""
+
+from collections import namedtuple
+
+# Characters spelled in character mode are joined into one request with this separator,
+# which makes the engine pause between them as it did when they were spoken one by one
+CHARACTER_SEPARATOR = ", "
+PROSODY_SETTINGS = ("rate", "pitch", "volume")
+
+Prosody = namedtuple("Prosody", PROSODY_SETTINGS)
+Prosody.__doc__ = """Rate, pitch and volume on the NVDA scale (0 to 100)."""
+
+Segment = namedtuple("Segment", ("text", "index", "prosody"))
+Segment.__doc__ = """Text spoken with the same prosody, with the index reached right before it (or None).
+
+A segment whose text is None only reports its index.
+"""
+
+
+def _apply_command(prosody, base, command):
+	"""Returns prosody with command applied. Commands are relative to the base settings, not cumulative."""
+	name = command.settingName
+	value = getattr(base, name) * command.multiplier + command.offset
+	return prosody._replace(**{name: int(max(0, min(100, value)))})
+
+
+def compile_sequence(sequence, base):
+	"""Returns the list of Segments that speak sequence, starting from the base Prosody.
+
+	Adjacent strings spoken with the same prosody, and not separated by an index, become one segment.
+	Indexes are segment boundaries, so that each one is reported once the audio before it has played.
+	"""
+	segments = []
+	prosody = base
+	char_mode = False
+	texts = []
+	spelling = False  # Whether the last text was spelled
+	index = None
+
+	def flush():
+		nonlocal texts, index
+		if texts:
+			segments.append(Segment(" ".join(texts), index, prosody))
+		elif index is not None:
+			segments.append(Segment(None, index, prosody))
+		texts = []
+		index = None
+
+	for item in sequence:
+		if isinstance(item, str):
+			text = item.strip()
+			if not text:
+				continue
+			if char_mode:
+				text = CHARACTER_SEPARATOR.join(char for char in text if not char.isspace())
+				if texts and spelling:
+					# Spelled characters usually come one string each
+					texts[-1] += CHARACTER_SEPARATOR + text
+					continue
+			texts.append(text)
+			spelling = char_mode
+		elif getattr(item, "settingName", None) in PROSODY_SETTINGS:
+			new_prosody = _apply_command(prosody, base, item)
+			if new_prosody != prosody:
+				flush()
+				prosody = new_prosody
+		elif hasattr(item, "index"):
+			flush()
+			index = item.index
+		elif hasattr(item, "state"):
+			char_mode = item.state
+	flush()
+	return segments
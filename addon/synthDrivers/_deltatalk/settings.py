@@ -0,0 +1,72 @@
+# synthDrivers/_deltatalk/settings.py
+# Voice, rate, volume and pitch of an engine instance, applied only when they change
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import threading
+
+from .engine import TTS_SUCCESSFUL
+
+
+class EngineSettings:
+	"""The voice and the DeltaTalk scale rate, volume and pitch of one engine instance.
+
+	set_mode and set_voice only record the values wanted, and can be called from any thread.
+	apply, called right before synthesis, makes the TTSENG_SetVoice and TTSENG_SetMode calls for
+	what differs from the values last applied, so several changes in a row cost a single call
+	and a change back to the values in effect costs none.
+	"""
+
+	def __init__(self, engine, instance):
+		self.engine = engine
+		self.instance = instance
+		self._lock = threading.Lock()
+		self._mode = None  # (rate, volume, pitch) wanted
+		self._voice = None
+		self._applied_mode = None  # Unknown until the first apply
+		self._applied_voice = None
+		self._mode_requests = 0  # Since the last apply
+		self._voice_requests = 0
+		# Counters
+		self.requests = 0
+		self.calls = 0
+		self.avoided = 0
+
+	def set_mode(self, rate, volume, pitch):
+		with self._lock:
+			self._mode = (rate, volume, pitch)
+			self._mode_requests += 1
+			self.requests += 1
+
+	def set_voice(self, voice_id):
+		with self._lock:
+			self._voice = voice_id
+			self._voice_requests += 1
+			self.requests += 1
+
+	def apply(self):
+		"""Sets the values wanted that the instance does not have yet. Returns the first error code, or TTS_SUCCESSFUL.
+
+		Values that fail are applied again by the next call.
+		"""
+		with self._lock:
+			voice, mode = self._voice, self._mode
+			voice_requests, mode_requests = self._voice_requests, self._mode_requests
+			self._voice_requests = self._mode_requests = 0
+			calls = 0
+			result = TTS_SUCCESSFUL
+			if mode is not None and mode != self._applied_mode:
+				calls += 1
+				result = self.engine.set_mode(self.instance, *mode)
+				self._applied_mode = mode if result == TTS_SUCCESSFUL else None
+			if voice is not None and voice != self._applied_voice:
+				calls += 1
+				voice_result = self.engine.set_voice(self.instance, voice, 10)
+				self._applied_voice = voice if voice_result == TTS_SUCCESSFUL else None
+				if result == TTS_SUCCESSFUL:
+					result = voice_result
+			self.calls += calls
+			self.avoided += max(0, voice_requests + mode_requests - calls)
+			return result
@@ -0,0 +1,145 @@
+# synthDrivers/_deltatalk/sink.py
+# Audio sink writing fixed-duration frames to a stream, used instead of nvwave
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import ctypes
+import threading
+import time
+from collections import deque
+
+
+class FrameSink:
+	"""Stand-in for nvwave.WavePlayer that writes the audio to a binary stream, such as a named pipe.
+
+	Audio is written in frames of frame_bytes at the pace it would play, so that indexes are reported
+	when the listener at the other end hears them and stop drops what was not written yet. A frame
+	left incomplete when no more audio is queued is padded with silence, so every frame has the same size.
+	feed takes bytes, or a pointer and a size like WavePlayer.feed since NVDA 2023.2.
+	"""
+
+	def __init__(self, stream, bytes_per_second, frame_bytes, silence=b"\x00", clock=time.monotonic):
+		self.stream = stream
+		self.bytes_per_second = bytes_per_second
+		self.frame_bytes = frame_bytes
+		self.silence = silence
+		self.frames = 0
+		self._clock = clock
+		self._cond = threading.Condition()
+		self._queue = deque()  # (data, onDone)
+		self._pending = bytearray()  # Start of the next frame
+		self._waiting = []  # (end position, callback) of audio not written yet
+		self._appended = 0  # Position of the end of the audio fed, in bytes
+		self._written = 0  # Position of the end of the audio written
+		self._paused = False
+		self._closed = False
+		self._generation = 0  # Advanced by stop
+		self._next_frame_at = 0.0
+		self._thread = threading.Thread(target=self._run, daemon=True)
+		self._thread.start()
+
+	@classmethod
+	def open(cls, path, bytes_per_second, frame_bytes, silence=b"\x00"):
+		return cls(open(path, "wb", buffering=0), bytes_per_second, frame_bytes, silence)
+
+	def feed(self, data, size=None, onDone=None):
+		if size is not None:
+			data = ctypes.string_at(data, size)
+		with self._cond:
+			self._queue.append((bytes(data), onDone))
+			self._cond.notify()
+
+	def _run(self):
+		while True:
+			with self._cond:
+				while not self._closed and (self._paused or not (self._queue or self._pending)):
+					self._cond.wait()
+				if self._closed:
+					return
+				generation = self._generation
+				while self._queue and len(self._pending) < self.frame_bytes:
+					data, on_done = self._queue.popleft()
+					self._pending += data
+					self._appended += len(data)
+					if on_done:
+						self._waiting.append((self._appended, on_done))
+				# Markers fed after audio already written are reached right away
+				done = self._reached()
+				audio = min(len(self._pending), self.frame_bytes)
+				if 0 < audio < self.frame_bytes and self._clock() < self._next_frame_at:
+					# The next block may still complete the frame before it is due
+					self._cond.wait(self._next_frame_at - self._clock())
+					frame = None
+				elif audio:
+					self._pending += self.silence * (self.frame_bytes - audio)
+					frame = bytes(self._pending[:self.frame_bytes])
+					del self._pending[:self.frame_bytes]
+				else:
+					frame = None
+			for on_done in done:
+				on_done()
+			if frame is not None and self._write(frame, generation):
+				with self._cond:
+					done = []
+					if generation == self._generation:
+						self._written += audio
+						done = self._reached()
+				for on_done in done:
+					on_done()
+
+	def _reached(self):
+		"""Removes and returns the callbacks of the audio written so far."""
+		done = [on_done for end, on_done in self._waiting if end <= self._written]
+		if done:
+			self._waiting = [(end, on_done) for end, on_done in self._waiting if end > self._written]
+		return done
+
+	def _write(self, frame, generation):
+		"""Waits until frame is due, then writes it. Returns False if stop or close came first."""
+		with self._cond:
+			now = self._clock()
+			self._next_frame_at = max(self._next_frame_at, now)
+			while now < self._next_frame_at and generation == self._generation and not self._closed:
+				self._cond.wait(self._next_frame_at - now)
+				now = self._clock()
+			if generation != self._generation or self._closed:
+				return False
+			self._next_frame_at += len(frame) / self.bytes_per_second
+		self.stream.write(frame)
+		with self._cond:
+			self.frames += 1
+			# For idle
+			self._cond.notify_all()
+		return True
+
+	def stop(self):
+		"""Drops the audio not written yet, without calling its callbacks."""
+		with self._cond:
+			self._queue.clear()
+			self._pending.clear()
+			self._waiting = []
+			self._appended = self._written
+			self._generation += 1
+			self._next_frame_at = 0.0
+			self._cond.notify_all()
+
+	def pause(self, switch):
+		with self._cond:
+			self._paused = switch
+			self._cond.notify_all()
+
+	def idle(self):
+		"""Waits until the audio fed was written, or stop is called, like WavePlayer.idle."""
+		with self._cond:
+			generation = self._generation
+			while (self._queue or self._pending) and generation == self._generation and not self._closed:
+				self._cond.wait()
+
+	def close(self):
+		with self._cond:
+			self._closed = True
+			self._cond.notify_all()
+		self._thread.join(2.0)
+		self.stream.close()
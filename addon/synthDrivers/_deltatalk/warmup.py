@@ -0,0 +1,170 @@
+# synthDrivers/_deltatalk/warmup.py
+# Background pre-rendering of the labels most likely to be spoken next
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import ctypes
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Warm-up resumes only after speech has been quiet for this long
+DEFAULT_QUIET_SECONDS = 0.5
+THREAD_PRIORITY_LOWEST = -2
+# What rendering a text did
+RENDERED = "rendered"
+CACHED = "cached"  # Stored already
+REFUSED = "refused"  # The engine was busy, or failed on it
+# Times a text is tried before the warm-up gives up on it
+MAX_ATTEMPTS = 3
+
+
+def lower_thread_priority():
+	"""Lowers the priority of the calling thread on Windows, so that it only runs when speech does not."""
+	try:
+		kernel32 = ctypes.windll.kernel32
+	except AttributeError:
+		return False
+	return bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_PRIORITY_LOWEST))
+
+
+class UsageCounts:
+	"""How many times each label of a vocabulary was spoken, persisted across sessions as JSON."""
+
+	def __init__(self, path, vocabulary):
+		self.path = path
+		self.vocabulary = frozenset(vocabulary)
+		self._lock = threading.Lock()
+		self._counts = {}
+		self._dirty = False
+		try:
+			with open(path, "r", encoding="utf-8") as f:
+				counts = json.load(f)
+			self._counts = {
+				text: count for text, count in counts.items()
+				if text in self.vocabulary and isinstance(count, int)
+			}
+		except (OSError, ValueError, AttributeError):
+			pass
+
+	def record(self, texts):
+		"""Counts the texts that belong to the vocabulary."""
+		with self._lock:
+			for text in texts:
+				if text in self.vocabulary:
+					self._counts[text] = self._counts.get(text, 0) + 1
+					self._dirty = True
+
+	def count(self, text):
+		return self._counts.get(text, 0)
+
+	def ranked(self):
+		"""Returns the vocabulary, most used first; labels never used keep their alphabetical order."""
+		with self._lock:
+			return sorted(self.vocabulary, key=lambda text: (-self._counts.get(text, 0), text))
+
+	def save(self):
+		"""Writes the counts if they changed since they were loaded."""
+		with self._lock:
+			if not self._dirty:
+				return
+			counts = dict(self._counts)
+			self._dirty = False
+		os.makedirs(os.path.dirname(self.path), exist_ok=True)
+		temp_path = self.path + ".tmp"
+		with open(temp_path, "w", encoding="utf-8") as f:
+			json.dump(counts, f, ensure_ascii=False, indent=0, sort_keys=True)
+		os.replace(temp_path, self.path)
+
+
+class WarmUp:
+	"""Renders texts in the background, most likely first, giving way to speech.
+
+	render(text) synthesizes and stores one text, and returns RENDERED, CACHED if it was already
+	stored, or REFUSED if it could not render it. A refused text goes back to the end of the queue
+	and the worker waits for another quiet period; after MAX_ATTEMPTS it is left in failed.
+	on_finished() is called once every text is covered or failed, unless the worker was stopped first.
+	Before each text, the worker waits until speech has been quiet for quiet_seconds and
+	is_busy() returns False, so a label being rendered delays real speech by at most one label.
+	"""
+
+	def __init__(
+		self, texts, render, is_busy, on_finished=None, quiet_seconds=DEFAULT_QUIET_SECONDS, clock=time.monotonic,
+	):
+		self.texts = list(texts)
+		self.covered = []
+		self.failed = []
+		self.rendered = 0
+		self.refused = 0
+		self._render = render
+		self._is_busy = is_busy
+		self._on_finished = on_finished
+		self._quiet_seconds = quiet_seconds
+		self._clock = clock
+		self._last_speech = clock()
+		self._stop = threading.Event()
+		self._thread = None
+
+	def start(self):
+		self._thread = threading.Thread(target=self._run, name="deltaTalk warm-up", daemon=True)
+		self._thread.start()
+
+	def speech_arrived(self):
+		"""Makes the worker give way to speech, after the label it is rendering."""
+		self._last_speech = self._clock()
+
+	def stop(self, timeout=None):
+		self._stop.set()
+		if self._thread and self._thread.is_alive():
+			self._thread.join(timeout)
+
+	@property
+	def finished(self):
+		return self._thread is not None and not self._thread.is_alive()
+
+	def _wait_for_quiet(self):
+		"""Returns False if stopped while waiting."""
+		while not self._stop.is_set():
+			remaining = self._last_speech + self._quiet_seconds - self._clock()
+			if remaining <= 0 and not self._is_busy():
+				return True
+			self._stop.wait(max(remaining, self._quiet_seconds))
+		return False
+
+	def _run(self):
+		lower_thread_priority()
+		todo = deque((text, 1) for text in self.texts)
+		while todo:
+			if not self._wait_for_quiet():
+				return
+			text, attempt = todo.popleft()
+			result = self._render(text)
+			if result == REFUSED:
+				self.refused += 1
+				if attempt < MAX_ATTEMPTS:
+					todo.append((text, attempt + 1))
+				else:
+					self.failed.append(text)
+				# Tried again in a later quiet period, not right away
+				self._last_speech = self._clock()
+				continue
+			if result == RENDERED:
+				self.rendered += 1
+			self.covered.append(text)
+		if self._on_finished:
+			self._on_finished()
+
+	def coverage(self, usage):
+		"""Returns how much of the working set is rendered, by number of labels and by share of observed usage."""
+		covered = self.covered[:]
+		total_usage = sum(usage.count(text) for text in self.texts)
+		covered_usage = sum(usage.count(text) for text in covered)
+		return {
+			"labels": len(covered),
+			"total": len(self.texts),
+			"usage": covered_usage / total_usage if total_usage else 0.0,
+		}
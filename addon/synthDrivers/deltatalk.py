@@ -6,20 +6,54 @@
 # See the file COPYING for more details.
 
 import os
-import ctypes
 import queue
 import threading
-import time
+from functools import partial
 import config
+import globalVars
 import nvwave
 import wx
-from ctypes import *
 from synthDriverHandler import SynthDriver as SynthDriverBase
 from synthDriverHandler import synthDoneSpeaking, SynthDriver, synthIndexReached, VoiceInfo
 from logHandler import log
+from speech import sayAll
 from speech.commands import IndexCommand, PitchCommand, RateCommand, VolumeCommand, CharacterModeCommand
 import addonHandler
 from globalPlugins import deltaTalkSettings
+from globalPlugins.virtualVision import CONTROL_TYPE_NAMES, NEGATIVE_STATE_NAMES, STATE_NAMES
+from ._deltatalk.chunker import CHUNK_MS, chunk_text
+from ._deltatalk.engine import (
+	TTS_BUSY,
+	Dtalk32Backend,
+	EngineError,
+	generate_blocks,
+	render_pcm,
+)
+from ._deltatalk.dictionary import DictionaryFile
+from ._deltatalk.duration import DurationModel
+from ._deltatalk.epoch import CancelEpoch
+from ._deltatalk.gate import EngineGate
+from ._deltatalk.host import HostError, HostPool, SynthesisHost
+from ._deltatalk.indexing import EstimatedIndexes, IndexTracker
+from ._deltatalk.lexicon import LexiconError
+from ._deltatalk.pacing import PacingScheduler
+from ._deltatalk.pcm import PCMBuffer
+from ._deltatalk.pcmcache import PCMCache
+from ._deltatalk.phonemes import AlphabetError, load_phonetizer
+from ._deltatalk.players import PlayerPool
+from ._deltatalk.profiles import ENCODINGS, PROFILES, sample_rate
+from ._deltatalk.prosody import AudioEffects, ProsodyMap
+from ._deltatalk.resample import Resampler
+from ._deltatalk.ring import PCMRing
+from ._deltatalk.scheduler import PRIORITY_BACKGROUND, PRIORITY_FOCUS, PRIORITY_NAMES, PRIORITY_SAY_ALL, SpeechScheduler
+from ._deltatalk.sequence import Prosody, Segment, compile_sequence
+from ._deltatalk.settings import EngineSettings
+from ._deltatalk.sink import FrameSink
+from ._deltatalk.pool import EnginePool
+from ._deltatalk.phrasecache import (
+	PhraseCache, PhraseCacheError, fingerprint_settings, fingerprint_stats, write_phrase_cache,
+)
+from ._deltatalk.warmup import CACHED, REFUSED, RENDERED, UsageCounts, WarmUp
 
 addonHandler.initTranslation()
 
@@ -49,21 +83,6 @@ ERROR_CODES = {
 	-106: {"code": -106, "literal": "TTS_NO_LICENSE", "friendly": _("The number of simultaneous instances of the synthesizer has been extrapolated")},
 }
 
-# Supported DSP modes
-DSP_MODES = {
-	"MULTIMEDIA": 0,
-	"TELEPHONY": 1
-}
-
-# Constants for TTSENG_GenAudioBuffer
-TTS_GENPCM_NEW_SIMPLE_BLOCK = 0
-TTS_GENPCM_NEW_MULTI_BLOCK = 1
-TTS_GENPCM_NEXT_BLOCK = 2
-TTS_GENPCM_16BITS = 0
-TTS_GENPCM_8BITS = 1
-TTS_GENPCM_ULAW = 2
-TTS_GENPCM_ALAW = 3
-
 # Available voices
 VOICES = {
 	"br1": "DeltaTalk - Marcelo (16 kHz)",
@@ -77,20 +96,45 @@ VOICE_MAP = {
 	"br2": 2   # Paula
 }
 
-# Multiplier adjusted to convert values correctly
-DT_MULTIPLIER = 20 / 100  # 100 (NVDA) → 20 (DeltaTalk), mínimo 1
-
 # DeltaTalk configuration options
 confspec = {
 	"useNVWave": "boolean(default=False)",
-	"autoEnableSymbolDict": "boolean(default=True)"
+	"autoEnableSymbolDict": "boolean(default=True)",
+	# Cache of the audio of short, repeated utterances (nvwave mode only)
+	"pcmCacheSizeMB": "integer(min=0, max=256, default=16)",
+	"pcmCacheMaxTextLength": "integer(min=1, max=1000, default=64)",
+	# Virtual Vision labels pre-rendered on disk, for every voice and the rate steps around the current one
+	"phraseCache": "boolean(default=True)",
+	"phraseCacheRateSteps": "integer(min=0, max=19, default=2)",
+	# Render the labels used most often into the PCM cache while speech is idle
+	"warmUp": "boolean(default=True)",
+	# Blocks synthesized ahead of playback; each holds about a third of a second of audio
+	"pipelineBlocks": "integer(min=1, max=32, default=6)",
+	# Extra engine instances synthesizing the next chunks of long texts in parallel (0 disables)
+	"enginePoolSize": "integer(min=0, max=8, default=0)",
+	# Engine instances run in helper processes, so a hang or crash of the DLL cannot take NVDA down (0 disables).
+	# The first one speaks, the others read ahead like the engine pool. They need a 32-bit Python interpreter.
+	"hostProcesses": "integer(min=0, max=4, default=0)",
+	"hostPython": "string(default='')",
+	# DSP mode and encoding of the audio; the telephony profiles generate 8 kHz audio.
+	# nvwave plays 16-bit PCM instead of mu-law and A-law, which only the stream sink writes
+	"outputProfile": 'option("multimedia", "telephony", "telephony-pcm8", "telephony-ulaw", "telephony-alaw", default="multimedia")',
+	# Where the audio goes in nvwave mode: nvwave, or a file or named pipe written in frames of frameMs, in real time
+	"audioSink": 'option("nvwave", "stream", default="nvwave")',
+	"sinkPath": "string(default='')",
+	"frameMs": "integer(min=10, max=100, default=20)",
+	# Play every voice at 22 kHz through one player, instead of one player per sample rate
+	"resampleVoices": "boolean(default=False)",
+	# Without nvwave, report indexes as the duration model estimates the engine reaches them, rather than all
+	# at once. Approximate: the engine tells nothing of its progress, so they may run ahead of or behind the speech
+	"estimatedIndexes": "boolean(default=False)",
 }
 
 config.conf.spec["deltaTalk"] = confspec
 
-def convert_nvda_to_dt(value):
-	"""Converts a value from the NVDA scale (0-100) to the DeltaTalk scale (1-20)."""
-	return max(1, min(20, int(value * DT_MULTIPLIER)))
+def virtual_vision_labels():
+	"""Returns the role and state labels announced by Virtual Vision, sorted."""
+	return sorted(set(CONTROL_TYPE_NAMES.values()) | set(STATE_NAMES.values()) | set(NEGATIVE_STATE_NAMES.values()))
 
 class SynthDriver(SynthDriverBase):
 	"""DeltaTalk Synthesizer driver for NVDA."""
@@ -103,6 +147,8 @@ class SynthDriver(SynthDriverBase):
 		SynthDriver.RateSetting(),
 		SynthDriver.PitchSetting(),
 		SynthDriver.VolumeSetting(),
+		# Rates past DeltaTalk rate 20, by speeding up the audio; needs nvwave and 16-bit audio
+		SynthDriver.RateBoostSetting(),
 	]
 
 	supportedCommands = {
@@ -124,7 +170,7 @@ class SynthDriver(SynthDriverBase):
 			log.debug(_("Dtalk32.dll not found"))
 			return False
 		try:
-			ctypes.WinDLL(dll_path)
+			Dtalk32Backend(dll_path)
 			log.debug(_("Dtalk32.dll loaded successfully"))
 			return True
 		except Exception as e:
@@ -136,16 +182,62 @@ class SynthDriver(SynthDriverBase):
 		self._rate = 50
 		self._pitch = 50
 		self._volume = 100
+		self._prosody = self._base_prosody()  # Rate, pitch and volume of the text being synthesized
 		self._voice = "br1"
 		self._lastIndex = 0
 		self.instancia = None
-		self._nvwave_player = None
+		self._settings = None  # Applied to the main instance right before each synthesis
+		self._nvwave_player = None  # The current player of the pool
+		self._feed_pcm = None
+		self._players = None
+		self._resampler = None  # Converting the current utterance to the rate of the player, if they differ
+		self._effects = None  # Gain and tempo of the current utterance, if any
+		self._pcm = None
+		self._pacing = PacingScheduler()
+		self._indexes = IndexTracker()
+		self._durations = None  # Estimates how long texts take to speak, if brazil.alp and brport.lng could be read
+		self._estimated_indexes = None  # Reports direct playback indexes when estimated to be reached, with estimatedIndexes
+		self._utterance_prosody = None  # EngineProsody of the utterance being fed
+		self._pcm_cache = PCMCache(
+			max_bytes=config.conf["deltaTalk"]["pcmCacheSizeMB"] * 1024 * 1024,
+			max_text_length=config.conf["deltaTalk"]["pcmCacheMaxTextLength"],
+		)
+		self._phrase_cache = None
+		self._phrase_cache_thread = None
+		self._phrase_cache_stop = threading.Event()
+		self._phrase_cache_lock = threading.Lock()
+		self._phrase_cache_target = None  # (settings, fingerprint) the phrase cache must be rendered with
+		self._engine_fingerprint = None  # Of the DLLs and data files, computed once
+		self._usage = None
+		self._warm_up = None
+		# Rewrites the text of speak before anything else, and reloads itself when the file changes
+		self._dictionary = DictionaryFile(
+			os.path.join(globalVars.appArgs.configPath, "deltaTalk", "pronunciations.txt"), on_reload=self._on_dictionary_loaded)
 		self._use_nvwave = config.conf["deltaTalk"]["useNVWave"]  # Activate it in DeltaTalk Settings to test audio playback via nvwave
+		self._profile = PROFILES[config.conf["deltaTalk"]["outputProfile"]]
+		self._use_sink = config.conf["deltaTalk"]["audioSink"] == "stream" and bool(config.conf["deltaTalk"]["sinkPath"])
+		if not self._use_sink and self._profile.encoding in ("ulaw", "alaw"):
+			self._profile = self._profile._replace(encoding="pcm")
+		self._pcm_format = ENCODINGS[self._profile.encoding].pcm_format
+		# Fine volume and rate boost act on the audio before it is played, so nvwave mode with 16-bit audio only
+		self._rate_boost = False
+		self._prosody_map = ProsodyMap(effects=self._use_nvwave and ENCODINGS[self._profile.encoding].sample_width == 2)
+		# Every voice played at the highest rate shares one player; the stream sink has a single one
+		self._shared_rate = None
+		if config.conf["deltaTalk"]["resampleVoices"] or self._use_sink:
+			self._shared_rate = max(sample_rate(self._profile, voice_id) for voice_id in VOICE_MAP.values())
 		self._audio_thread = None
-		self._audio_queue = queue.Queue(maxsize=50)  # Reduced to avoid overloading
+		self._feed_thread = None
+		self._feed_queue = queue.Queue()  # Bounded by the ring, as every block in it holds a ring buffer
+		self._ring = PCMRing(config.conf["deltaTalk"]["pipelineBlocks"])
+		self._engine_pool = None  # An EnginePool, or a HostPool in host mode
+		self._pool_job = None  # The PoolJob being played, which cancel stops
+		self._host = None
+		self._audio_queue = SpeechScheduler()  # Never blocks speak(), drops the oldest item of a full class
+		self._interrupted = False  # Whether cancel was called since the last speak
 		self._audio_thread_running = False
-		self._audio_lock = threading.Lock()
-		self._is_speaking = False  # Status to track if the DLL is busy
+		self._engine_gate = EngineGate()  # Only one thread at a time may use the instance
+		self._epoch = CancelEpoch()  # Advanced by cancel, so that speech queued before is dropped
 
 		# Add-on path
 		addon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "deltatalk")
@@ -156,7 +248,7 @@ class SynthDriver(SynthDriverBase):
 			raise RuntimeError(_("DeltaTalk DLL not found. Check the installation of the add-on."))
 
 		try:
-			self.dt = ctypes.WinDLL(dll_path)
+			self.dt = Dtalk32Backend(dll_path)
 			log.debug(_("DLL loaded successfully"))
 		except Exception as e:
 			log.error(_("Error loading DeltaTalk DLL in {path}: {error}").format(path=dll_path, error=e))
@@ -165,6 +257,7 @@ class SynthDriver(SynthDriverBase):
 
 		if not self._initialize_tts():
 			raise RuntimeError(_("DeltaTalk synthesizer failed to initialize"))
+		self._load_duration_model(addon_path)
 
 		# Activate symbol dictionary
 		try:
@@ -176,6 +269,16 @@ class SynthDriver(SynthDriverBase):
 		if self.instancia and self._use_nvwave:
 			self._setup_nvwave()
 			self._start_audio_thread()
+			if config.conf["deltaTalk"]["hostProcesses"]:
+				self._start_hosts(config.conf["deltaTalk"]["hostProcesses"], dll_path)
+			if config.conf["deltaTalk"]["enginePoolSize"] and not self._host:
+				self._open_engine_pool(config.conf["deltaTalk"]["enginePoolSize"])
+			if config.conf["deltaTalk"]["phraseCache"] and self._profile == PROFILES["multimedia"]:
+				self._load_phrase_cache()
+			self._usage = UsageCounts(
+				os.path.join(globalVars.appArgs.configPath, "deltaTalk", "usage.json"), virtual_vision_labels())
+			if config.conf["deltaTalk"]["warmUp"] and self._pcm_cache.max_bytes:
+				self._start_warm_up()
 
 	def _initialize_tts(self):
 		if not self.dt:
@@ -183,12 +286,15 @@ class SynthDriver(SynthDriverBase):
 			return False
 		try:
 			log.debug(_("Starting TTS initialization"))
-			self.instancia = self.dt.TTSENG_Init(False, None, DSP_MODES["MULTIMEDIA"])
+			self.instancia = self.dt.init(self._profile.dsp_mode)
 			if self.instancia <= 0:
 				log.error(_("Error initializing TTS: {error}").format(error=ERROR_CODES.get(self.instancia, {"friendly": _("Unknown error")})["friendly"]))
 				self.instancia = None
 				return False
 			log.debug(_("DeltaTalk initialized. Instance: {instance}").format(instance=self.instancia))
+			# A single block buffer per instance, reused by every TTSENG_GenAudioBuffer call
+			self._pcm = PCMBuffer()
+			self._settings = EngineSettings(self.dt, self.instancia)
 			self._apply_settings()
 			return True
 		except Exception as e:
@@ -196,6 +302,27 @@ class SynthDriver(SynthDriverBase):
 			self.instancia = None
 			return False
 
+	def _load_duration_model(self, data_path):
+		"""Loads the phoneme durations and the lexicon telling how long texts take to speak."""
+		index_path = os.path.join(globalVars.appArgs.configPath, "deltaTalk", "brport.idx")
+		try:
+			os.makedirs(os.path.dirname(index_path), exist_ok=True)
+			phonetizer = load_phonetizer(
+				os.path.join(data_path, "brazil.alp"), os.path.join(data_path, "brport.lng"), index_path)
+		except (OSError, AlphabetError, LexiconError) as e:
+			log.warning(_("Duration model unavailable, chunks are measured in characters: {error}").format(error=e))
+			return
+		self._durations = DurationModel(phonetizer)
+		if config.conf["deltaTalk"]["estimatedIndexes"]:
+			self._estimated_indexes = EstimatedIndexes(self._notify_index)
+		log.debug(_("Duration model loaded: {words} words").format(words=len(phonetizer.lexicon)))
+
+	def _estimate_ms(self, text, engine_prosody):
+		"""Returns how long text is expected to take to speak with engine_prosody, or None without the duration model."""
+		if not self._durations:
+			return None
+		return self._durations.estimate(text, engine_prosody.rate, engine_prosody.tempo)
+
 	def _ensure_symbol_dictionary_active(self):
 		"""Ensures that the DeltaTalk symbol dictionary is active when the synthesizer is selected."""
 		try:
@@ -210,28 +337,77 @@ class SynthDriver(SynthDriverBase):
 			log.error(_("Error managing symbol dictionary: {error}").format(error=e))
 
 	def _get_voice_sample_rate(self):
-		"""Returns the sample rate based on the selected voice."""
-		return 16000 if self._voice == "br1" else 22050
+		"""Returns the sample rate based on the selected voice and the output profile."""
+		return sample_rate(self._profile, VOICE_MAP[self._voice])
 
 	def _setup_nvwave(self):
-		"""Configures nvwave for audio playback."""
+		"""Opens the player of the current voice, in the pool of players kept open for every sample rate."""
+		self._players = PlayerPool(self._open_player)
 		try:
-			sample_rate = self._get_voice_sample_rate()
-			channels = 1
-			bits_per_sample = 16
-			output_device = config.conf["audio"]["outputDevice"]
-			self._nvwave_player = nvwave.WavePlayer(
-				channels=channels,
-				samplesPerSec=sample_rate,
-				bitsPerSample=bits_per_sample,
-				outputDevice=output_device,
-			)
-			log.debug(_("nvwave configured: {rate}Hz, {channels} channels, {bits} bits, device: {device}").format(
-				rate=sample_rate, channels=channels, bits=bits_per_sample, device=output_device))
+			self._select_player(self._output_rate(self._get_voice_sample_rate()))
 		except Exception as e:
 			log.error(_("Error configuring nvwave: {error}").format(error=e))
 			self._nvwave_player = None
 			self._use_nvwave = False
+			self._prosody_map = ProsodyMap()
+			self._apply_settings()
+
+	def _open_player(self, sample_rate):
+		"""Opens an nvwave player for sample_rate, or the stream sink replacing it."""
+		sample_width = ENCODINGS[self._profile.encoding].sample_width
+		if self._use_sink:
+			path = config.conf["deltaTalk"]["sinkPath"]
+			sink = FrameSink.open(
+				path,
+				sample_rate * sample_width,
+				sample_rate * config.conf["deltaTalk"]["frameMs"] // 1000 * sample_width,
+				ENCODINGS[self._profile.encoding].silence,
+			)
+			log.debug(_("Audio sink opened: {path}, {rate}Hz, {encoding}").format(
+				path=path, rate=sample_rate, encoding=self._profile.encoding))
+			return sink
+		channels = 1
+		bits_per_sample = 8 * sample_width
+		output_device = config.conf["audio"]["outputDevice"]
+		player = nvwave.WavePlayer(
+			channels=channels,
+			samplesPerSec=sample_rate,
+			bitsPerSample=bits_per_sample,
+			outputDevice=output_device,
+		)
+		log.debug(_("nvwave configured: {rate}Hz, {channels} channels, {bits} bits, device: {device}").format(
+			rate=sample_rate, channels=channels, bits=bits_per_sample, device=output_device))
+		return player
+
+	def _output_rate(self, sample_rate):
+		"""Returns the sample rate audio of sample_rate is played at."""
+		return self._shared_rate or sample_rate
+
+	def _select_player(self, sample_rate):
+		"""Makes the player of sample_rate the current one, once the previous one has played what it was fed."""
+		output = self._players.get(sample_rate)
+		if output.player is self._nvwave_player:
+			return
+		if self._nvwave_player:
+			self._nvwave_player.idle()
+		self._nvwave_player = output.player
+		self._feed_pcm = output.feed
+
+	def _start_utterance(self, sample_rate, prosody, expected_ms=None):
+		"""Selects the player for audio of sample_rate, resampling it if needed, and starts pacing the utterance.
+
+		prosody is the EngineProsody the audio is generated with, whose gain and tempo are applied to it,
+		and expected_ms the estimate of how long it plays, if any.
+		"""
+		output_rate = self._output_rate(sample_rate)
+		self._select_player(output_rate)
+		self._resampler = Resampler(sample_rate, output_rate) if output_rate != sample_rate else None
+		self._effects = AudioEffects(sample_rate, prosody) if AudioEffects.needed(prosody) else None
+		self._utterance_prosody = prosody
+		self._pacing.start_utterance(output_rate * ENCODINGS[self._profile.encoding].sample_width, expected_ms)
+		if expected_ms is not None:
+			log.debug(_("Utterance expected to play for {expected:.0f} ms, {remaining:.0f} ms of speech ahead of its end").format(
+				expected=expected_ms, remaining=self._pacing.remaining_ms()))
 
 	def _start_audio_thread(self):
 		"""Starts the audio processing thread."""
@@ -239,156 +415,561 @@ class SynthDriver(SynthDriverBase):
 			self._audio_thread_running = True
 			self._audio_thread = threading.Thread(target=self._audio_worker, daemon=True)
 			self._audio_thread.start()
+			self._feed_thread = threading.Thread(target=self._feed_worker, daemon=True)
+			self._feed_thread.start()
 			log.debug(_("Audio thread started"))
 
 	def _audio_worker(self):
-		"""Worker thread that processes the audio queue."""
+		"""Synthesis stage: takes speech from the audio queue and synthesizes it into the ring.
+
+		Everything meant for the player goes through _to_player, so that the engine starts on
+		the next chunk while the feed thread is still playing the previous one.
+		"""
 		while self._audio_thread_running:
 			try:
 				item = self._audio_queue.get(timeout=1.0)
 				if item is None:
 					break
-				text, index = item
-				log.debug(_("Processing text in audio worker: {text}, index: {index}").format(text=text, index=index))
-				# Split long texts into smaller pieces
-				if len(text) > 100:
-					chunks = [text[i:i+100] for i in range(0, len(text), 100)]
-					for chunk in chunks:
-						self._generate_and_play_audio(chunk, index)
-						index = None  # Index only for the first chunk
+				epoch, segments = item
+				if self._epoch.is_stale(epoch):
+					self._epoch.skipped += 1
 				else:
-					self._generate_and_play_audio(text, index)
-				self._audio_queue.task_done()
+					log.debug(_("Processing speech sequence in audio worker: {count} segments").format(count=len(segments)))
+					self._play_segments(segments, epoch)
 			except queue.Empty:
 				continue
 			except Exception as e:
 				log.error(_("Error in audio worker: {error}").format(error=e))
 
-	def _generate_and_play_audio(self, text, index=None):
+	def _play_segments(self, segments, epoch):
+		"""Synthesizes a compiled speech sequence via nvwave, taking the engine once for all of it.
+
+		Stops as soon as cancel makes epoch stale.
+		"""
+		with self._engine_gate.hold():
+			try:
+				for segment in segments:
+					if self._epoch.is_stale(epoch):
+						break
+					if segment.text is None:
+						# Index or end of speech marker, reported once the audio queued before it has played
+						self._to_player(epoch, self._feed_marker, segment.index)
+						continue
+					self._apply_prosody(segment.prosody)
+					# Split long texts at sentence and clause boundaries, with a short first chunk
+					chunks = chunk_text(segment.text, segment.index, reach=self._chunk_reach(segment.prosody))
+					if self._engine_pool and len(self._engine_pool):
+						self._play_chunks_pooled(chunks, segment.prosody, epoch)
+						continue
+					for chunk in chunks:
+						if self._epoch.is_stale(epoch):
+							break
+						self._generate_and_play_audio(chunk.text, chunk.index, epoch)
+			finally:
+				self._apply_prosody(self._base_prosody())
+
+	def _chunk_reach(self, prosody):
+		"""Returns where the chunks after the first end with the duration model, about CHUNK_MS of speech, or None without it."""
+		if not self._durations:
+			return None
+		engine_prosody = self._engine_prosody(prosody)
+		return partial(self._durations.reach, ms=CHUNK_MS, rate=engine_prosody.rate, tempo=engine_prosody.tempo)
+
+	def _generate_and_play_audio(self, text, index=None, epoch=None):
 		"""Generates audio using TTSENG_GenAudioBuffer in multi-block mode and plays via nvwave."""
 		if not self.instancia or not self._nvwave_player:
 			log.warning(_("Falling back to direct playback due to missing instance or nvwave player"))
-			return self._speak_or_append_direct(text)
-		
-		with self._audio_lock:
-			if self._is_speaking:
-				log.debug(_("Waiting for previous synthesis to complete"))
-				timeout = time.time() + 2.0
-				while self._is_speaking and time.time() < timeout:
-					time.sleep(0.01)
-				if self._is_speaking:
-					log.warning(_("Synthesis timeout, falling back to direct playback"))
-					return self._speak_or_append_direct(text)
-			
-			self._is_speaking = True
+			if index is not None:
+				synthIndexReached.notify(synth=self, index=index)
+			return self._play_direct(text)
+
+		if index is not None:
+			self._to_player(epoch, self._feed_marker, index)
+		if self._usage:
+			# Virtual Vision joins the parts of an announcement with " - "
+			self._usage.record(text.split(" - "))
+
+		# Short utterances already heard with the same settings are played without calling the DLL
+		cache_key = None
+		if len(text) <= self._pcm_cache.max_text_length:
+			cache_key = self._pcm_cache_key(text)
+			if self._play_cached(cache_key, epoch):
+				log.debug(_("Playing cached audio for text: {text}").format(text=text))
+				return
+			if not self._pcm_cache.cacheable(text):
+				cache_key = None
 		
+		engine_prosody = self._engine_prosody(self._prosody)
+		self._to_player(
+			epoch, self._start_utterance, self._get_voice_sample_rate(), engine_prosody, self._estimate_ms(text, engine_prosody))
 		try:
 			log.debug(_("Attempting to generate audio for text: {text}, index: {index}").format(text=text, index=index))
-			buffer_size = 16384
 			encoded_text = text.encode("ansi", errors="replace")
 			log.debug(_("Starting multi-block audio generation, text length: {length}").format(length=len(encoded_text)))
 			
-			# Start generation with NEW_MULTI_BLOCK
-			audio_buffer = (ctypes.c_byte * buffer_size)()
-			bytes_written = ctypes.c_int(0)
-			log.debug(_("Calling TTSENG_GenAudioBuffer with NEW_MULTI_BLOCK, buffer size: {size}").format(size=buffer_size))
-			result = self.dt.TTSENG_GenAudioBuffer(
-				self.instancia,
-				c_char_p(encoded_text),
-				TTS_GENPCM_NEW_MULTI_BLOCK,
-				TTS_GENPCM_16BITS,
-				audio_buffer,
-				buffer_size,
-				ctypes.byref(bytes_written)
-			)
-			log.debug(_("TTSENG_GenAudioBuffer (NEW_MULTI_BLOCK) returned: {result}, bytes written: {bytes}").format(
-				result=result, bytes=bytes_written.value))
-			
-			if result != 0:
-				log.error(_("Error starting multi-block audio: {error} ({code})").format(
-					error=ERROR_CODES.get(result, {"friendly": _("Unknown error")})["friendly"], code=result))
-				self._is_speaking = False
-				return self._speak_or_append_direct(text)
-			
-			# Process initial blocks
-			if bytes_written.value > 0:
-# Convert c_byte to bytes handling negative values
-				audio_data = bytes((b & 0xFF) for b in audio_buffer[:bytes_written.value])
-				log.debug(_("Feeding initial audio data to nvwave: {bytes} bytes").format(bytes=len(audio_data)))
-				self._nvwave_player.feed(audio_data, onDone=lambda: self._on_audio_done(index))
-			
-			# Continue with NEXT_BLOCK until complete
-			while True:
-				audio_buffer = (ctypes.c_byte * buffer_size)()
-				bytes_written = ctypes.c_int(0)
-				log.debug(_("Calling TTSENG_GenAudioBuffer with NEXT_BLOCK, buffer size: {size}").format(size=buffer_size))
-				result = self.dt.TTSENG_GenAudioBuffer(
-					self.instancia,
-					None,
-					TTS_GENPCM_NEXT_BLOCK,
-					TTS_GENPCM_16BITS,
-					audio_buffer,
-					buffer_size,
-					ctypes.byref(bytes_written)
-				)
-				log.debug(_("TTSENG_GenAudioBuffer (NEXT_BLOCK) returned: {result}, bytes written: {bytes}").format(
-					result=result, bytes=bytes_written.value))
-				
-				if result == -17:  # TTS_PCM_FINISHED
-					log.debug(_("PCM audio processing completed"))
+			audio = bytearray() if cache_key else None
+			for source, length, offset, release in self._synthesize_blocks(encoded_text):
+				if self._epoch.is_stale(epoch):
+					# Cancelled while this block was generated, it must not reach the player
+					self._epoch.discarded_blocks += 1
+					release()
 					break
-				elif result != 0:
-					log.error(_("Error processing multi-block audio: {error} ({code})").format(
-						error=ERROR_CODES.get(result, {"friendly": _("Unknown error")})["friendly"], code=result))
-					self._is_speaking = False
-					return self._speak_or_append_direct(text)
-				
-				if bytes_written.value > 0:
-					audio_data = bytes((b & 0xFF) for b in audio_buffer[:bytes_written.value])
-					log.debug(_("Feeding audio data to nvwave: {bytes} bytes").format(bytes=len(audio_data)))
-					self._nvwave_player.feed(audio_data, onDone=lambda: self._on_audio_done(None))
-				
-				# Adjustable delay
-				time.sleep(0.05)
-			
-			log.debug(_("Audio successfully fed to nvwave for text: {text}").format(text=text))
+				if audio is not None:
+					audio += source.view[offset:offset + length]
+				self._to_player(epoch, self._feed_block, source, length, offset, release=release)
+			if self._epoch.is_stale(epoch):
+				self._epoch.aborted += 1
+				log.debug(_("Synthesis cancelled for text: {text}").format(text=text))
+			else:
+				log.debug(_("PCM audio processing completed"))
+				if audio:
+					self._pcm_cache.put(cache_key, audio)
 		
+		except EngineError as e:
+			log.error(_("Error processing multi-block audio: {error} ({code})").format(
+				error=ERROR_CODES.get(e.code, {"friendly": _("Unknown error")})["friendly"], code=e.code))
+			self._play_direct(text)
+		except HostError as e:
+			log.warning(_("Synthesis host failed, speaking directly: {error}").format(error=e))
+			self._play_direct(text)
 		except Exception as e:
 			log.error(_("Exception in audio generation: {error}").format(error=e))
-			self._is_speaking = False
-			self._speak_or_append_direct(text)
+			self._play_direct(text)
 		
 		finally:
-			self._is_speaking = False
+			self._to_player(epoch, self._end_utterance)
 
-	def _on_audio_done(self, index):
-		"""Callback called when the audio finishes playing."""
-		if index is not None:
-			synthIndexReached.notify(synth=self, index=index)
-		synthDoneSpeaking.notify(synth=self)
+	def _synthesize_blocks(self, encoded_text):
+		"""Yields (source, length, offset, release) for each block of encoded_text.
 
-	def _speak_or_append_direct(self, text):
-		"""Direct playback as fallback."""
-		if not text:
+		The block is length bytes of source from offset, and release gives its memory back once it was fed.
+		Blocks come from the synthesis host if there is one, otherwise from the main instance into the ring,
+		and either way only as many are generated ahead as there are buffers to hold them.
+		"""
+		host = self._host
+		if host:
+			host.configure(*self._engine_settings(self._prosody))
+			for slot, length in host.synthesize(encoded_text, self._pcm_format):
+				yield host, length, host.offset(slot), partial(host.release, slot)
 			return
-		with self._audio_lock:
-			if self._is_speaking:
-				log.debug(_("Waiting for previous direct playback to complete"))
-				timeout = time.time() + 2.0
-				while self._is_speaking and time.time() < timeout:
-					time.sleep(0.01)
-				if self._is_speaking:
-					log.warning(_("Direct playback timeout, skipping"))
-					return
-			
-			self._is_speaking = True
-		
+		self._commit_settings()
+		for block, length in generate_blocks(
+			self.dt, self.instancia, encoded_text, self._ring.acquire, self._pcm_format, self._ring.release):
+			yield block, length, 0, partial(self._ring.release, block)
+
+	def _engine_settings(self, prosody):
+		"""Returns the voice id, rate, volume and pitch of the engine for prosody."""
+		engine_prosody = self._engine_prosody(prosody)
+		return VOICE_MAP[self._voice], engine_prosody.rate, engine_prosody.volume, engine_prosody.pitch
+
+	def _engine_prosody(self, prosody):
+		"""Returns the EngineProsody of the NVDA rate, pitch and volume of prosody."""
+		return self._prosody_map.lookup(prosody.rate, prosody.pitch, prosody.volume)
+
+	def _start_hosts(self, count, dll_path):
+		"""Starts the synthesis host, and the read-ahead hosts replacing the engine pool."""
+		python = config.conf["deltaTalk"]["hostPython"]
+		if not os.path.isfile(python):
+			log.warning(_("Synthesis hosts need a Python interpreter, set hostPython to its path"))
+			return
+		backend = ("dtalk32", dll_path)
+		try:
+			self._host = SynthesisHost(backend, slots=self._ring.slots, dsp_mode=self._profile.dsp_mode, python=python)
+		except (HostError, EngineError, OSError) as e:
+			log.warning(_("Could not start the synthesis host, synthesizing in process: {error}").format(error=e))
+			return
+		log.debug(_("Synthesis host started"))
+		if count > 1:
+			self._engine_pool = HostPool(count - 1, backend, dsp_mode=self._profile.dsp_mode, python=python)
+			for error in self._engine_pool.failures:
+				log.warning(_("Read-ahead hosts reduced to {size}: {error}").format(size=len(self._engine_pool), error=error))
+
+	def _open_engine_pool(self, size):
+		self._engine_pool = EnginePool(self.dt, size, self._profile.dsp_mode)
+		for code in self._engine_pool.failures:
+			log.warning(_("Engine pool reduced to {size} instances: {error}").format(
+				size=len(self._engine_pool), error=ERROR_CODES.get(code, {"friendly": _("Unknown error")})["friendly"]))
+		log.debug(_("Engine pool opened with {size} instances").format(size=len(self._engine_pool)))
+
+	def _play_chunks_pooled(self, chunks, prosody, epoch):
+		"""Plays the first chunk from the main instance, so it starts quickly, while the pool synthesizes the others."""
+		first = next(chunks, None)
+		rest = list(chunks)
+		if not rest:
+			if first:
+				self._generate_and_play_audio(first.text, first.index, epoch)
+			return
+		self._engine_pool.configure(*self._engine_settings(prosody))
+		job = self._engine_pool.render(
+			[chunk.text.encode("ansi", errors="replace") for chunk in rest], self._pcm_format,
+			stale=lambda: self._epoch.is_stale(epoch))
+		self._pool_job = job
+		played = 0
+		engine_prosody = self._engine_prosody(prosody)
+		expected = [None] * len(rest)
+		if self._durations:
+			expected = self._durations.estimate_many(
+				[chunk.text for chunk in rest], engine_prosody.rate, engine_prosody.tempo)
+		try:
+			self._generate_and_play_audio(first.text, first.index, epoch)
+			for audio in job:
+				if self._epoch.is_stale(epoch):
+					break
+				self._to_player(
+					epoch, self._start_utterance, self._get_voice_sample_rate(), engine_prosody, expected[played])
+				queued = self._queue_pcm(audio, epoch)
+				self._to_player(epoch, self._end_utterance)
+				played += 1
+				if not queued:
+					break
+		except Exception as e:
+			log.warning(_("Engine pool failed, continuing on the main instance: {error}").format(
+				error=ERROR_CODES.get(e.code, {"friendly": _("Unknown error")})["friendly"]
+				if isinstance(e, EngineError) else e))
+			for chunk in rest[played:]:
+				if self._epoch.is_stale(epoch):
+					break
+				self._generate_and_play_audio(chunk.text, chunk.index, epoch)
+		finally:
+			job.cancel()
+			if self._pool_job is job:
+				self._pool_job = None
+
+	def _queue_pcm(self, audio, epoch):
+		"""Hands PCM synthesized elsewhere to the feed thread, block by block through the ring.
+
+		Returns False if cancel interrupted it.
+		"""
+		view = memoryview(audio)
+		offset = 0
+		while offset < len(audio):
+			block = self._ring.acquire()
+			if block is None:
+				return False
+			length = min(block.size, len(audio) - offset)
+			block.view[:length] = view[offset:offset + length]
+			self._to_player(epoch, self._feed_block, block, length, release=partial(self._ring.release, block))
+			offset += length
+		return True
+
+	def _to_player(self, epoch, action, *args, release=None):
+		"""Hands action to the feed thread, which runs the actions in order unless epoch is stale by then.
+
+		release, which gives back the memory of the block fed by action, is called once the action ran or was dropped.
+		"""
+		self._feed_queue.put((epoch, action, args, release))
+
+	def _feed_worker(self):
+		"""Playback stage: runs the actions of the audio worker, feeding nvwave at the pace it plays."""
+		while True:
+			item = self._feed_queue.get()
+			if item is None:
+				break
+			epoch, action, args, release = item
+			try:
+				if not self._epoch.is_stale(epoch):
+					action(*args)
+				elif release is not None:
+					self._epoch.discarded_blocks += 1
+			except Exception as e:
+				log.error(_("Error in feed worker: {error}").format(error=e))
+			finally:
+				if release is not None:
+					release()
+
+	def _feed_block(self, source, length, offset=0):
+		"""Feeds length bytes of source to nvwave, then waits until the queued audio runs low."""
+		if self._resampler or self._effects:
+			return self._feed_bytes(source.view[offset:offset + length])
+		log.debug(_("Feeding audio data to nvwave: {bytes} bytes").format(bytes=length))
+		self._feed_pcm(source, length, offset=offset)
+		self._indexes.fed(length)
+		self._pacing.fed(length)
+		# Feed the next block only once the queued audio runs low, or cancel wakes us up
+		self._pacing.wait_for_room()
+
+	def _feed_bytes(self, data):
+		"""Feeds audio held in bytes, such as the PCM cache entries, to nvwave."""
+		if self._effects:
+			data = self._effects.process(data)
+		if self._resampler:
+			data = self._resampler.convert(data)
+		if not data:
+			return
+		self._nvwave_player.feed(data)
+		self._indexes.fed(len(data))
+		self._pacing.fed(len(data))
+		self._pacing.wait_for_room()
+
+	def _end_utterance(self):
+		if self._effects:
+			# The time stretcher holds back the end of the audio
+			effects, self._effects = self._effects, None
+			self._feed_bytes(effects.flush())
+		measured = self._pacing.end_utterance()
+		if measured and self._durations:
+			expected_ms, played_ms = measured
+			prosody = self._utterance_prosody
+			self._durations.record(prosody.rate, expected_ms, played_ms, prosody.tempo)
+			log.debug(_("Utterance expected to play for {expected:.0f} ms, played for {played:.0f} ms at rate {rate}").format(
+				expected=expected_ms, played=played_ms, rate=prosody.rate))
+		stats = self._pacing.stats
+		log.debug(_("Time to first audio: {time} ms, underruns: {underruns}").format(
+			time=stats.last_time_to_first_audio_ms(), underruns=stats.underruns))
+
+	def _pcm_cache_key(self, text):
+		prosody = self._engine_prosody(self._prosody)
+		return PCMCache.make_key(text, self._voice, prosody.rate, prosody.pitch, prosody.volume)
+
+	def _play_cached(self, key, epoch):
+		"""Plays the audio of key from the phrase cache or the PCM cache, returning False if neither has it."""
+		phrase_cache = self._phrase_cache
+		found = None
+		# Held until the block is fed, so a rebuild replacing it cannot unmap it before
+		if phrase_cache and phrase_cache.acquire():
+			found = phrase_cache.lookup(key)
+			if not found:
+				phrase_cache.release()
+		if found:
+			offset, length = found
+			# Fed straight from the memory-mapped file
+			action, args, release = self._feed_block, (phrase_cache, length, offset), phrase_cache.release
+		else:
+			data = self._pcm_cache.get(key)
+			if data is None:
+				return False
+			action, args, release = self._feed_bytes, (data,), None
+		self._to_player(epoch, self._start_utterance, self._get_voice_sample_rate(), self._engine_prosody(self._prosody))
+		self._to_player(epoch, action, *args, release=release)
+		self._to_player(epoch, self._end_utterance)
+		return True
+
+	def _start_warm_up(self):
+		"""Starts rendering the Virtual Vision labels into the PCM cache, most used first."""
+		self._warm_up = WarmUp(
+			self._usage.ranked(),
+			self._warm_up_label,
+			is_busy=lambda: self._engine_gate.busy or not self._audio_queue.empty(),
+			on_finished=self._log_warm_up_coverage,
+		)
+		self._warm_up.start()
+		log.debug(_("Warm-up started: {count} labels").format(count=len(self._warm_up.texts)))
+
+	def _warm_up_label(self, text):
+		"""Renders text into the PCM cache with the current settings, returning RENDERED, CACHED or REFUSED."""
+		key = self._pcm_cache_key(text)
+		if key in self._pcm_cache or (self._phrase_cache and key in self._phrase_cache):
+			return CACHED
+		# Never makes speech wait for the engine
+		if not self._engine_gate.acquire(blocking=False):
+			return REFUSED
+		try:
+			self._commit_settings()
+			self._pcm_cache.put(key, render_pcm(
+				self.dt, self.instancia, text.encode("ansi", errors="replace"), self._pcm, self._pcm_format))
+			return RENDERED
+		except EngineError as e:
+			log.debug(_("Warm-up could not render {text}: {error}").format(text=text, error=e))
+			return REFUSED
+		finally:
+			self._engine_gate.release()
+
+	def _log_warm_up_coverage(self):
+		coverage = self._warm_up.coverage(self._usage)
+		log.debug(_("Warm-up covered {labels} of {total} labels, {usage:.0%} of the observed usage").format(**coverage))
+		if self._warm_up.failed:
+			log.debug(_("Warm-up gave up on {count} labels").format(count=len(self._warm_up.failed)))
+
+	def _on_dictionary_loaded(self, dictionary, error):
+		"""Called from the thread loading the user dictionary."""
+		if error:
+			log.warning(_("Could not read the user dictionary, keeping the previous one: {error}").format(error=error))
+		else:
+			log.debug(_("User dictionary loaded: {count} entries, {states} states").format(
+				count=len(dictionary), states=dictionary.automaton.states))
+
+	def _phrase_cache_path(self, fingerprint):
+		# One file per fingerprint, so a rebuild never replaces the file speech may be reading
+		return os.path.join(globalVars.appArgs.configPath, "deltaTalk", "phrases-{}.dtpc".format(fingerprint.hex()[:12]))
+
+	def _phrase_cache_settings(self):
+		"""Returns what the phrase cache is rendered with: the voices, the rate window, pitch, volume and DSP mode."""
+		steps = config.conf["deltaTalk"]["phraseCacheRateSteps"]
+		base = self._engine_prosody(self._base_prosody())
+		return (
+			tuple(VOICE_MAP.items()), max(1, base.rate - steps), min(20, base.rate + steps),
+			base.pitch, base.volume, self._profile.dsp_mode,
+		)
+
+	def _load_phrase_cache(self):
+		"""Maps the phrase cache file, or builds it in the background if it is missing or stale."""
+		if self._engine_fingerprint is None:
+			data_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "deltatalk")
+			# Any change to the DLLs or data files invalidates the pre-rendered audio; their sizes and dates tell
+			# without reading megabytes on the thread loading the synth
+			try:
+				self._engine_fingerprint = fingerprint_stats([os.path.join(data_path, name) for name in os.listdir(data_path)])
+			except OSError as e:
+				log.warning(_("Phrase cache disabled, the engine files cannot be read: {error}").format(error=e))
+				return
+		self._refresh_phrase_cache()
+
+	def _set_phrase_cache(self, phrase_cache):
+		"""Replaces the phrase cache, closing the previous one once its queued blocks are fed. Needs _phrase_cache_lock."""
+		previous, self._phrase_cache = self._phrase_cache, phrase_cache
+		if previous:
+			previous.close()
+
+	def _refresh_phrase_cache(self):
+		"""Maps the phrase cache rendered with the current settings, or has it built in the background.
+
+		Until the new one is ready, the previous one keeps answering for the keys it holds.
+		"""
+		settings = self._phrase_cache_settings()
+		with self._phrase_cache_lock:
+			if self._phrase_cache_target and self._phrase_cache_target[0] == settings:
+				return
+			fingerprint = fingerprint_settings(self._engine_fingerprint, settings)
+			self._phrase_cache_target = (settings, fingerprint)
+			if self._phrase_cache and self._phrase_cache.fingerprint == fingerprint:
+				return
+			if self._phrase_cache_thread:
+				# The build in progress stops at its next label and starts over with these settings
+				return
+			try:
+				self._set_phrase_cache(PhraseCache(self._phrase_cache_path(fingerprint), fingerprint))
+				log.debug(_("Phrase cache mapped: {count} phrases").format(count=self._phrase_cache.count))
+				return
+			except PhraseCacheError as e:
+				log.debug(_("Phrase cache unavailable ({error}), building it").format(error=e))
+			self._phrase_cache_thread = threading.Thread(target=self._build_phrase_cache, daemon=True)
+			self._phrase_cache_thread.start()
+
+	def _build_phrase_cache(self):
+		"""Pre-renders the Virtual Vision labels into the phrase cache file, until it matches the latest settings."""
+		instance = None
+		try:
+			while not self._phrase_cache_stop.is_set():
+				with self._phrase_cache_lock:
+					settings, fingerprint = self._phrase_cache_target
+					if self._phrase_cache and self._phrase_cache.fingerprint == fingerprint:
+						self._phrase_cache_thread = None
+						return
+				if instance is None:
+					# A separate instance, so voice and rate changes here never affect speech
+					instance = self.dt.init(settings[-1])
+					if instance <= 0:
+						log.warning(_("Could not build the phrase cache: {error}").format(
+							error=ERROR_CODES.get(instance, {"friendly": _("Unknown error")})["friendly"]))
+						instance = None
+						break
+				path = self._phrase_cache_path(fingerprint)
+				try:
+					os.makedirs(os.path.dirname(path), exist_ok=True)
+					count = write_phrase_cache(path, fingerprint, self._render_vocabulary(instance, settings, fingerprint))
+					with self._phrase_cache_lock:
+						self._set_phrase_cache(PhraseCache(path, fingerprint))
+					log.debug(_("Phrase cache built: {count} phrases").format(count=count))
+					self._remove_other_phrase_caches(path)
+				except PhraseCacheError as e:
+					if not self._phrase_cache_stop.is_set() and self._phrase_cache_target[1] != fingerprint:
+						log.debug(_("Phrase cache settings changed, building it again"))
+						continue
+					log.warning(_("Could not build the phrase cache: {error}").format(error=e))
+					break
+				except (OSError, EngineError) as e:
+					log.warning(_("Could not build the phrase cache: {error}").format(error=e))
+					break
+		finally:
+			with self._phrase_cache_lock:
+				if self._phrase_cache_thread is threading.current_thread():
+					self._phrase_cache_thread = None
+			if instance is not None:
+				self.dt.close(instance)
+
+	def _remove_other_phrase_caches(self, path):
+		"""Deletes the files of earlier settings; one still mapped is left for the next build."""
+		folder = os.path.dirname(path)
+		for name in os.listdir(folder):
+			if name.startswith("phrases") and name.endswith(".dtpc") and name != os.path.basename(path):
+				try:
+					os.remove(os.path.join(folder, name))
+				except OSError:
+					pass
+
+	def _render_vocabulary(self, instance, settings, fingerprint):
+		"""Yields (key, PCM) for the Virtual Vision labels, for every voice and rate of settings.
+
+		@raise PhraseCacheError: when the driver terminates or the settings change, so that nothing is written.
+		"""
+		phrases = virtual_vision_labels()
+		voices, first_rate, last_rate, dt_pitch, dt_volume, _dsp_mode = settings
+		pcm = PCMBuffer()
+		for voice, voice_id in voices:
+			self.dt.set_voice(instance, voice_id, 10)
+			for rate in range(first_rate, last_rate + 1):
+				self.dt.set_mode(instance, rate, dt_volume, dt_pitch)
+				for text in phrases:
+					if self._phrase_cache_stop.is_set():
+						raise PhraseCacheError("cancelled")
+					if self._phrase_cache_target[1] != fingerprint:
+						raise PhraseCacheError("settings changed")
+					audio = render_pcm(self.dt, instance, text.encode("ansi", errors="replace"), pcm)
+					yield PCMCache.make_key(text, voice, rate, dt_pitch, dt_volume), audio
+
+	def _feed_marker(self, index=None):
+		"""Binds index (or the end of speech, if None) to the current end of the PCM stream.
+
+		An empty block is fed with it, so nvwave calls back once the audio fed before has played.
+		"""
+		offset = self._indexes.bind(index)
+		self._feed_pcm(self._pcm, 0, onDone=lambda: self._on_marker_played(offset))
+
+	def _on_marker_played(self, offset):
+		"""Callback called when the audio before a marker finishes playing."""
+		for index in self._indexes.reached(offset):
+			self._notify_index(index)
+
+	def _notify_index(self, index):
+		"""Reports index reached, or the end of speech if it is None."""
+		if index is None:
+			synthDoneSpeaking.notify(synth=self)
+		else:
+			synthIndexReached.notify(synth=self, index=index)
+
+	def _speak_segments_direct(self, segments):
+		"""Direct playback as fallback, reporting indexes and the end of speech as they are reached.
+
+		The engine plays on its own, so with the duration model they are reported once the text
+		before them is estimated to have been spoken, and right away without it.
+		"""
+		indexes = self._estimated_indexes
+		report = indexes.bind if indexes else self._notify_index
+		with self._engine_gate.hold():
+			try:
+				for segment in segments:
+					if segment.index is not None:
+						report(segment.index)
+					if segment.text is None:
+						if segment.index is None:
+							report(None)
+						continue
+					self._apply_prosody(segment.prosody)
+					self._play_direct(segment.text)
+					if indexes:
+						indexes.queued(self._estimate_ms(segment.text, self._engine_prosody(segment.prosody)))
+			finally:
+				self._apply_prosody(self._base_prosody())
+
+	def _play_direct(self, text):
+		"""Speaks text straight to the sound card through the DLL."""
 		try:
 			log.debug(_("Using direct playback for text: {text}").format(text=text))
 			encoded_text = text.encode("ansi", errors="replace")
-			play_result = self.dt.TTSENG_PlayText(self.instancia, c_char_p(encoded_text), True)
-			if play_result == -2:  # TTS_BUSY
-				append_result = self.dt.TTSENG_AppendText(self.instancia, c_char_p(encoded_text))
+			self._commit_settings()
+			play_result = self.dt.play_text(self.instancia, encoded_text, True)
+			if play_result == TTS_BUSY:
+				append_result = self.dt.append_text(self.instancia, encoded_text)
 				if append_result != 0:
 					log.error(_("Error when attaching text: {error}").format(
 						error=ERROR_CODES.get(append_result, {"friendly": _("Unknown error")})["friendly"]))
@@ -401,118 +982,131 @@ class SynthDriver(SynthDriverBase):
 				log.debug(_("Spoken text: {text}").format(text=text))
 		except Exception as e:
 			log.error(_("Error when processing text: {error}").format(error=e))
-		finally:
-			self._is_speaking = False
 
-	def _speak_or_append(self, text, index=None):
-		"""Main synthesis method - chooses between nvwave or direct playback."""
-		if not text:
+	def speak(self, speechSequence):
+		if not self.instancia:
+			log.error(_("Speech attempt without initialized instance."))
 			return
+		if self._warm_up:
+			self._warm_up.speech_arrived()
+		if self._phrase_cache_target:
+			# Rate, pitch, volume or phraseCacheRateSteps may have changed since the phrases were rendered
+			self._refresh_phrase_cache()
+
+		# Adjacent strings with the same prosody become a single engine request,
+		# followed by the end of speech marker
+		segments = compile_sequence(speechSequence, self._base_prosody())
+		if self._dictionary.current():
+			segments = self._rewrite_segments(segments)
+		segments.append(Segment(None, None, self._base_prosody()))
+		self._speak_or_append(segments, self._speech_priority())
+
+	def _rewrite_segments(self, segments):
+		"""Returns segments with the user dictionary applied to their text."""
+		texts = iter(self._dictionary.rewrite([segment.text for segment in segments if segment.text is not None]))
+		segments = [segment if segment.text is None else segment._replace(text=next(texts)) for segment in segments]
+		log.debug(_("User dictionary applied in {time:.0f} us").format(time=self._dictionary.timing.last * 1e6))
+		return segments
+
+	def _speech_priority(self):
+		"""Classifies the sequence being spoken, for the speech scheduler."""
+		interrupted = self._interrupted
+		self._interrupted = False
+		# speech.sayAll sets its handler after the synth is loaded, so it is looked up on every call
+		if sayAll.SayAllHandler is not None and sayAll.SayAllHandler.isRunning():
+			return PRIORITY_SAY_ALL
+		return PRIORITY_FOCUS if interrupted else PRIORITY_BACKGROUND
+
+	def _speak_or_append(self, segments, priority):
+		"""Main synthesis method - chooses between nvwave or direct playback."""
 		if self._use_nvwave and self._nvwave_player and self._audio_thread_running:
-			try:
-				self._audio_queue.put((text, index))
-				log.debug(_("Text queued for nvwave: {text}, index: {index}").format(text=text, index=index))
-			except queue.Full:
-				log.warning(_("Audio queue full, using direct playback"))
-				self._speak_or_append_direct(text)
+			# With nvwave, indexes and the end of speech are reported as the audio plays
+			dropped = self._audio_queue.put((self._epoch.current, segments), priority)
+			log.debug(_("Speech sequence queued for nvwave: {count} segments, priority: {priority}").format(
+				count=len(segments), priority=PRIORITY_NAMES[priority]))
+			if dropped:
+				log.debug(_("Speech queue full, dropped the oldest {priority} sequence").format(
+					priority=PRIORITY_NAMES[priority]))
+				self._report_dropped(dropped)
 		else:
 			log.debug(_("Using direct playback due to nvwave not available"))
-			self._speak_or_append_direct(text)
+			self._speak_segments_direct(segments)
 
-	def speak(self, speechSequence):
-		if not self.instancia:
-			log.error(_("Speech attempt without initialized instance."))
+	def _report_dropped(self, item):
+		"""Reports the indexes and end of speech of a sequence that will not be spoken, so NVDA does not wait for them."""
+		epoch, segments = item
+		if self._epoch.is_stale(epoch):
 			return
+		for segment in segments:
+			if segment.index is not None:
+				synthIndexReached.notify(synth=self, index=segment.index)
+			elif segment.text is None:
+				synthDoneSpeaking.notify(synth=self)
 
-		base_pitch = self._pitch
-		char_mode = False
-		for item in speechSequence:
-			if isinstance(item, CharacterModeCommand):
-				char_mode = item.state
-			elif isinstance(item, str):
-				text = item.strip()
-				if not text:
-					continue
-				if char_mode:
-					for char in text:
-						self._speak_or_append(char)
-				else:
-					self._speak_or_append(text)
-				if self._pitch != base_pitch:
-					self._set_pitch(base_pitch)
-			elif isinstance(item, IndexCommand):
-				synthIndexReached.notify(synth=self, index=item.index)
-			elif isinstance(item, (PitchCommand, RateCommand, VolumeCommand)):
-				self._apply_command(item)
+	def _base_prosody(self):
+		return Prosody(self._rate, self._pitch, self._volume)
 
-		synthDoneSpeaking.notify(synth=self)
+	def _apply_prosody(self, prosody):
+		"""Requests the rate, pitch and volume of prosody, set on the engine before the next synthesis."""
+		if self._settings:
+			engine_prosody = self._engine_prosody(prosody)
+			self._settings.set_mode(engine_prosody.rate, engine_prosody.volume, engine_prosody.pitch)
+		self._prosody = prosody
 
 	def _apply_settings(self):
-		if self.instancia:
-			dt_rate = convert_nvda_to_dt(self._rate)
-			dt_volume = convert_nvda_to_dt(self._volume)
-			dt_pitch = convert_nvda_to_dt(self._pitch)
-			result = self.dt.TTSENG_SetMode(self.instancia, dt_rate, dt_volume, dt_pitch)
-			if result != 0:
-				log.error(_("Error when applying settings: {error} ({code})").format(
-					error=ERROR_CODES.get(result, {"friendly": _("Unknown error")})["friendly"], code=result))
-			else:
-				log.debug(_("Settings applied: rate={rate}, volume={volume}, pitch={pitch}").format(
-					rate=dt_rate, volume=dt_volume, pitch=dt_pitch))
+		if self._settings:
+			self._apply_prosody(self._base_prosody())
 			if self._voice in VOICE_MAP:
-				voice_id = VOICE_MAP[self._voice]
-				voice_result = self.dt.TTSENG_SetVoice(self.instancia, voice_id, 10)
-				if voice_result != 0:
-					log.error(_("Error when applying voice: {error} ({code})").format(
-						error=ERROR_CODES.get(voice_result, {"friendly": _("Unknown error")})["friendly"], code=voice_result))
-				else:
-					log.debug(_("Applied voice: {voice} (ID: {id})").format(voice=self._voice, id=voice_id))
-
-	def _apply_command(self, command):
-		if isinstance(command, PitchCommand):
-			current_pitch = self._pitch
-			new_pitch = max(0, min(100, current_pitch + command.offset))
-			self._set_pitch(new_pitch)
-		elif isinstance(command, RateCommand):
-			self._set_rate(command.value)
-		elif isinstance(command, VolumeCommand):
-			self._set_volume(command.value)
+				self._settings.set_voice(VOICE_MAP[self._voice])
+
+	def _commit_settings(self):
+		"""Makes the SetMode and SetVoice calls for the settings changed since the last synthesis, if any."""
+		if not self._settings:
+			return
+		result = self._settings.apply()
+		if result != 0:
+			log.error(_("Error when applying settings: {error} ({code})").format(
+				error=ERROR_CODES.get(result, {"friendly": _("Unknown error")})["friendly"], code=result))
 
 	def _get_rate(self):
 		return self._rate
 
 	def _set_rate(self, value):
 		self._rate = value
-		if self.instancia:
-			dt_rate = convert_nvda_to_dt(value)
-			dt_volume = convert_nvda_to_dt(self._volume)
-			dt_pitch = convert_nvda_to_dt(self._pitch)
-			self.dt.TTSENG_SetMode(self.instancia, dt_rate, dt_volume, dt_pitch)
-			log.debug(_("Speed set to {rate} (converted from {original})").format(rate=dt_rate, original=value))
+		if self._settings:
+			self._apply_prosody(self._base_prosody())
+			log.debug(_("Speed set to {rate} (converted from {original})").format(
+				rate=self._engine_prosody(self._base_prosody()).rate, original=value))
 
 	def _get_pitch(self):
 		return self._pitch
 
 	def _set_pitch(self, value):
 		self._pitch = value
-		if self.instancia:
-			dt_rate = convert_nvda_to_dt(self._rate)
-			dt_volume = convert_nvda_to_dt(self._volume)
-			dt_pitch = convert_nvda_to_dt(value)
-			self.dt.TTSENG_SetMode(self.instancia, dt_rate, dt_volume, dt_pitch)
-			log.debug(_("Pitch set to {pitch} (converted from {original})").format(pitch=dt_pitch, original=value))
+		if self._settings:
+			self._apply_prosody(self._base_prosody())
+			log.debug(_("Pitch set to {pitch} (converted from {original})").format(
+				pitch=self._engine_prosody(self._base_prosody()).pitch, original=value))
 
 	def _get_volume(self):
 		return self._volume
 
 	def _set_volume(self, value):
 		self._volume = value
-		if self.instancia:
-			dt_rate = convert_nvda_to_dt(self._rate)
-			dt_volume = convert_nvda_to_dt(value)
-			dt_pitch = convert_nvda_to_dt(self._pitch)
-			self.dt.TTSENG_SetMode(self.instancia, dt_rate, dt_volume, dt_pitch)
-			log.debug(_("Volume set to {volume} (converted from {original})").format(volume=dt_volume, original=value))
+		if self._settings:
+			self._apply_prosody(self._base_prosody())
+			log.debug(_("Volume set to {volume} (converted from {original})").format(
+				volume=self._engine_prosody(self._base_prosody()).volume, original=value))
+
+	def _get_rateBoost(self):
+		return self._rate_boost
+
+	def _set_rateBoost(self, enable):
+		self._rate_boost = enable
+		self._prosody_map = ProsodyMap(self._prosody_map.effects, enable)
+		self._apply_prosody(self._base_prosody())
+		if enable and not self._prosody_map.rate_boost:
+			log.debug(_("Rate boost needs nvwave and 16-bit audio"))
 
 	@property
 	def voice(self):
@@ -522,97 +1116,141 @@ class SynthDriver(SynthDriverBase):
 	def voice(self, value):
 		if value in VOICES:
 			self._voice = value
-			if self.instancia:
-				voice_id = VOICE_MAP[value]
-				result = self.dt.TTSENG_SetVoice(self.instancia, voice_id, 10)
-				if result != 0:
-					log.error(_("Error configuring voice: {error} ({code})").format(
-						error=ERROR_CODES.get(result, {"friendly": _("Unknown error")})["friendly"], code=result))
-				else:
-					log.debug(_("Voice changed to {voice}").format(voice=VOICES[value]))
-					self._reconfigure_nvwave_if_needed()
+			if self._settings:
+				self._settings.set_voice(VOICE_MAP[value])
+				log.debug(_("Voice changed to {voice}").format(voice=VOICES[value]))
+				self._reconfigure_nvwave_if_needed()
 
 	@property
 	def availableVoices(self):
 		return {key: VoiceInfo(id=key, displayName=VOICES[key]) for key in VOICES}
 
 	def _reconfigure_nvwave_if_needed(self):
-		"""Reconfigures nvwave if settings change (e.g., voice change)."""
-		if self._use_nvwave and self._nvwave_player:
-			current_rate = self._get_voice_sample_rate()
-			if hasattr(self._nvwave_player, 'samplesPerSec') and self._nvwave_player.samplesPerSec != current_rate:
-				log.debug(_("Reconfiguring nvwave for new sample rate: {rate}Hz").format(rate=current_rate))
-				try:
-					self._nvwave_player.close()
-				except:
-					pass
-				self._setup_nvwave()
+		"""Opens the player of the new voice ahead of its first utterance, if it is not open yet.
+
+		The feed thread switches players as it reaches the audio of the new voice, so nothing is closed.
+		"""
+		if self._use_nvwave and self._players:
+			try:
+				self._players.get(self._output_rate(self._get_voice_sample_rate()))
+			except Exception as e:
+				log.error(_("Error configuring nvwave: {error}").format(error=e))
 
 	def pause(self, switch):
 		"""Pauses/resumes playback in both modes."""
+		if self._estimated_indexes:
+			self._estimated_indexes.pause(switch)
 		if self.instancia:
 			if switch:
-				self.dt.TTSENG_PauseText(self.instancia)
+				self.dt.pause(self.instancia)
 				log.debug(_("Text paused"))
 			else:
-				self.dt.TTSENG_ResumeText(self.instancia)
+				self.dt.resume(self.instancia)
 				log.debug(_("Text resumed"))
 		if self._nvwave_player:
 			try:
-				self._nvwave_player.pause(switch)
+				self._players.pause(switch)
+				self._pacing.pause(switch)
 				log.debug(_("nvwave paused") if switch else _("nvwave resumed"))
 			except Exception as e:
 				log.debug(_("Error pausing/resuming nvwave: {error}").format(error=e))
 
 	def cancel(self):
 		"""Cancels playback in both modes."""
+		# Synthesis in progress stops at its next block, and queued speech is dropped
+		self._epoch.advance()
+		# Wakes the audio thread if it waits for the pool
+		job = self._pool_job
+		if job:
+			job.cancel()
+		self._ring.reset()
+		if self._estimated_indexes:
+			self._estimated_indexes.reset()
 		if self.instancia:
-			self.dt.TTSENG_StopText(self.instancia)
+			self.dt.stop(self.instancia)
 			log.debug(_("Text stopped"))
 		if self._nvwave_player:
 			try:
-				self._nvwave_player.stop()
+				self._players.stop()
+				self._pacing.reset()
+				self._indexes.reset()
 				log.debug(_("nvwave stopped"))
 			except Exception as e:
 				log.debug(_("Error stopping nvwave: {error}").format(error=e))
-		with self._audio_lock:
-			self._is_speaking = False
-			while not self._audio_queue.empty():
-				try:
-					self._audio_queue.get_nowait()
-					self._audio_queue.task_done()
-				except queue.Empty:
-					break
+		self._audio_queue.clear()
+		self._interrupted = True
 
-def terminate(self):
-	"""Cleans up all resources including nvwave and audio thread."""
-	self._audio_thread_running = False
-	try:
-		self._audio_queue.put(None, timeout=0.5)
-	except queue.Full:
-		pass
-	if self._audio_thread and self._audio_thread.is_alive():
-		self._audio_thread.join(timeout=2.0)
-		if self._audio_thread.is_alive():
-			log.warning(_("Audio thread did not terminate gracefully"))
-	if self._nvwave_player:
-		try:
-			self._nvwave_player.close()
-			self._nvwave_player = None
-			log.debug(_("nvwave player closed"))
-		except Exception as e:
-			log.error(_("Error closing nvwave player: {error}").format(error=e))
-	if self.instancia:
-		try:
-			self.dt.TTSENG_StopText(self.instancia)
-			result = self.dt.TTSENG_Close(self.instancia)
-			if result != 0:
-				log.error(_("Error when closing: {error} ({code})").format(
-					error=ERROR_CODES.get(result, {"friendly": _("Unknown error")})["friendly"], code=result))
-			else:
-				log.debug(_("DeltaTalk synthesizer successfully closed"))
-		except Exception as e:
-			log.error(_("Error closing the synthesizer: {error}").format(error=e))
-		finally:
-			self.instancia = None
-			self.dt = None
\ No newline at end of file
+	def terminate(self):
+		"""Cleans up all resources including nvwave and audio thread."""
+		self._phrase_cache_stop.set()
+		if self._phrase_cache_thread and self._phrase_cache_thread.is_alive():
+			self._phrase_cache_thread.join(timeout=2.0)
+		if self._warm_up:
+			self._warm_up.stop(timeout=2.0)
+		log.debug(_("Engine access: {acquisitions} acquisitions, {contended} contended, "
+			"{wait_ms:.0f} ms waiting (longest {max_wait_ms:.0f} ms), longest hold {max_hold_ms:.0f} ms").format(
+			**self._engine_gate.stats.as_dict()))
+		log.debug(_("Cancels: {cancels}, queued sequences dropped: {skipped}, generations aborted: {aborted}, "
+			"blocks discarded: {discarded}").format(cancels=self._epoch.current, skipped=self._epoch.skipped,
+			aborted=self._epoch.aborted, discarded=self._epoch.discarded_blocks))
+		if self._usage:
+			try:
+				self._usage.save()
+			except OSError as e:
+				log.debug(_("Could not save label usage: {error}").format(error=e))
+		for priority, stats in self._audio_queue.stats().items():
+			log.debug(_("Speech queue, {priority}: {enqueued} queued, {dropped} dropped, deepest {max_depth}").format(
+				priority=priority, **stats))
+		log.debug(_("Synthesis pipeline: ring of {slots} blocks, at most {max_in_use} in use, full {full_waits} times").format(
+			slots=self._ring.slots, max_in_use=self._ring.max_in_use, full_waits=self._ring.full_waits))
+		self._audio_thread_running = False
+		self._audio_queue.close()
+		if self._audio_thread and self._audio_thread.is_alive():
+			self._audio_thread.join(timeout=2.0)
+			if self._audio_thread.is_alive():
+				log.warning(_("Audio thread did not terminate gracefully"))
+		if self._feed_thread and self._feed_thread.is_alive():
+			self._feed_queue.put(None)
+			self._feed_thread.join(timeout=2.0)
+		if self._players:
+			log.debug(_("Players: {opened} opened in {time:.0f} ms, {reused} reused").format(
+				opened=self._players.opened, time=self._players.open_time * 1000, reused=self._players.reused))
+			try:
+				self._players.close()
+				self._nvwave_player = None
+				log.debug(_("nvwave player closed"))
+			except Exception as e:
+				log.error(_("Error closing nvwave player: {error}").format(error=e))
+		with self._phrase_cache_lock:
+			self._set_phrase_cache(None)
+		if self._engine_pool:
+			self._engine_pool.close()
+			self._engine_pool = None
+		log.debug(_("User dictionary: {utterances} utterances rewritten, {replacements} replacements, "
+			"{mean_us:.0f} us on average (longest {max_us:.0f} us)").format(**self._dictionary.timing.as_dict()))
+		if self._durations:
+			log.debug(_("Duration estimates: {samples} utterances, median error {median_pct:.0f}%, "
+				"90% within {p90_pct:.0f}%, worst {max_pct:.0f}%, bias {bias_pct:+.0f}%").format(**self._durations.error_stats()))
+		if self._estimated_indexes:
+			self._estimated_indexes.close()
+		if self._settings:
+			log.debug(_("Engine settings: {requests} changes, {calls} SetMode and SetVoice calls, {avoided} avoided").format(
+				requests=self._settings.requests, calls=self._settings.calls, avoided=self._settings.avoided))
+		if self._host:
+			log.debug(_("Synthesis host restarted {count} times").format(count=self._host.restarts))
+			self._host.close()
+			self._host = None
+		if self.instancia:
+			try:
+				self.dt.stop(self.instancia)
+				result = self.dt.close(self.instancia)
+				if result != 0:
+					log.error(_("Error when closing: {error} ({code})").format(
+						error=ERROR_CODES.get(result, {"friendly": _("Unknown error")})["friendly"], code=result))
+				else:
+					log.debug(_("DeltaTalk synthesizer successfully closed"))
+			except Exception as e:
+				log.error(_("Error closing the synthesizer: {error}").format(error=e))
+			finally:
+				self.instancia = None
+				self.dt = None
\ No newline at end of file
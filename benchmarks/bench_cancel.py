@@ -0,0 +1,95 @@
+# benchmarks/bench_cancel.py
+# Cancel-to-silence latency with and without cancellation epochs
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Cancels a long utterance shortly after it starts and measures how long audio keeps playing.
+
+Run with: python benchmarks/bench_cancel.py [--cancels N] [--after MS]
+"""
+
+import argparse
+import threading
+import time
+
+import common
+from _deltatalk.engine import DSP_MODES, SimulatedBackend, generate_pcm
+from _deltatalk.epoch import CancelEpoch
+from _deltatalk.pacing import PacingScheduler
+from _deltatalk.pcm import PCMBuffer, make_pcm_feeder
+
+SAMPLE_RATE = 22050
+TEXT = b"Uma frase longa que o leitor de telas vai interromper quando o foco mudar. " * 2
+
+
+def unchecked(engine, instance, pcm, feed, pacing, epochs, epoch):
+	"""The former loop: the text is generated to its end whatever happens."""
+	for length in generate_pcm(engine, instance, TEXT, pcm):
+		feed(pcm, length)
+		pacing.fed(length)
+		pacing.wait_for_room()
+
+
+def with_epochs(engine, instance, pcm, feed, pacing, epochs, epoch):
+	for length in generate_pcm(engine, instance, TEXT, pcm):
+		if epochs.is_stale(epoch):
+			epochs.discarded_blocks += 1
+			break
+		feed(pcm, length)
+		pacing.fed(length)
+		pacing.wait_for_room()
+		if epochs.is_stale(epoch):
+			epochs.aborted += 1
+			break
+
+
+def run(loop, cancels, after):
+	engine = SimulatedBackend(block_size=4096, block_latency=0.03)
+	instance = engine.init(DSP_MODES["MULTIMEDIA"])
+	engine.set_voice(instance, 2)
+	pcm = PCMBuffer()
+	epochs = CancelEpoch()
+	silences = []
+	stale_audio = []
+	stale_calls = []
+	for _ in range(cancels):
+		player = common.SimulatedPlayer(samplesPerSec=SAMPLE_RATE)
+		feed = make_pcm_feeder(player)
+		pacing = PacingScheduler()
+		pacing.start_utterance(SAMPLE_RATE * 2)
+		worker = threading.Thread(
+			target=loop, args=(engine, instance, pcm, feed, pacing, epochs, epochs.current))
+		worker.start()
+		time.sleep(after)
+		# What SynthDriver.cancel does
+		cancelled = time.perf_counter()
+		fed_before = player.fed_bytes
+		calls_before = engine.calls["gen_audio_buffer"]
+		epochs.advance()
+		player.stop()
+		pacing.reset()
+		worker.join()
+		player.idle()
+		silences.append(time.perf_counter() - cancelled)
+		stale_audio.append((player.fed_bytes - fed_before) / 2 / SAMPLE_RATE)
+		stale_calls.append(engine.calls["gen_audio_buffer"] - calls_before)
+		player.close()
+	print(f"{loop.__name__}:")
+	print(f"  cancel to silence       {common.summarize(silences)}")
+	print(f"  audio fed after cancel  {common.summarize(stale_audio, unit='s', scale=1)}")
+	print(f"  blocks after cancel     {sum(stale_calls) / cancels:.1f} GenAudioBuffer calls per cancel")
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--cancels", type=int, default=3)
+	parser.add_argument("--after", type=int, default=300, help="milliseconds of speech before each cancel")
+	args = parser.parse_args()
+	for loop in (unchecked, with_epochs):
+		run(loop, args.cancels, args.after / 1000)
+
+
+if __name__ == "__main__":
+	main()
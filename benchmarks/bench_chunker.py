@@ -0,0 +1,88 @@
+# benchmarks/bench_chunker.py
+# Fixed 100-character slices versus the sentence-aware chunker
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Measures time to first audio and total synthesis time of long documents for each way of splitting them.
+
+Run with: python benchmarks/bench_chunker.py [--documents N] [--paragraphs N]
+"""
+
+import argparse
+import time
+
+import common
+from _deltatalk.chunker import chunk_text
+from _deltatalk.engine import DSP_MODES, SimulatedBackend, generate_pcm
+from _deltatalk.pcm import PCMBuffer
+
+PARAGRAPHS = [
+	"O Sr. Almeida chegou à reunião às 9h15, acompanhado da Dra. Fernanda Lopes e do Prof. Ricardo Nunes. "
+	"A pauta tinha 12 itens, e o primeiro deles, o orçamento de R$ 1.250.000,00, tomou quase toda a manhã.",
+	"Segundo o relatório, a produção cresceu 3,7% no último trimestre; no entanto, os custos de transporte "
+	"subiram mais do que o esperado. Por isso, a diretoria decidiu rever os contratos com os fornecedores.",
+	"Você já salvou o documento? Se não salvou, pressione Ctrl+S agora! O arquivo será gravado na pasta "
+	"Documentos, com o nome relatorio_final_2025.docx, e uma cópia irá para o servidor da empresa.",
+	"A Av. Paulista, nº 1000, recebeu milhares de pessoas no domingo. A prefeitura estima que o evento, "
+	"organizado pela Secretaria de Cultura, movimentou cerca de 40 milhões de reais na economia da cidade.",
+]
+
+
+def fixed_slices(text):
+	for i in range(0, len(text), 100):
+		yield text[i:i + 100]
+
+
+def sentence_chunks(text):
+	for chunk in chunk_text(text):
+		yield chunk.text
+
+
+def mid_word_splits(pieces):
+	"""Counts boundaries between two pieces that fall inside a word or a number."""
+	return sum(1 for a, b in zip(pieces, pieces[1:]) if a[-1:].isalnum() and b[:1].isalnum())
+
+
+def run(splitter, documents):
+	engine = SimulatedBackend(block_size=8192, block_latency=0.002, setup_latency=0.008, char_latency=0.0001)
+	instance = engine.init(DSP_MODES["MULTIMEDIA"])
+	pcm = PCMBuffer()
+	first_audio = []
+	totals = []
+	splits = 0
+	setups = 0
+	for document in documents:
+		pieces = list(splitter(document))
+		splits += mid_word_splits(pieces)
+		setups += len(pieces)
+		start = time.perf_counter()
+		first = None
+		for piece in pieces:
+			for _length in generate_pcm(engine, instance, piece.encode("cp1252"), pcm):
+				if first is None:
+					first = time.perf_counter() - start
+		totals.append(time.perf_counter() - start)
+		first_audio.append(first)
+	print(f"{splitter.__name__}:")
+	print(f"  time to first audio  {common.summarize(first_audio)}")
+	print(f"  total synthesis      {common.summarize(totals)}")
+	print(f"  mid-word splits      {splits}, NEW_MULTI_BLOCK setups {setups}")
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--documents", type=int, default=8)
+	parser.add_argument("--paragraphs", type=int, default=12, help="paragraphs per document")
+	args = parser.parse_args()
+	documents = [
+		" ".join(PARAGRAPHS[(d + p) % len(PARAGRAPHS)] for p in range(args.paragraphs))
+		for d in range(args.documents)
+	]
+	for splitter in (fixed_slices, sentence_chunks):
+		run(splitter, documents)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_dictionary.py
+# User dictionary: one automaton against a regular expression per entry
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Times rewriting a paragraph with dictionaries of growing size, and reloading a dictionary file.
+
+The baseline applies one case-insensitive whole-word regular expression per entry, one after the
+other, as NVDA's speech dictionaries do. Generated entries are acronyms that do not occur in the
+text, plus the few that do, so every size makes the same replacements.
+Run with: python benchmarks/bench_dictionary.py [--sizes N,N,...] [--repeat N]
+"""
+
+import argparse
+import os
+import re
+import tempfile
+import time
+
+import common  # noqa: F401, makes _deltatalk importable
+from _deltatalk.dictionary import DictionaryEntry, UserDictionary
+from bench_chunker import PARAGRAPHS
+
+PRESENT = {"Ctrl": "contrôl", "docx": "dóqui xis", "Av": "avenida", "Dra": "doutora", "Prof": "professor"}
+
+
+def make_entries(size):
+	entries = [DictionaryEntry(word, spoken, False, True) for word, spoken in PRESENT.items()]
+	for number in range(size - len(entries)):
+		entries.append(DictionaryEntry(f"XPTO{number}", f"produto {number}", False, True))
+	return entries
+
+
+def sequential(entries):
+	patterns = [(re.compile(r"\b" + re.escape(entry.pattern) + r"\b", re.IGNORECASE), entry.replacement) for entry in entries]
+
+	def rewrite(text):
+		for pattern, replacement in patterns:
+			text = pattern.sub(replacement, text)
+		return text
+	return rewrite
+
+
+def best(function, repeat):
+	times = []
+	for _ in range(repeat):
+		start = time.perf_counter()
+		function()
+		times.append(time.perf_counter() - start)
+	return min(times)
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--sizes", default="10,100,1000,5000")
+	parser.add_argument("--repeat", type=int, default=20)
+	args = parser.parse_args()
+	text = " ".join(PARAGRAPHS)
+	print(f"Rewriting {len(text)} characters:")
+	for size in (int(size) for size in args.sizes.split(",")):
+		entries = make_entries(size)
+		start = time.perf_counter()
+		dictionary = UserDictionary(entries)
+		build = time.perf_counter() - start
+		regexes = sequential(entries)
+		automaton = best(lambda: dictionary.rewrite(text), args.repeat)
+		baseline = best(lambda: regexes(text), args.repeat)
+		print(
+			f"  {size:5d} entries: automaton {automaton * 1e6:7.0f} us, regex per entry {baseline * 1e6:8.0f} us, "
+			f"built in {build * 1000:.0f} ms ({dictionary.automaton.states} states)"
+		)
+	print("Reloading 1000 entries:")
+	with tempfile.TemporaryDirectory() as folder:
+		path = os.path.join(folder, "pronunciations.txt")
+		entries = make_entries(1000)
+		with open(path, "w", encoding="utf-8") as f:
+			f.writelines(f"{entry.pattern}\t{entry.replacement}\n" for entry in entries)
+		previous = UserDictionary.read(path)
+		with open(path, "a", encoding="utf-8") as f:
+			f.write("Ctrl\tcontrole\n")
+		changed = best(lambda: UserDictionary.read(path, previous), args.repeat)
+		with open(path, "a", encoding="utf-8") as f:
+			f.write("NOVO\tnovo produto\n")
+		added = best(lambda: UserDictionary.read(path, previous), args.repeat)
+		print(f"  replacement changed: {changed * 1000:.1f} ms, entry added: {added * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+	main()
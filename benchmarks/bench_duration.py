@@ -0,0 +1,105 @@
+# benchmarks/bench_duration.py
+# Spoken length estimated from phoneme durations against the audio an engine generates
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Compares the duration model with the length of the audio rendered for the same texts, and times it.
+
+Texts are the chunks of the benchmark paragraphs. Half of them calibrate the model as the driver
+does with the audio it plays, and the errors are reported on the other half, before and after, next
+to the best estimate proportional to the number of characters. With --dll the audio comes from
+Dtalk32.dll (32-bit Python on Windows); otherwise from SimulatedBackend, whose audio is itself
+proportional to the number of characters, so there only the phoneme errors are meaningful.
+Run with: python benchmarks/bench_duration.py [--dll Dtalk32.dll] [--rates N,N,...] [--repeat N]
+"""
+
+import argparse
+import os
+import time
+
+import common
+from _deltatalk.chunker import chunk_text
+from _deltatalk.duration import DurationModel, error_distribution
+from _deltatalk.engine import DSP_MODES, VOICE_SAMPLE_RATES, Dtalk32Backend, SimulatedBackend, render_pcm
+from _deltatalk.pcm import PCMBuffer
+from _deltatalk.phonemes import load_phonetizer
+from bench_chunker import PARAGRAPHS
+
+VOICE_ID = 0
+
+
+def make_texts():
+	texts = []
+	for paragraph in PARAGRAPHS:
+		texts += [chunk.text for chunk in chunk_text(paragraph, first_size=40, size=90)]
+		texts.append(paragraph)
+	return texts
+
+
+def render_ms(engine, instance, texts, rate):
+	"""Returns how long the audio of each text plays at rate."""
+	engine.set_mode(instance, rate, 20, 10)
+	engine.set_voice(instance, VOICE_ID, 10)
+	pcm = PCMBuffer()
+	bytes_per_ms = VOICE_SAMPLE_RATES[VOICE_ID] * 2 / 1000
+	return [len(render_pcm(engine, instance, text.encode("cp1252", errors="replace"), pcm)) / bytes_per_ms for text in texts]
+
+
+def errors(estimates, actual):
+	return [(estimate - played) / played for estimate, played in zip(estimates, actual)]
+
+
+def describe(distribution):
+	return "median {median_pct:4.1f}%, 90% within {p90_pct:4.1f}%, worst {max_pct:5.1f}%, bias {bias_pct:+5.1f}%".format(
+		**distribution)
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--dll", help="Dtalk32.dll, to measure the real engine")
+	parser.add_argument("--rates", default="5,10,15,20")
+	parser.add_argument("--repeat", type=int, default=20)
+	args = parser.parse_args()
+	engine = Dtalk32Backend(args.dll) if args.dll else SimulatedBackend()
+	instance = engine.init(DSP_MODES["MULTIMEDIA"])
+	start = time.perf_counter()
+	phonetizer = load_phonetizer(os.path.join(common.DATA_DIR, "brazil.alp"), os.path.join(common.DATA_DIR, "brport.lng"))
+	model = DurationModel(phonetizer)
+	print(f"Model loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+	texts = make_texts()
+	calibration, held_out = texts[::2], texts[1::2]
+	print(f"{len(texts)} texts, {len(held_out)} held out, engine: {'Dtalk32.dll' if args.dll else 'simulated'}")
+	try:
+		for rate in (int(rate) for rate in args.rates.split(",")):
+			calibration_ms = render_ms(engine, instance, calibration, rate)
+			held_out_ms = render_ms(engine, instance, held_out, rate)
+			before = model.estimate_many(held_out, rate)
+			for text, played in zip(calibration, calibration_ms):
+				model.record(rate, model.estimate(text, rate), played)
+			after = model.estimate_many(held_out, rate)
+			ms_per_char = sum(calibration_ms) / sum(len(text) for text in calibration)
+			by_length = [len(text) * ms_per_char for text in held_out]
+			print(f"Rate {rate:2d} (correction {model.correction(rate):.2f}):")
+			print(f"  phonemes:            {describe(error_distribution(errors(before, held_out_ms)))}")
+			print(f"  phonemes calibrated: {describe(error_distribution(errors(after, held_out_ms)))}")
+			print(f"  characters fitted:   {describe(error_distribution(errors(by_length, held_out_ms)))}")
+	finally:
+		engine.close(instance)
+	text = " ".join(PARAGRAPHS)
+	fresh = DurationModel(phonetizer)
+	phonetizer.forget()
+	start = time.perf_counter()
+	fresh.estimate(text)
+	cold = time.perf_counter() - start
+	times = []
+	for _ in range(args.repeat):
+		start = time.perf_counter()
+		fresh.estimate(text)
+		times.append(time.perf_counter() - start)
+	print(f"Estimate {len(text)} characters: first time {cold * 1000:.2f} ms, then {min(times) / len(text) * 1e9:.0f} ns per character")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_engine.py
+# Throughput and latency of the driver's generation loop on the simulated engine
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Runs generate_pcm against SimulatedBackend and reports throughput and time to first block.
+
+Run with: python benchmarks/bench_engine.py [--utterances N] [--block-latency S] [--inter-block-sleep S]
+"""
+
+import argparse
+import time
+
+import common
+from _deltatalk.engine import DSP_MODES, SimulatedBackend, generate_pcm
+from _deltatalk.pcm import PCMBuffer
+
+UTTERANCES = [
+	"botão",
+	"caixa de seleção não marcado",
+	"O arquivo foi salvo com sucesso na pasta Documentos.",
+	"A leitura contínua percorre o documento parágrafo por parágrafo, "
+	"e cada parágrafo pode gerar dezenas de blocos de áudio até o fim do texto.",
+]
+
+
+def run(engine, utterances, inter_block_sleep):
+	instance = engine.init(DSP_MODES["MULTIMEDIA"])
+	engine.set_voice(instance, 2)
+	engine.set_mode(instance, 10, 20, 10)
+	pcm = PCMBuffer()
+	first_block = []
+	total_bytes = 0
+	start = time.perf_counter()
+	for text in utterances:
+		utterance_start = time.perf_counter()
+		for index, length in enumerate(generate_pcm(engine, instance, text.encode("cp1252"), pcm)):
+			if index == 0:
+				first_block.append(time.perf_counter() - utterance_start)
+			total_bytes += length
+			if inter_block_sleep:
+				time.sleep(inter_block_sleep)
+	elapsed = time.perf_counter() - start
+	engine.close(instance)
+	return elapsed, total_bytes, first_block
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--utterances", type=int, default=20, help="utterances per run")
+	parser.add_argument("--block-latency", type=float, default=0.004, help="simulated seconds per block")
+	parser.add_argument("--setup-latency", type=float, default=0.01, help="simulated seconds per NEW_MULTI_BLOCK")
+	parser.add_argument(
+		"--inter-block-sleep", type=float, default=0.05, help="delay after each block, as the driver used to do"
+	)
+	args = parser.parse_args()
+
+	utterances = [UTTERANCES[i % len(UTTERANCES)] for i in range(args.utterances)]
+	for sleep in sorted({args.inter_block_sleep, 0.0}, reverse=True):
+		engine = SimulatedBackend(block_latency=args.block_latency, setup_latency=args.setup_latency)
+		elapsed, total_bytes, first_block = run(engine, utterances, sleep)
+		audio_seconds = total_bytes / 2 / 22050
+		print(f"inter-block sleep {sleep * 1000:.0f}ms:")
+		print(f"  throughput       {total_bytes / elapsed / 1e3:.1f} kB/s, real-time factor {elapsed / audio_seconds:.3f}")
+		print(f"  first block      {common.summarize(first_block)}")
+		print(f"  DLL calls        {dict(engine.calls)}")
+
+
+if __name__ == "__main__":
+	main()
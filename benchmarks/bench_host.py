@@ -0,0 +1,127 @@
+# benchmarks/bench_host.py
+# Synthesis in helper processes: streaming overhead, throughput and watchdog restarts
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Measures synthesis hosts running the simulated engine against the same engine in process.
+
+Streaming compares the time to the first block and per block of one host with the main instance,
+throughput runs a long document on HostPool for each number of hosts, and the watchdog part
+makes a host hang and crash and times its recovery.
+Run with: python benchmarks/bench_host.py [--sizes 1,2,4] [--paragraphs N]
+"""
+
+import argparse
+import threading
+import time
+
+import common
+from bench_chunker import PARAGRAPHS
+from _deltatalk.chunker import chunk_text
+from _deltatalk.engine import DSP_MODES, SimulatedBackend, generate_blocks
+from _deltatalk.host import HostError, HostPool, SynthesisHost
+from _deltatalk.pcm import PCMBuffer
+
+SAMPLE_RATE = 22050
+BLOCK_SIZE = 16384
+ENGINE = dict(block_size=BLOCK_SIZE, block_latency=0.01, setup_latency=0.01, char_latency=0.0002)
+
+
+def stream(blocks, release):
+	"""Returns the seconds to the first block and between the next ones."""
+	first = None
+	gaps = []
+	start = last = time.perf_counter()
+	for block in blocks:
+		now = time.perf_counter()
+		if first is None:
+			first = now - start
+		else:
+			gaps.append(now - last)
+		last = now
+		release(block)
+	return first, gaps
+
+
+def streaming(chunks):
+	engine = SimulatedBackend(**ENGINE)
+	instance = engine.init(DSP_MODES["MULTIMEDIA"])
+	engine.set_voice(instance, 2)
+	pcm = PCMBuffer(BLOCK_SIZE)
+	host = SynthesisHost(("simulated", ENGINE), block_size=BLOCK_SIZE)
+	host.configure(2, 10, 10, 10)
+	for name, synthesize, release in (
+		("in process", lambda text: generate_blocks(engine, instance, text, lambda: pcm), lambda block: None),
+		("host", host.synthesize, lambda block: host.release(block[0])),
+	):
+		firsts = []
+		gaps = []
+		for chunk in chunks:
+			first, chunk_gaps = stream(synthesize(chunk), release)
+			firsts.append(first)
+			gaps += chunk_gaps
+		print(f"  {name:<10} first block {common.summarize(firsts)}; between blocks {common.summarize(gaps)}")
+	host.close()
+
+
+def throughput(sizes, chunks):
+	chars = sum(len(chunk) for chunk in chunks)
+	baseline = None
+	for size in sizes:
+		start = time.perf_counter()
+		pool = HostPool(size, ("simulated", ENGINE), block_size=BLOCK_SIZE)
+		started = time.perf_counter() - start
+		pool.configure(2, 10, 10, 10)
+		start = time.perf_counter()
+		audio = sum(len(pcm) for pcm in pool.render(chunks))
+		elapsed = time.perf_counter() - start
+		pool.close()
+		baseline = baseline or chars / elapsed
+		print(
+			f"  {size} hosts (started in {started * 1000:.0f} ms): {elapsed:5.2f}s, {chars / elapsed:7.0f} chars/s, "
+			f"{audio / 2 / SAMPLE_RATE / elapsed:5.1f}x real time, speedup {chars / elapsed / baseline:4.2f}"
+		)
+
+
+def watchdog(hang_timeout):
+	text = b"x" * 400
+	host = SynthesisHost(("simulated", dict(ENGINE, hang_after=3)), block_size=BLOCK_SIZE, hang_timeout=hang_timeout)
+	start = time.perf_counter()
+	try:
+		host.render(text)
+	except HostError as e:
+		print(f"  hang:  {e} after {(time.perf_counter() - start) * 1000:.0f} ms (timeout {hang_timeout * 1000:.0f} ms)")
+	host.close()
+	host = SynthesisHost(("simulated", ENGINE), block_size=BLOCK_SIZE)
+	threading.Timer(0.05, host._process.kill).start()
+	start = time.perf_counter()
+	try:
+		host.render(text * 4)
+	except HostError as e:
+		print(f"  crash: {e}, recovered in {(time.perf_counter() - start) * 1000:.0f} ms")
+	start = time.perf_counter()
+	host.render(b"depois do reinicio")
+	print(f"  first synthesis after the restart: {(time.perf_counter() - start) * 1000:.0f} ms, restarts {host.restarts}")
+	host.close()
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--sizes", default="1,2,4", help="comma-separated numbers of hosts")
+	parser.add_argument("--paragraphs", type=int, default=12)
+	parser.add_argument("--hang-timeout", type=float, default=1.0, help="seconds before a silent host is restarted")
+	args = parser.parse_args()
+	text = " ".join(PARAGRAPHS[p % len(PARAGRAPHS)] for p in range(args.paragraphs))
+	chunks = [chunk.text.encode("cp1252") for chunk in chunk_text(text)]
+	print(f"Streaming, {len(chunks)} chunks:")
+	streaming(chunks)
+	print("Throughput:")
+	throughput([int(size) for size in args.sizes.split(",")], chunks)
+	print("Watchdog:")
+	watchdog(args.hang_timeout)
+
+
+if __name__ == "__main__":
+	main()
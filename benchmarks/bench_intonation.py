@@ -0,0 +1,77 @@
+# benchmarks/bench_intonation.py
+# Decoding the intonation tables against opening their memory-mapped cache
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Times decoding and parsing brazil.f0 and brazilf0.HHS against opening their cache, then lookups and statistics.
+
+Run with: python benchmarks/bench_intonation.py [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import common
+from _deltatalk import intonation
+from _deltatalk.intonation import IntonationTable, decode_table, parse_table, table_stats, write_cache
+from _deltatalk.phrasecache import fingerprint_files
+
+TABLES = ("brazil.f0", "brazilf0.HHS")
+
+
+def timed(function, repeat):
+	times = []
+	for _ in range(repeat):
+		start = time.perf_counter()
+		result = function()
+		times.append(time.perf_counter() - start)
+	return result, times
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--repeat", type=int, default=10)
+	args = parser.parse_args()
+	print(f"Arrays: {'NumPy' if intonation.numpy is not None else 'memoryviews'}")
+	with tempfile.TemporaryDirectory() as folder:
+		for name in TABLES:
+			path = os.path.join(common.DATA_DIR, name)
+			cache_path = os.path.join(folder, name + ".cache")
+			fingerprint = fingerprint_files([path])
+
+			def parse():
+				with open(path, "rb") as f:
+					return parse_table(decode_table(f.read()))
+
+			parsed, times = timed(parse, args.repeat)
+			print(f"{name}, {os.path.getsize(path) / 1024:.0f} KB:")
+			print(f"  decode and parse: {common.summarize(times)} ({len(parsed[2])} rules)")
+			_, times = timed(lambda: write_cache(cache_path, fingerprint, *parsed), args.repeat)
+			print(f"  write cache: {common.summarize(times)}, {os.path.getsize(cache_path) / 1024:.0f} KB")
+			_, times = timed(lambda: fingerprint_files([path]), args.repeat)
+			print(f"  fingerprint the table: {common.summarize(times)}")
+			tables = []
+			_, times = timed(lambda: tables.append(IntonationTable(cache_path, fingerprint)), args.repeat)
+			print(f"  open cache: {common.summarize(times)}")
+			table = tables[-1]
+			contour_ids = table.contour_ids
+
+			def lookups():
+				for contour_id in contour_ids:
+					for position in table.variants(contour_id):
+						table.rule(position)
+
+			_, times = timed(lookups, args.repeat)
+			print(f"  every variant of every ID: {min(times) / len(table) * 1e6:.1f} us per rule")
+			usage, times = timed(lambda: table_stats(table), args.repeat)
+			print(f"  statistics: {common.summarize(times)}, most used: {usage['ids'].most_common(1)[0]}")
+			for opened in tables:
+				opened.close()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,66 @@
+# benchmarks/bench_lexicon.py
+# Loading brport.lng, and the cost of lookups and suffix matches
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Times parsing brport.lng against opening its binary index, then lookups and suffix matches.
+
+Lookups are reported per word, over the words of the benchmark paragraphs.
+Run with: python benchmarks/bench_lexicon.py [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import common
+from _deltatalk.lexicon import LEXICON_ENCODING, WORD_PATTERN, Lexicon, parse_lexicon, write_index
+from _deltatalk.phrasecache import fingerprint_files
+from bench_chunker import PARAGRAPHS
+
+LEXICON_PATH = os.path.join(common.DATA_DIR, "brport.lng")
+
+
+def timed(function, repeat):
+	times = []
+	for _ in range(repeat):
+		start = time.perf_counter()
+		result = function()
+		times.append(time.perf_counter() - start)
+	return result, times
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--repeat", type=int, default=5)
+	args = parser.parse_args()
+	fingerprint = fingerprint_files([LEXICON_PATH])
+
+	def parse():
+		with open(LEXICON_PATH, encoding=LEXICON_ENCODING, newline="") as f:
+			return parse_lexicon(f)
+
+	parsed, times = timed(parse, args.repeat)
+	print(f"Parse brport.lng: {common.summarize(times)} ({len(parsed[0])} words, {len(parsed[1])} suffix rules)")
+	with tempfile.TemporaryDirectory() as folder:
+		index_path = os.path.join(folder, "brport.idx")
+		_, times = timed(lambda: write_index(index_path, fingerprint, *parsed), args.repeat)
+		print(f"Write index: {common.summarize(times)}, {os.path.getsize(index_path) / 1024:.0f} KB")
+		lexicon, times = timed(lambda: Lexicon(index_path, fingerprint), args.repeat)
+		print(f"Open index: {common.summarize(times)}")
+	words = WORD_PATTERN.findall(" ".join(PARAGRAPHS)) * 100
+	known = [word for word in words if word in lexicon]
+	_, times = timed(lambda: [lexicon._positions.get(word) for word in words], args.repeat)
+	print(f"Word in index: {min(times) / len(words) * 1e9:.0f} ns per word ({len(known) / len(words):.0%} in the lexicon)")
+	_, times = timed(lambda: [lexicon.lookup(word) for word in words], args.repeat)
+	print(f"Lookup with entries: {min(times) / len(words) * 1e9:.0f} ns per word")
+	unknown = [word for word in words if word not in lexicon]
+	_, times = timed(lambda: [list(lexicon.match_suffixes(word)) for word in unknown], args.repeat)
+	print(f"Suffix matches of the other words: {min(times) / max(1, len(unknown)) * 1e6:.1f} us per word")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_pacing.py
+# Fixed inter-block sleep versus buffer-level pacing
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Compares the old 50 ms sleep between blocks with PacingScheduler on a fast and a slow simulated engine.
+
+Playback runs in real time, so each case takes as long as the paragraph lasts.
+Run with: python benchmarks/bench_pacing.py [--chars N] [--block-size BYTES]
+"""
+
+import argparse
+import time
+
+import common
+from _deltatalk.engine import DSP_MODES, SimulatedBackend, generate_pcm
+from _deltatalk.pacing import PacingScheduler
+from _deltatalk.pcm import PCMBuffer, make_pcm_feeder
+
+SAMPLE_RATE = 22050
+
+
+def fixed_sleep(engine, instance, text, pcm, feed, player):
+	for length in generate_pcm(engine, instance, text, pcm):
+		feed(pcm, length)
+		time.sleep(0.05)
+	return None
+
+
+def paced(engine, instance, text, pcm, feed, player):
+	pacing = PacingScheduler()
+	pacing.start_utterance(SAMPLE_RATE * 2)
+	for length in generate_pcm(engine, instance, text, pcm):
+		feed(pcm, length)
+		pacing.fed(length)
+		pacing.wait_for_room()
+	pacing.end_utterance()
+	return pacing.stats
+
+
+def run(loop, block_latency, block_size, text):
+	engine = SimulatedBackend(block_size=block_size, block_latency=block_latency)
+	instance = engine.init(DSP_MODES["MULTIMEDIA"])
+	engine.set_voice(instance, 2)
+	player = common.SimulatedPlayer(samplesPerSec=SAMPLE_RATE)
+	pcm = PCMBuffer()
+	feed = make_pcm_feeder(player)
+	start = time.perf_counter()
+	stats = loop(engine, instance, text, pcm, feed, player)
+	synthesis = time.perf_counter() - start
+	player.idle()
+	total = time.perf_counter() - start
+	player.close()
+	audio = player.fed_bytes / 2 / SAMPLE_RATE
+	print(f"  {loop.__name__:12} synthesis {synthesis:6.2f}s for {audio:5.2f}s of audio, finished after {total:5.2f}s")
+	print(f"  {'':12} first audio {(player.first_audio - start) * 1000:6.1f}ms, underruns {len(player.gaps)}"
+		+ (f" (scheduler counted {stats.underruns})" if stats else ""))
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--chars", type=int, default=60, help="length of the paragraph")
+	parser.add_argument("--block-size", type=int, default=4096, help="bytes per simulated block")
+	args = parser.parse_args()
+
+	text = (b"paragrafo longo " * args.chars)[:args.chars]
+	block_ms = args.block_size / 2 / SAMPLE_RATE * 1000
+	for name, block_latency in (("fast engine", block_ms / 50000), ("slow engine", block_ms * 0.65 / 1000)):
+		print(f"{name}: {block_latency * 1000:.1f}ms to generate {block_ms:.0f}ms blocks")
+		for loop in (fixed_sleep, paced):
+			run(loop, block_latency, args.block_size, text)
+
+
+if __name__ == "__main__":
+	main()
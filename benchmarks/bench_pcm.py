@@ -0,0 +1,139 @@
+# benchmarks/bench_pcm.py
+# Compares the per-byte c_byte conversion with the reusable PCMBuffer path
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Measures how many PCM bytes per second reach the player through each block path.
+
+Run with: python benchmarks/bench_pcm.py [--blocks N] [--repeat N]
+"""
+
+import argparse
+import ctypes
+import time
+
+import common  # noqa: F401
+from _deltatalk.engine import (
+	TTS_GENPCM_16BITS,
+	TTS_GENPCM_NEW_MULTI_BLOCK,
+	TTS_GENPCM_NEXT_BLOCK,
+	TTS_PCM_FINISHED,
+)
+from _deltatalk.pcm import PCM_BLOCK_SIZE, PCMBuffer, make_pcm_feeder
+
+
+class FakeDtalk32:
+	"""Stand-in for Dtalk32.dll that fills every block with a fixed PCM pattern."""
+
+	def __init__(self, blocks):
+		self.blocks = blocks
+		self._remaining = 0
+		# A sawtooth covering every byte value, negative ones included once read as c_byte
+		self._pattern = bytes(i & 0xFF for i in range(PCM_BLOCK_SIZE))
+
+	def TTSENG_GenAudioBuffer(self, instance, text, mode, pcm_format, buffer, size, bytes_written):
+		if mode == TTS_GENPCM_NEW_MULTI_BLOCK:
+			self._remaining = self.blocks
+		if self._remaining <= 0:
+			bytes_written._obj.value = 0
+			return TTS_PCM_FINISHED
+		self._remaining -= 1
+		ctypes.memmove(buffer, self._pattern, size)
+		bytes_written._obj.value = size
+		return 0
+
+
+class PointerPlayer:
+	"""Mimics nvwave.WavePlayer since NVDA 2023.2, which copies from a pointer and a size."""
+
+	def __init__(self):
+		self.fed = 0
+
+	def feed(self, data, size=None, onDone=None):
+		if size is None:
+			size = len(data)
+		else:
+			data = ctypes.string_at(data, size)
+		self.fed += size
+
+
+class BytesPlayer:
+	"""Mimics nvwave.WavePlayer up to NVDA 2023.1, which only accepts bytes."""
+
+	def __init__(self):
+		self.fed = 0
+
+	def feed(self, data, onDone=None):
+		self.fed += len(data)
+
+
+def run_per_byte(dt, player):
+	"""The original loop: a new c_byte array per block, converted one byte at a time."""
+	buffer_size = PCM_BLOCK_SIZE
+	mode = TTS_GENPCM_NEW_MULTI_BLOCK
+	while True:
+		audio_buffer = (ctypes.c_byte * buffer_size)()
+		bytes_written = ctypes.c_int(0)
+		result = dt.TTSENG_GenAudioBuffer(
+			1, None, mode, TTS_GENPCM_16BITS, audio_buffer, buffer_size, ctypes.byref(bytes_written)
+		)
+		if result == TTS_PCM_FINISHED:
+			break
+		mode = TTS_GENPCM_NEXT_BLOCK
+		if bytes_written.value > 0:
+			audio_data = bytes((b & 0xFF) for b in audio_buffer[:bytes_written.value])
+			player.feed(audio_data, onDone=None)
+
+
+def run_reused(dt, player):
+	"""The current loop: one PCMBuffer reused for every block and handed to the player as is."""
+	pcm = PCMBuffer()
+	feed = make_pcm_feeder(player)
+	bytes_written = ctypes.c_int(0)
+	mode = TTS_GENPCM_NEW_MULTI_BLOCK
+	while True:
+		bytes_written.value = 0
+		result = dt.TTSENG_GenAudioBuffer(
+			1, None, mode, TTS_GENPCM_16BITS, pcm.buffer, pcm.size, ctypes.byref(bytes_written)
+		)
+		if result == TTS_PCM_FINISHED:
+			break
+		mode = TTS_GENPCM_NEXT_BLOCK
+		if bytes_written.value > 0:
+			feed(pcm, bytes_written.value, onDone=None)
+
+
+def measure(run, player_class, blocks, repeat):
+	best = None
+	for _i in range(repeat):
+		player = player_class()
+		start = time.perf_counter()
+		run(FakeDtalk32(blocks), player)
+		elapsed = time.perf_counter() - start
+		assert player.fed == blocks * PCM_BLOCK_SIZE
+		best = elapsed if best is None else min(best, elapsed)
+	return blocks * PCM_BLOCK_SIZE / best
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--blocks", type=int, default=64, help="blocks per utterance")
+	parser.add_argument("--repeat", type=int, default=5, help="runs per path, the best one is reported")
+	args = parser.parse_args()
+
+	cases = [
+		("per-byte conversion", run_per_byte, BytesPlayer),
+		("PCMBuffer, bytes player", run_reused, BytesPlayer),
+		("PCMBuffer, pointer player", run_reused, PointerPlayer),
+	]
+	baseline = None
+	for name, run, player_class in cases:
+		rate = measure(run, player_class, args.blocks, args.repeat)
+		baseline = baseline or rate
+		print(f"{name:28} {rate / 1e6:10.1f} MB/s  x{rate / baseline:.0f}")
+
+
+if __name__ == "__main__":
+	main()
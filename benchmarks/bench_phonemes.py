@@ -0,0 +1,75 @@
+# benchmarks/bench_phonemes.py
+# Validating brport.lng against brazil.alp, and checking word lists in one or more processes
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Times validating the lexicon, estimating durations and checking a word list in worker processes.
+
+The word list is every word of the lexicon with a few made up forms of it, so it mixes words from
+the lexicon, forms read through the suffix rules and words left to the letter rules.
+Run with: python benchmarks/bench_phonemes.py [--processes N,N,...] [--copies N]
+"""
+
+import argparse
+import os
+import time
+
+import common
+from _deltatalk.lexicon import Lexicon, default_index_path
+from _deltatalk.phonemes import Alphabet, Phonetizer, check_words, validate_lexicon
+from bench_chunker import PARAGRAPHS
+
+ALPHABET_PATH = os.path.join(common.DATA_DIR, "brazil.alp")
+LEXICON_PATH = os.path.join(common.DATA_DIR, "brport.lng")
+
+
+def make_words(lexicon, copies):
+	words = []
+	for number, word in enumerate(dict.fromkeys(lexicon.words)):
+		# Copies differ, so the memo of each process does not make them free
+		words += [word, word + "s", word + "mente", f"{word}zinho{number % copies}"]
+	return words * copies
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--processes", default=f"1,2,{os.cpu_count() or 1}")
+	parser.add_argument("--copies", type=int, default=2)
+	args = parser.parse_args()
+	index_path = default_index_path(LEXICON_PATH)
+	alphabet = Alphabet.read(ALPHABET_PATH)
+	lexicon = Lexicon.load(LEXICON_PATH, index_path)
+	start = time.perf_counter()
+	problems = list(validate_lexicon(alphabet, Lexicon(index_path)))
+	print(f"Validate {len(lexicon)} words: {(time.perf_counter() - start) * 1000:.0f} ms, {len(problems)} problems")
+	phonetizer = Phonetizer(alphabet, lexicon)
+	times = []
+	for paragraph in PARAGRAPHS:
+		start = time.perf_counter()
+		phonetizer.estimate_ms(paragraph)
+		times.append(time.perf_counter() - start)
+	print(f"Estimate a paragraph, first time: {common.summarize(times)}")
+	times = []
+	for paragraph in PARAGRAPHS:
+		start = time.perf_counter()
+		phonetizer.estimate_ms(paragraph)
+		times.append(time.perf_counter() - start)
+	print(f"Estimate a paragraph, words seen: {common.summarize(times)}")
+	words = make_words(lexicon, args.copies)
+	print(f"Check {len(words)} words ({os.cpu_count()} CPUs):")
+	phonetizer = Phonetizer(alphabet, lexicon)
+	start = time.perf_counter()
+	for word in words:
+		phonetizer.word(word)
+	print(f"  in this process: {time.perf_counter() - start:.2f} s")
+	for processes in (int(processes) for processes in args.processes.split(",")):
+		start = time.perf_counter()
+		for _report in check_words(words, ALPHABET_PATH, LEXICON_PATH, index_path, processes):
+			pass
+		print(f"  {processes} worker processes: {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+	main()
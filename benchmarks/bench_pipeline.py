@@ -0,0 +1,107 @@
+# benchmarks/bench_pipeline.py
+# Sequential synthesis versus the two-stage synthesis pipeline
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Reads paragraphs in a row, as say-all does, and measures the silence between chunks.
+
+The simulated engine analyses each chunk before its first block, as Dtalk32 does, which is
+what opens a gap when synthesis only starts once the previous chunk has been fed.
+Playback runs in real time, so each case takes as long as the audio lasts.
+Run with: python benchmarks/bench_pipeline.py [--paragraphs N] [--slots N]
+"""
+
+import argparse
+import queue
+import threading
+import time
+
+import common
+from bench_chunker import PARAGRAPHS
+from _deltatalk.chunker import chunk_text
+from _deltatalk.engine import DSP_MODES, SimulatedBackend, generate_blocks, generate_pcm
+from _deltatalk.pacing import PacingScheduler
+from _deltatalk.pcm import PCMBuffer, make_pcm_feeder
+from _deltatalk.ring import PCMRing
+
+SAMPLE_RATE = 22050
+
+
+def sequential(engine, instance, chunks, feed, pacing, slots):
+	"""The former worker: each chunk is synthesized, fed and paced before the next one starts."""
+	pcm = PCMBuffer()
+	for chunk in chunks:
+		for length in generate_pcm(engine, instance, chunk, pcm):
+			feed(pcm, length)
+			pacing.fed(length)
+			pacing.wait_for_room()
+
+
+def pipelined(engine, instance, chunks, feed, pacing, slots):
+	"""The audio worker fills the ring while the feed thread feeds and paces."""
+	ring = PCMRing(slots)
+	blocks = queue.Queue()
+
+	def feed_worker():
+		while True:
+			item = blocks.get()
+			if item is None:
+				return
+			block, length = item
+			feed(block, length)
+			pacing.fed(length)
+			ring.release(block)
+			pacing.wait_for_room()
+
+	feeder = threading.Thread(target=feed_worker)
+	feeder.start()
+	for chunk in chunks:
+		for block, length in generate_blocks(engine, instance, chunk, ring.acquire, release=ring.release):
+			blocks.put((block, length))
+	blocks.put(None)
+	feeder.join()
+	return ring
+
+
+def run(synthesize, chunks, slots):
+	engine = SimulatedBackend(
+		block_size=4096, block_latency=0.01, setup_latency=0.05, char_latency=0.002, char_ms=30.0)
+	instance = engine.init(DSP_MODES["MULTIMEDIA"])
+	engine.set_voice(instance, 2)
+	player = common.SimulatedPlayer(samplesPerSec=SAMPLE_RATE)
+	pacing = PacingScheduler()
+	pacing.start_utterance(SAMPLE_RATE * 2)
+	start = time.perf_counter()
+	cpu = time.process_time()
+	ring = synthesize(engine, instance, chunks, make_pcm_feeder(player), pacing, slots)
+	player.idle()
+	elapsed = time.perf_counter() - start
+	cpu = time.process_time() - cpu
+	player.close()
+	audio = player.fed_bytes / 2 / SAMPLE_RATE
+	gaps = player.gaps
+	print(f"{synthesize.__name__}:")
+	print(f"  {audio:.1f}s of audio played in {elapsed:.1f}s, CPU {cpu / audio * 1000:.1f}ms per second of audio")
+	print(f"  silence gaps        {len(gaps)}, {common.summarize(gaps)}, total {sum(gaps) * 1000:.0f}ms")
+	if ring:
+		print(f"  ring                {ring.slots} blocks, at most {ring.max_in_use} in use, full {ring.full_waits} times")
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--paragraphs", type=int, default=3)
+	parser.add_argument("--slots", type=int, default=6, help="blocks in the ring")
+	args = parser.parse_args()
+	chunks = [
+		chunk.text.encode("cp1252")
+		for p in range(args.paragraphs)
+		for chunk in chunk_text(PARAGRAPHS[p % len(PARAGRAPHS)])
+	]
+	for synthesize in (sequential, pipelined):
+		run(synthesize, chunks, args.slots)
+
+
+if __name__ == "__main__":
+	main()
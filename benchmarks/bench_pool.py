@@ -0,0 +1,60 @@
+# benchmarks/bench_pool.py
+# Throughput of the engine pool for each pool size
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Synthesizes a long document with EnginePool and reports how throughput scales with the pool size.
+
+The simulated engine sleeps instead of computing, so the scaling shown is the best case: the real
+Dtalk32.dll also competes for CPU cores. Sizes above --max-instances show the pool shrinking.
+Run with: python benchmarks/bench_pool.py [--sizes 1,2,4,8] [--max-instances N] [--paragraphs N]
+"""
+
+import argparse
+import time
+
+from bench_chunker import PARAGRAPHS
+from _deltatalk.chunker import chunk_text
+from _deltatalk.engine import SimulatedBackend
+from _deltatalk.pool import EnginePool
+
+SAMPLE_RATE = 22050
+
+
+def run(size, chunks, max_instances):
+	engine = SimulatedBackend(
+		block_size=16384, block_latency=0.01, setup_latency=0.01, char_latency=0.0002, max_instances=max_instances)
+	pool = EnginePool(engine, size)
+	pool.configure(2, 10, 10, 10)
+	start = time.perf_counter()
+	audio = sum(len(pcm) for pcm in pool.render(chunks))
+	elapsed = time.perf_counter() - start
+	pool.close()
+	chars = sum(len(chunk) for chunk in chunks)
+	return len(pool.failures), elapsed, chars / elapsed, audio / 2 / SAMPLE_RATE / elapsed
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--sizes", default="1,2,4,8", help="comma-separated pool sizes")
+	parser.add_argument("--max-instances", type=int, default=6, help="instances the simulated engine allows")
+	parser.add_argument("--paragraphs", type=int, default=24)
+	args = parser.parse_args()
+	text = " ".join(PARAGRAPHS[p % len(PARAGRAPHS)] for p in range(args.paragraphs))
+	chunks = [chunk.text.encode("cp1252") for chunk in chunk_text(text)]
+	print(f"{len(chunks)} chunks, {sum(len(chunk) for chunk in chunks)} characters")
+	baseline = None
+	for size in (int(size) for size in args.sizes.split(",")):
+		failures, elapsed, chars_per_second, realtime = run(size, chunks, args.max_instances)
+		baseline = baseline or chars_per_second
+		opened = min(size, args.max_instances)
+		print(
+			f"  pool {size} ({opened} opened, {failures} refused): {elapsed:5.2f}s, "
+			f"{chars_per_second:7.0f} chars/s, {realtime:5.1f}x real time, speedup {chars_per_second / baseline:4.2f}"
+		)
+
+
+if __name__ == "__main__":
+	main()
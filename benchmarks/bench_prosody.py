@@ -0,0 +1,73 @@
+# benchmarks/bench_prosody.py
+# Resolution of the prosody map and cost of the gain and time stretching stages
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Counts the distinct volume levels and speeds the prosody map reaches, and times the audio effects.
+
+The effects run on the simulated engine's audio of br2 (22 kHz), block by block as the feed
+thread does, and are reported in milliseconds per second of audio, with audioop and in Python.
+Run with: python benchmarks/bench_prosody.py [--seconds N]
+"""
+
+import argparse
+import time
+
+import common  # noqa: F401, makes _deltatalk importable
+from _deltatalk.engine import DSP_MODES, SimulatedBackend, render_pcm
+from _deltatalk.pcm import PCMBuffer
+from _deltatalk.prosody import AudioEffects, EngineProsody, ProsodyMap
+from _deltatalk.resample import audioop
+from bench_chunker import PARAGRAPHS
+
+SAMPLE_RATE = 22050
+VOICE_ID = 2
+BLOCK_BYTES = 8192
+
+
+def resolution():
+	for name, prosody_map in (("engine steps", ProsodyMap()), ("effects, rate boost", ProsodyMap(True, True))):
+		volumes = {(p.volume, p.gain) for p in (prosody_map.lookup(50, 50, value) for value in range(101))}
+		speeds = {p.rate * p.tempo for p in (prosody_map.lookup(value, 50, 100) for value in range(101))}
+		print(f"  {name:<20} {len(volumes):3d} volume levels, {len(speeds):3d} speeds, fastest {max(speeds) / 20:.1f}x rate 20")
+
+
+def effects(seconds):
+	engine = SimulatedBackend()
+	instance = engine.init(DSP_MODES["MULTIMEDIA"])
+	engine.set_voice(instance, VOICE_ID)
+	pcm = PCMBuffer()
+	text = " ".join(PARAGRAPHS).encode("cp1252")
+	audio = b""
+	while len(audio) < seconds * SAMPLE_RATE * 2:
+		audio += render_pcm(engine, instance, text, pcm)
+	duration = len(audio) / 2 / SAMPLE_RATE
+	cases = [("gain 0.9", EngineProsody(20, 20, 10, 0.9, 1.0))]
+	cases += [(f"tempo {tempo}", EngineProsody(20, 20, 10, 1.0, tempo)) for tempo in (1.5, 2.0, 3.0)]
+	for use_audioop in ((True, False) if audioop else (False,)):
+		for name, prosody in cases:
+			stage = AudioEffects(SAMPLE_RATE, prosody, use_audioop)
+			start = time.perf_counter()
+			written = sum(len(stage.process(audio[i:i + BLOCK_BYTES])) for i in range(0, len(audio), BLOCK_BYTES))
+			written += len(stage.flush())
+			elapsed = time.perf_counter() - start
+			print(
+				f"  {'audioop' if use_audioop else 'Python':<8} {name:<10} {elapsed / duration * 1000:6.1f} ms per second, "
+				f"{written / len(audio):.2f} of the length"
+			)
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--seconds", type=int, default=10, help="seconds of audio processed")
+	args = parser.parse_args()
+	print("Prosody map:")
+	resolution()
+	print("Audio effects:")
+	effects(args.seconds)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,148 @@
+# benchmarks/bench_sequence.py
+# One engine request per string versus compiled speech sequences
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Counts engine calls and measures synthesis time of typical NVDA speech sequences.
+
+Run with: python benchmarks/bench_sequence.py [--repeat N]
+"""
+
+import argparse
+import threading
+import time
+
+import common
+from _deltatalk.engine import DSP_MODES, SimulatedBackend, generate_pcm
+from _deltatalk.pcm import PCMBuffer
+from _deltatalk.sequence import Prosody, compile_sequence
+
+
+class IndexCommand:
+	def __init__(self, index):
+		self.index = index
+
+
+class CharacterModeCommand:
+	def __init__(self, state):
+		self.state = state
+
+
+class PitchCommand:
+	settingName = "pitch"
+
+	def __init__(self, offset=0, multiplier=1):
+		self.offset = offset
+		self.multiplier = multiplier
+
+
+def spell(word):
+	"""The sequence NVDA sends to spell word, raising the pitch of capitals."""
+	sequence = [CharacterModeCommand(True)]
+	for char in word:
+		if char.isupper():
+			sequence += [PitchCommand(offset=30), char, PitchCommand()]
+		else:
+			sequence.append(char)
+	return sequence + [CharacterModeCommand(False)]
+
+
+SEQUENCES = {
+	"focus": ["Salvar", "botão", "Alt+S", "1 de 3"],
+	"menu": ["Arquivo", "menu", "subMenu", "A"],
+	"spelling": spell("Documento2025"),
+	"typed word": ["relatório"],
+	"say all": [
+		item
+		for i, line in enumerate([
+			"O relatório anual foi entregue ontem.",
+			"A diretoria aprovou o orçamento.",
+			"Os contratos serão revistos em março.",
+			"A próxima reunião será na segunda-feira.",
+		])
+		for item in (IndexCommand(i + 1), line)
+	] + [IndexCommand(5)],
+}
+
+
+class Driver:
+	"""The engine side of the driver: a busy flag guarding the instance, and SetMode on prosody changes."""
+
+	def __init__(self, engine):
+		self.engine = engine
+		self.instance = engine.init(DSP_MODES["MULTIMEDIA"])
+		self.pcm = PCMBuffer()
+		self.lock = threading.Lock()
+		self.requests = 0
+		self.prosody = Prosody(50, 50, 100)
+
+	def apply(self, prosody):
+		if prosody != self.prosody:
+			self.engine.set_mode(self.instance, prosody.rate // 5 or 1, prosody.volume // 5 or 1, prosody.pitch // 5 or 1)
+			self.prosody = prosody
+
+	def synthesize(self, text):
+		self.requests += 1
+		for _length in generate_pcm(self.engine, self.instance, text.encode("cp1252"), self.pcm):
+			pass
+
+
+def per_string(driver, sequence):
+	"""The former speak(): every string, or every character in character mode, is a request of its own."""
+	base = Prosody(50, 50, 100)
+	prosody = base
+	char_mode = False
+	for item in sequence:
+		if isinstance(item, str):
+			texts = item.strip() if char_mode else [item.strip()]
+			for text in texts:
+				with driver.lock:
+					driver.apply(prosody)
+					driver.synthesize(text)
+			prosody = prosody._replace(pitch=base.pitch)
+		elif isinstance(item, PitchCommand):
+			prosody = prosody._replace(pitch=base.pitch + item.offset)
+		elif isinstance(item, CharacterModeCommand):
+			char_mode = item.state
+	driver.apply(base)
+
+
+def compiled(driver, sequence):
+	"""speak() with the sequence compiler: one request per segment, the engine taken once."""
+	base = Prosody(50, 50, 100)
+	with driver.lock:
+		for segment in compile_sequence(sequence, base):
+			if segment.text is not None:
+				driver.apply(segment.prosody)
+				driver.synthesize(segment.text)
+		driver.apply(base)
+
+
+def run(speak, repeat):
+	print(f"{speak.__name__}:")
+	for name, sequence in SEQUENCES.items():
+		engine = SimulatedBackend(block_size=8192, block_latency=0.001, setup_latency=0.004, char_latency=0.0001)
+		driver = Driver(engine)
+		times = []
+		for _ in range(repeat):
+			start = time.perf_counter()
+			speak(driver, sequence)
+			times.append(time.perf_counter() - start)
+		print(
+			f"  {name:<11} requests {driver.requests / repeat:4.1f}, "
+			f"SetMode {engine.calls['set_mode'] / repeat:4.1f}, time {common.summarize(times)}"
+		)
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--repeat", type=int, default=20, help="times each sequence is spoken")
+	args = parser.parse_args()
+	for speak in (per_string, compiled):
+		run(speak, args.repeat)
+
+
+if __name__ == "__main__":
+	main()
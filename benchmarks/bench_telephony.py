@@ -0,0 +1,97 @@
+# benchmarks/bench_telephony.py
+# Output profiles: bytes per second, frame streaming and the stream sink
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Compares the output profiles on the simulated engine and measures the pacing of the stream sink.
+
+For each profile, reports the bytes per second of audio, the time to the first frame of
+stream_frames and the frames generated per second. The sink part writes a sentence through
+FrameSink and reports the interval between frames written.
+Run with: python benchmarks/bench_telephony.py [--frame-ms N] [--repeat N]
+"""
+
+import argparse
+import time
+
+import common
+from _deltatalk.engine import SimulatedBackend, generate_pcm
+from _deltatalk.pcm import PCMBuffer, make_pcm_feeder
+from _deltatalk.profiles import ENCODINGS, PROFILES, bytes_per_second, frame_size, stream_frames
+from _deltatalk.sink import FrameSink
+
+VOICE_ID = 2
+TEXT = "Digite o número do seu CPF, seguido da tecla sustenido. Para falar com um atendente, digite zero.".encode("cp1252")
+
+
+def profiles(frame_ms, repeat):
+	baseline = bytes_per_second(PROFILES["multimedia"], VOICE_ID)
+	for name, profile in PROFILES.items():
+		engine = SimulatedBackend(block_size=4096, block_latency=0.002, setup_latency=0.01, char_latency=0.0001)
+		instance = engine.init(profile.dsp_mode)
+		engine.set_voice(instance, VOICE_ID)
+		pcm = PCMBuffer()
+		firsts = []
+		frames = 0
+		start = time.perf_counter()
+		for _ in range(repeat):
+			begin = time.perf_counter()
+			for position, _frame in enumerate(stream_frames(engine, instance, TEXT, profile, VOICE_ID, frame_ms, pcm)):
+				if not position:
+					firsts.append(time.perf_counter() - begin)
+				frames += 1
+		elapsed = time.perf_counter() - start
+		rate = bytes_per_second(profile, VOICE_ID)
+		print(
+			f"  {name:<15} {rate:6d} B/s ({baseline / rate:3.1f}x less), {frame_size(profile, VOICE_ID, frame_ms):4d} B frames, "
+			f"first frame {common.summarize(firsts)}, {frames / elapsed:6.0f} frames/s"
+		)
+
+
+class Recorder:
+	"""A stream remembering when each frame was written."""
+
+	def __init__(self):
+		self.times = []
+
+	def write(self, data):
+		self.times.append(time.perf_counter())
+
+	def close(self):
+		pass
+
+
+def sink(frame_ms):
+	profile = PROFILES["telephony-ulaw"]
+	engine = SimulatedBackend(block_size=4096)
+	instance = engine.init(profile.dsp_mode)
+	pcm = PCMBuffer()
+	recorder = Recorder()
+	frame_sink = FrameSink(
+		recorder, bytes_per_second(profile, VOICE_ID), frame_size(profile, VOICE_ID, frame_ms), ENCODINGS["ulaw"].silence)
+	feed = make_pcm_feeder(frame_sink)
+	fed = 0
+	for length in generate_pcm(engine, instance, TEXT, pcm, ENCODINGS["ulaw"].pcm_format):
+		feed(pcm, length)
+		fed += length
+	frame_sink.idle()
+	frame_sink.close()
+	intervals = [b - a for a, b in zip(recorder.times, recorder.times[1:])]
+	print(f"  {fed} bytes in {len(recorder.times)} frames of {frame_ms} ms, interval {common.summarize(intervals)}")
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--frame-ms", type=int, default=20)
+	parser.add_argument("--repeat", type=int, default=10)
+	args = parser.parse_args()
+	print("Profiles:")
+	profiles(args.frame_ms, args.repeat)
+	print("Stream sink, telephony-ulaw:")
+	sink(args.frame_ms)
+
+
+if __name__ == "__main__":
+	main()
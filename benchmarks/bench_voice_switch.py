@@ -0,0 +1,104 @@
+# benchmarks/bench_voice_switch.py
+# Latency of switching between voices of different sample rates
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Alternates br1 (16 kHz) and br2 (22 kHz) utterances and measures what each voice switch costs.
+
+The switch cost is the time from the previous utterance finishing to the next one being queued
+in a player. Reopening closes the player and opens one at the new rate, as the driver did;
+the pool keeps a player per rate; resampling plays everything at 22 kHz through one player.
+Opening a SimulatedPlayer sleeps --open-ms, standing for the audio device.
+Run with: python benchmarks/bench_voice_switch.py [--switches N] [--open-ms N]
+"""
+
+import argparse
+import array
+import math
+import time
+
+import common
+from _deltatalk.players import PlayerPool
+from _deltatalk.resample import Resampler, audioop
+
+RATES = (16000, 22050)
+UTTERANCE_SECONDS = 0.1
+
+
+def utterance(rate):
+	return array.array(
+		"h", (int(8000 * math.sin(2 * math.pi * 440 * i / rate)) for i in range(int(rate * UTTERANCE_SECONDS)))
+	).tobytes()
+
+
+def reopen(switches, open_latency):
+	costs = []
+	player = common.SimulatedPlayer(samplesPerSec=RATES[0], open_latency=open_latency)
+	for switch in range(switches):
+		rate = RATES[(switch + 1) % 2]
+		player.idle()
+		start = time.perf_counter()
+		player.close()
+		player = common.SimulatedPlayer(samplesPerSec=rate, open_latency=open_latency)
+		player.feed(utterance(rate))
+		costs.append(time.perf_counter() - start)
+	player.idle()
+	player.close()
+	return costs
+
+
+def pooled(switches, open_latency):
+	costs = []
+	pool = PlayerPool(lambda rate: common.SimulatedPlayer(samplesPerSec=rate, open_latency=open_latency))
+	player = pool.get(RATES[0]).player
+	for switch in range(switches):
+		rate = RATES[(switch + 1) % 2]
+		player.idle()
+		start = time.perf_counter()
+		player = pool.get(rate).player
+		player.feed(utterance(rate))
+		costs.append(time.perf_counter() - start)
+	player.idle()
+	pool.close()
+	return costs
+
+
+def resampled(switches, open_latency, use_audioop=True):
+	costs = []
+	shared = max(RATES)
+	player = common.SimulatedPlayer(samplesPerSec=shared, open_latency=open_latency)
+	for switch in range(switches):
+		rate = RATES[(switch + 1) % 2]
+		audio = utterance(rate)
+		player.idle()
+		start = time.perf_counter()
+		if rate != shared:
+			audio = Resampler(rate, shared, use_audioop).convert(audio)
+		player.feed(audio)
+		costs.append(time.perf_counter() - start)
+	player.idle()
+	player.close()
+	return costs
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--switches", type=int, default=20)
+	parser.add_argument("--open-ms", type=float, default=40.0, help="time the simulated device takes to open")
+	args = parser.parse_args()
+	open_latency = args.open_ms / 1000
+	cases = [
+		("reopen", lambda: reopen(args.switches, open_latency)),
+		("player pool", lambda: pooled(args.switches, open_latency)),
+	]
+	if audioop:
+		cases.append(("resample (audioop)", lambda: resampled(args.switches, open_latency)))
+	cases.append(("resample (Python)", lambda: resampled(args.switches, open_latency, use_audioop=False)))
+	for name, run in cases:
+		print(f"  {name:<19} switch {common.summarize(run())}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,134 @@
+# benchmarks/common.py
+# Shared helpers for the DeltaTalk benchmarks
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import ctypes
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+
+# Makes the NVDA independent support modules of the driver importable as _deltatalk
+SYNTH_DRIVERS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "addon", "synthDrivers")
+if SYNTH_DRIVERS_DIR not in sys.path:
+	sys.path.insert(0, SYNTH_DRIVERS_DIR)
+
+DATA_DIR = os.path.join(SYNTH_DRIVERS_DIR, "deltatalk")
+
+
+def summarize(values, unit="ms", scale=1000.0):
+	"""Formats the mean, median and worst value of a list of seconds."""
+	if not values:
+		return "n/a"
+	return "mean {mean:.1f}{unit}, median {median:.1f}{unit}, max {worst:.1f}{unit}".format(
+		mean=statistics.fmean(values) * scale,
+		median=statistics.median(values) * scale,
+		worst=max(values) * scale,
+		unit=unit,
+	)
+
+
+class SimulatedPlayer:
+	"""Stand-in for nvwave.WavePlayer that plays fed audio in real time on its own thread.
+
+	It keeps track of when audio first started playing and of every silence gap between
+	consecutive chunks, which is what a listener hears as an underrun.
+	"""
+
+	def __init__(self, channels=1, samplesPerSec=22050, bitsPerSample=16, outputDevice=None, open_latency=0.0):
+		self.channels = channels
+		self.samplesPerSec = samplesPerSec
+		self.bitsPerSample = bitsPerSample
+		self.outputDevice = outputDevice
+		self.bytes_per_second = samplesPerSec * channels * bitsPerSample // 8
+		self.fed_bytes = 0
+		self.first_audio = None
+		self.gaps = []
+		self._queue = deque()
+		self._cond = threading.Condition()
+		self._last_end = None
+		self._stops = 0
+		self._paused = False
+		self._playing = False
+		self._closed = False
+		# Opening a real audio device is not free
+		if open_latency:
+			time.sleep(open_latency)
+		self._thread = threading.Thread(target=self._run, daemon=True)
+		self._thread.start()
+
+	def feed(self, data, size=None, onDone=None):
+		if size is None:
+			size = len(data) if data else 0
+		elif data is not None:
+			data = ctypes.string_at(data, size)
+		with self._cond:
+			self.fed_bytes += size
+			self._queue.append((size / self.bytes_per_second, onDone))
+			self._cond.notify_all()
+
+	def _run(self):
+		while True:
+			with self._cond:
+				while not self._queue or self._paused:
+					if self._closed:
+						return
+					self._cond.wait()
+				duration, onDone = self._queue.popleft()
+				self._playing = True
+				stops = self._stops
+				now = time.perf_counter()
+				if duration:
+					if self.first_audio is None:
+						self.first_audio = now
+					if self._last_end is not None and now - self._last_end > 0.001:
+						self.gaps.append(now - self._last_end)
+				end = now + duration
+				while stops == self._stops and not self._closed:
+					remaining = end - time.perf_counter()
+					if remaining <= 0:
+						break
+					self._cond.wait(remaining)
+				self._playing = False
+				if stops != self._stops:
+					continue
+				if duration:
+					self._last_end = end
+			if onDone:
+				onDone()
+
+	def forget_last_end(self):
+		"""Stops counting the silence before the next chunk as a gap, e.g. between separate utterances."""
+		with self._cond:
+			self._last_end = None
+
+	def stop(self):
+		with self._cond:
+			self._queue.clear()
+			self._stops += 1
+			self._last_end = None
+			self._cond.notify_all()
+
+	def pause(self, switch):
+		with self._cond:
+			self._paused = switch
+			self._cond.notify_all()
+
+	def idle(self):
+		"""Waits until everything fed has been played."""
+		while True:
+			with self._cond:
+				if not self._queue and not self._playing:
+					break
+			time.sleep(0.005)
+
+	def close(self):
+		with self._cond:
+			self._closed = True
+			self._queue.clear()
+			self._cond.notify_all()
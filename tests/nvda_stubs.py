@@ -0,0 +1,212 @@
+# tests/nvda_stubs.py
+# Stand-ins for the NVDA modules the driver imports
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Runs the real SynthDriver outside NVDA and Windows.
+
+install() puts fake config, globalVars, nvwave, wx, synthDriverHandler, logHandler, speech,
+addonHandler and globalPlugins modules in sys.modules, and the "ansi" codec Windows provides.
+load_driver() then imports synthDrivers.deltatalk from the add-on with SimulatedBackend in
+place of Dtalk32.dll, and nvwave plays into SimulatedPlayer of the benchmarks.
+"""
+
+import builtins
+import codecs
+import logging
+import os
+import re
+import sys
+import threading
+import types
+from collections import namedtuple
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+ADDON_DIR = os.path.join(ROOT_DIR, "addon")
+BENCHMARKS_DIR = os.path.join(ROOT_DIR, "benchmarks")
+# Milliseconds of speech per character the simulated engine produces at DeltaTalk rate 10
+CHAR_MS = 10.0
+
+# A few Virtual Vision labels, for the phrase cache and the warm-up
+CONTROL_TYPE_NAMES = {1: "botão", 2: "caixa de seleção", 3: "link"}
+STATE_NAMES = {1: "marcado", 2: "expandido"}
+NEGATIVE_STATE_NAMES = {1: "não marcado"}
+
+
+class Notification:
+	"""Records the calls to notify, which the tests wait for."""
+
+	def __init__(self):
+		self.calls = []
+		self._cond = threading.Condition()
+
+	def notify(self, **kwargs):
+		with self._cond:
+			self.calls.append(kwargs)
+			self._cond.notify_all()
+
+	def wait_for(self, predicate, timeout=5.0):
+		"""Waits until predicate(calls) is true, and returns it."""
+		with self._cond:
+			return self._cond.wait_for(lambda: predicate(self.calls), timeout)
+
+	def clear(self):
+		with self._cond:
+			self.calls.clear()
+
+
+class SynthDriver:
+	"""The base driver: settings are properties calling _get_ and _set_ methods, as AutoPropertyObject does."""
+
+	@classmethod
+	def VoiceSetting(cls):
+		return "voice"
+
+	@classmethod
+	def RateSetting(cls):
+		return "rate"
+
+	@classmethod
+	def PitchSetting(cls):
+		return "pitch"
+
+	@classmethod
+	def VolumeSetting(cls):
+		return "volume"
+
+	@classmethod
+	def RateBoostSetting(cls):
+		return "rateBoost"
+
+
+for _setting in ("rate", "pitch", "volume", "rateBoost"):
+	setattr(SynthDriver, _setting, property(
+		lambda self, name=_setting: getattr(self, "_get_" + name)(),
+		lambda self, value, name=_setting: getattr(self, "_set_" + name)(value),
+	))
+
+
+class IndexCommand:
+	def __init__(self, index):
+		self.index = index
+
+
+class _ProsodyCommand:
+	settingName = None
+
+	def __init__(self, offset=0, multiplier=1):
+		self.offset = offset
+		self.multiplier = multiplier
+
+
+class RateCommand(_ProsodyCommand):
+	settingName = "rate"
+
+
+class PitchCommand(_ProsodyCommand):
+	settingName = "pitch"
+
+
+class VolumeCommand(_ProsodyCommand):
+	settingName = "volume"
+
+
+class CharacterModeCommand:
+	def __init__(self, state):
+		self.state = state
+
+
+class _Config:
+	"""config.conf: sections built from the defaults of their spec, and the audio and speech sections."""
+
+	def __init__(self):
+		self.spec = {}
+		self.reset()
+
+	def reset(self):
+		self._sections = {"audio": {"outputDevice": "default"}, "speech": {"symbolDictionaries": ["cldr"]}}
+
+	def __getitem__(self, name):
+		if name not in self._sections:
+			self._sections[name] = {key: _default(check) for key, check in self.spec[name].items()}
+		return self._sections[name]
+
+
+def _default(check):
+	"""Returns the default value of a configobj check such as integer(min=0, default=16)."""
+	value = re.search(r"default=(.*?)\)?$", check).group(1).strip("'\"")
+	if check.startswith("boolean"):
+		return value == "True"
+	if check.startswith("integer"):
+		return int(value)
+	return value
+
+
+def _module(name, **attributes):
+	module = types.ModuleType(name)
+	module.__dict__.update(attributes)
+	if "." not in name:
+		module.__path__ = []
+	sys.modules[name] = module
+	return module
+
+
+def _ansi(name):
+	return codecs.lookup("cp1252") if name == "ansi" else None
+
+
+def install(config_path):
+	"""Installs the fake NVDA modules, the user configuration being in config_path."""
+	if "synthDriverHandler" in sys.modules:
+		sys.modules["globalVars"].appArgs.configPath = config_path
+		sys.modules["config"].conf.reset()
+		return
+	builtins._ = lambda text: text
+	codecs.register(_ansi)
+	logging.basicConfig(level=logging.WARNING)
+	_module("config", conf=_Config())
+	_module("globalVars", appArgs=types.SimpleNamespace(configPath=config_path))
+	_module("wx")
+	_module("logHandler", log=logging.getLogger("nvda"))
+	_module("addonHandler", initTranslation=lambda: None)
+	_module(
+		"synthDriverHandler",
+		SynthDriver=SynthDriver,
+		synthDoneSpeaking=Notification(),
+		synthIndexReached=Notification(),
+		VoiceInfo=namedtuple("VoiceInfo", ("id", "displayName")),
+	)
+	speech = _module("speech")
+	speech.sayAll = _module("speech.sayAll", SayAllHandler=None)
+	speech.commands = _module(
+		"speech.commands",
+		IndexCommand=IndexCommand,
+		RateCommand=RateCommand,
+		PitchCommand=PitchCommand,
+		VolumeCommand=VolumeCommand,
+		CharacterModeCommand=CharacterModeCommand,
+	)
+	plugins = _module("globalPlugins")
+	plugins.deltaTalkSettings = _module("globalPlugins.deltaTalkSettings")
+	plugins.virtualVision = _module(
+		"globalPlugins.virtualVision",
+		CONTROL_TYPE_NAMES=CONTROL_TYPE_NAMES,
+		STATE_NAMES=STATE_NAMES,
+		NEGATIVE_STATE_NAMES=NEGATIVE_STATE_NAMES,
+	)
+	for path in (ADDON_DIR, BENCHMARKS_DIR):
+		if path not in sys.path:
+			sys.path.insert(0, path)
+	import common
+	_module("nvwave", WavePlayer=common.SimulatedPlayer)
+
+
+def load_driver():
+	"""Imports the driver module, its engine replaced by SimulatedBackend. Returns the module."""
+	from synthDrivers import deltatalk
+	from synthDrivers._deltatalk.engine import SimulatedBackend
+
+	deltatalk.Dtalk32Backend = lambda dll_path: SimulatedBackend(char_ms=CHAR_MS)
+	return deltatalk
@@ -0,0 +1,16 @@
+# tests/support.py
+# Shared helpers for the DeltaTalk tests
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import os
+import sys
+
+# Makes the NVDA independent support modules of the driver importable as _deltatalk
+SYNTH_DRIVERS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "addon", "synthDrivers")
+if SYNTH_DRIVERS_DIR not in sys.path:
+	sys.path.insert(0, SYNTH_DRIVERS_DIR)
+
+DATA_DIR = os.path.join(SYNTH_DRIVERS_DIR, "deltatalk")
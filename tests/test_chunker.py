@@ -0,0 +1,50 @@
+# tests/test_chunker.py
+# Splitting of queued text at sentence, clause and word boundaries
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.chunker import Chunk, chunk_text
+
+TEXT = "O Sr. Silva chegou. Depois, foi embora com a Dra. Souza para casa, e ficou lá por muito tempo até a noite."
+
+
+class ChunkTextTest(unittest.TestCase):
+	def test_short_text_is_one_chunk(self):
+		self.assertEqual(list(chunk_text("Olá mundo.", 3)), [Chunk("Olá mundo.", 3)])
+
+	def test_sentences_then_clauses(self):
+		self.assertEqual(list(chunk_text(TEXT, 5, first_size=30, size=60)), [
+			Chunk("O Sr. Silva chegou.", 5),
+			Chunk("Depois, foi embora com a Dra. Souza para casa,", None),
+			Chunk("e ficou lá por muito tempo até a noite.", None),
+		])
+
+	def test_chunks_keep_every_word(self):
+		chunks = list(chunk_text(TEXT * 5, first_size=40, size=80))
+		self.assertEqual(" ".join(chunk.text for chunk in chunks).split(), (TEXT * 5).split())
+		self.assertLessEqual(len(chunks[0].text), 40)
+
+	def test_long_word_is_split_within_the_hard_limit(self):
+		chunks = list(chunk_text("a" * 200, first_size=20, size=20))
+		self.assertEqual("".join(chunk.text for chunk in chunks), "a" * 200)
+		self.assertTrue(all(len(chunk.text) <= 40 for chunk in chunks))
+
+	def test_reach_sets_the_following_limits(self):
+		reaches = []
+
+		def reach(text, start):
+			reaches.append(start)
+			return start + 30
+
+		chunks = list(chunk_text(TEXT, first_size=20, reach=reach))
+		self.assertEqual(reaches[0], len(chunks[0].text))
+		self.assertTrue(all(len(chunk.text) <= 30 for chunk in chunks))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,82 @@
+# tests/test_dictionary.py
+# The Aho-Corasick automaton and the user dictionary rewriting speech
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import os
+import tempfile
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.dictionary import Automaton, DictionaryEntry, DictionaryError, DictionaryFile, UserDictionary
+
+
+def entry(pattern, replacement, match_case=False, whole_word=True):
+	return DictionaryEntry(pattern, replacement, match_case, whole_word)
+
+
+class AutomatonTest(unittest.TestCase):
+	def test_finds_every_occurrence(self):
+		automaton = Automaton(["he", "she", "his", "hers"])
+		self.assertEqual(sorted(automaton.find("ushers")), [(1, 4), (2, 4), (2, 6)])
+
+	def test_matches_the_naive_search(self):
+		keys = ["ab", "b", "bab", "abc", "c"]
+		text = "abcbababcab"
+		naive = sorted(
+			(start, start + len(key)) for key in keys for start in range(len(text)) if text.startswith(key, start)
+		)
+		self.assertEqual(sorted(Automaton(keys).find(text)), naive)
+
+	def test_shared_prefixes_share_states(self):
+		self.assertEqual(Automaton(["abc", "abd"]).states, 5)
+
+
+class UserDictionaryTest(unittest.TestCase):
+	def test_whole_words_in_any_case(self):
+		dictionary = UserDictionary([entry("nvda", "ene vê dê á")])
+		self.assertEqual(dictionary.rewrite("NVDA e nvdas"), ("Ene vê dê á e nvdas", 1))
+
+	def test_options(self):
+		dictionary = UserDictionary([entry("US", "Estados Unidos", match_case=True), entry("ção", "são", whole_word=False)])
+		self.assertEqual(dictionary.rewrite("us US ação"), ("us Estados Unidos asão", 2))
+
+	def test_earliest_then_longest_match_wins(self):
+		dictionary = UserDictionary([entry("a b", "X", whole_word=False), entry("b c", "Y", whole_word=False), entry("a", "Z")])
+		self.assertEqual(dictionary.rewrite("a b c"), ("X c", 1))
+
+	def test_read_reuses_the_automaton_of_the_same_keys(self):
+		with tempfile.TemporaryDirectory() as folder:
+			path = os.path.join(folder, "dictionary.txt")
+			with open(path, "w", encoding="utf-8") as f:
+				f.write("# comment\nnvda\tene vê dê á\n")
+			first = UserDictionary.read(path)
+			with open(path, "w", encoding="utf-8") as f:
+				f.write("NVDA\tleitor de telas\tc\n")
+			second = UserDictionary.read(path, first)
+			self.assertIs(second.automaton, first.automaton)
+			with open(path, "w", encoding="utf-8") as f:
+				f.write("sem tab\n")
+			with self.assertRaises(DictionaryError):
+				UserDictionary.read(path)
+
+
+class DictionaryFileTest(unittest.TestCase):
+	def test_reloads_when_the_file_changes(self):
+		now = [0.0]
+		with tempfile.TemporaryDirectory() as folder:
+			path = os.path.join(folder, "dictionary.txt")
+			dictionary_file = DictionaryFile(path, check_interval=1.0, clock=lambda: now[0])
+			self.assertEqual(dictionary_file.rewrite(["nvda"]), ["nvda"])
+			with open(path, "w", encoding="utf-8") as f:
+				f.write("nvda\tene vê dê á\n")
+			now[0] = 2.0
+			dictionary_file.current(wait=True)
+			self.assertEqual(dictionary_file.rewrite(["nvda"]), ["ene vê dê á"])
+			self.assertEqual(dictionary_file.timing.as_dict()["replacements"], 1)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,182 @@
+# tests/test_driver.py
+# SynthDriver speaking, cancelling and pausing on the simulated engine
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""Drives the real SynthDriver through the NVDA stand-ins of nvda_stubs, in direct and in nvwave mode.
+
+Run with: python -m unittest discover -s tests
+"""
+
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import nvda_stubs
+
+nvda_stubs.install(tempfile.gettempdir())
+deltatalk = nvda_stubs.load_driver()
+
+import config  # noqa: E402, one of the stand-ins
+import synthDriverHandler  # noqa: E402
+from speech import sayAll  # noqa: E402
+from speech.commands import IndexCommand  # noqa: E402
+
+LONG_TEXT = "Uma frase longa que o leitor de telas vai interromper quando o foco mudar. " * 6
+
+
+def indexes_reached():
+	return [call["index"] for call in synthDriverHandler.synthIndexReached.calls]
+
+
+def wait_until(predicate, timeout=10.0):
+	deadline = time.monotonic() + timeout
+	while not predicate():
+		if time.monotonic() > deadline:
+			return False
+		time.sleep(0.01)
+	return True
+
+
+class _SayAllRunning:
+	@staticmethod
+	def isRunning():
+		return True
+
+
+class DriverTests:
+	"""What the driver does in every mode; the test cases set the configuration."""
+
+	settings = {}
+
+	def setUp(self):
+		self._config_dir = tempfile.TemporaryDirectory()
+		nvda_stubs.install(self._config_dir.name)
+		config.conf["deltaTalk"].update(self.settings)
+		synthDriverHandler.synthIndexReached.clear()
+		synthDriverHandler.synthDoneSpeaking.clear()
+		self.synth = deltatalk.SynthDriver()
+
+	def tearDown(self):
+		self.synth.terminate()
+		sayAll.SayAllHandler = None
+		self._config_dir.cleanup()
+
+	def speak_and_wait(self, sequence, timeout=5.0):
+		"""Speaks sequence and returns whether the end of speech was reported in time."""
+		done = len(synthDriverHandler.synthDoneSpeaking.calls)
+		self.synth.speak(sequence)
+		return synthDriverHandler.synthDoneSpeaking.wait_for(lambda calls: len(calls) > done, timeout)
+
+	def test_speak_reports_indexes_in_order(self):
+		self.assertTrue(self.speak_and_wait([IndexCommand(1), "Olá", IndexCommand(2), "mundo", IndexCommand(3)]))
+		self.assertEqual(indexes_reached(), [1, 2, 3])
+
+	def test_speak_during_say_all(self):
+		sayAll.SayAllHandler = _SayAllRunning()
+		self.assertTrue(self.speak_and_wait(["Lendo tudo", IndexCommand(7)]))
+		self.assertEqual(indexes_reached(), [7])
+
+	def test_cancel_drops_the_indexes_not_reached(self):
+		self.synth.speak(["Primeira.", IndexCommand(1), LONG_TEXT, IndexCommand(2)])
+		time.sleep(0.1)
+		self.synth.cancel()
+		time.sleep(0.3)
+		self.assertNotIn(2, indexes_reached())
+		# The driver speaks again after a cancel
+		self.assertTrue(self.speak_and_wait(["De novo", IndexCommand(3)]))
+		self.assertIn(3, indexes_reached())
+
+	def test_pause_holds_speech_until_resumed(self):
+		self.synth.speak(["Uma pausa no meio desta frase.", IndexCommand(1)])
+		self.synth.pause(True)
+		time.sleep(0.5)
+		self.assertNotIn(1, indexes_reached())
+		self.synth.pause(False)
+		self.assertTrue(synthDriverHandler.synthIndexReached.wait_for(lambda calls: indexes_reached() == [1]))
+
+
+class DirectTest(DriverTests, unittest.TestCase):
+	settings = {"useNVWave": False, "estimatedIndexes": True}
+
+	def test_indexes_are_reported_at_once_by_default(self):
+		self.synth.terminate()
+		config.conf["deltaTalk"]["estimatedIndexes"] = False
+		self.synth = deltatalk.SynthDriver()
+		self.synth.speak([LONG_TEXT, IndexCommand(1), "Fim.", IndexCommand(2)])
+		self.assertEqual(indexes_reached(), [1, 2])
+		self.assertEqual(len(synthDriverHandler.synthDoneSpeaking.calls), 1)
+
+	def test_engine_is_paused_and_stopped(self):
+		engine, instance = self.synth.dt, self.synth.instancia
+		self.synth.speak([LONG_TEXT])
+		self.synth.pause(True)
+		self.assertTrue(engine._instances[instance].paused)
+		self.synth.pause(False)
+		self.assertFalse(engine._instances[instance].paused)
+		self.synth.cancel()
+		self.assertEqual(engine.calls["stop"], 1)
+
+
+class NVWaveTest(DriverTests, unittest.TestCase):
+	settings = {"useNVWave": True, "warmUp": False}
+
+	def test_audio_is_played(self):
+		self.assertTrue(self.speak_and_wait(["Olá mundo"]))
+		self.assertGreater(self.synth._nvwave_player.fed_bytes, 0)
+
+	def test_cancel_stops_the_audio(self):
+		self.synth.speak([LONG_TEXT, IndexCommand(1)])
+		time.sleep(0.2)
+		self.synth.cancel()
+		fed = self.synth._nvwave_player.fed_bytes
+		time.sleep(0.3)
+		self.assertEqual(self.synth._nvwave_player.fed_bytes, fed)
+		self.assertNotIn(1, indexes_reached())
+
+	def test_phrase_cache_follows_the_rate(self):
+		self.assertTrue(wait_until(lambda: self.synth._phrase_cache is not None))
+		before = self.synth._phrase_cache.fingerprint
+		self.synth.rate = 90
+		self.assertTrue(self.speak_and_wait(["botão"]))
+		self.assertTrue(wait_until(lambda: self.synth._phrase_cache.fingerprint != before))
+
+	def test_unreadable_engine_files_disable_the_phrase_cache(self):
+		self.synth.terminate()
+		with mock.patch.object(deltatalk, "fingerprint_stats", side_effect=PermissionError("denied")):
+			self.synth = deltatalk.SynthDriver()
+		self.assertIsNone(self.synth._phrase_cache_target)
+		self.assertTrue(self.speak_and_wait(["botão"]))
+
+
+class PipelineTest(DriverTests, unittest.TestCase):
+	settings = {"useNVWave": True, "warmUp": False, "phraseCache": False}
+
+	def test_ring_buffers_come_back(self):
+		ring = self.synth._ring
+		for number in range(ring.slots + 3):
+			self.assertTrue(self.speak_and_wait([f"Frase número {number}.", IndexCommand(number)]))
+		self.assertTrue(wait_until(lambda: ring.in_use() == 0, 2.0))
+		self.assertEqual(indexes_reached(), list(range(ring.slots + 3)))
+
+
+class EnginePoolTest(DriverTests, unittest.TestCase):
+	settings = {"useNVWave": True, "warmUp": False, "phraseCache": False, "enginePoolSize": 2}
+
+	def test_long_text_is_read_ahead(self):
+		self.assertTrue(self.speak_and_wait([LONG_TEXT, IndexCommand(1)], timeout=20.0))
+		self.assertEqual(indexes_reached(), [1])
+
+	def test_cancel_wakes_the_reader(self):
+		self.synth.speak([LONG_TEXT, IndexCommand(1)])
+		time.sleep(0.2)
+		self.synth.cancel()
+		self.assertTrue(self.speak_and_wait(["Depois", IndexCommand(2)]))
+		self.assertEqual(indexes_reached(), [2])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,116 @@
+# tests/test_duration.py
+# Spoken durations estimated from phonemes, and the indexes reported from them
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import support
+from _deltatalk.duration import MAX_CORRECTION, MIN_SAMPLES, DurationModel
+from _deltatalk.indexing import EstimatedIndexes
+from _deltatalk.phonemes import load_phonetizer
+
+
+class DurationModelTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls._folder = tempfile.TemporaryDirectory()
+		cls.phonetizer = load_phonetizer(
+			os.path.join(support.DATA_DIR, "brazil.alp"),
+			os.path.join(support.DATA_DIR, "brport.lng"),
+			os.path.join(cls._folder.name, "brport.idx"),
+		)
+
+	@classmethod
+	def tearDownClass(cls):
+		cls._folder.cleanup()
+
+	def setUp(self):
+		self.model = DurationModel(self.phonetizer)
+
+	def test_longer_texts_last_longer(self):
+		short = self.model.estimate("Abrir o arquivo.")
+		self.assertGreater(short, 0)
+		self.assertGreater(self.model.estimate("Abrir o arquivo e salvar as alterações."), short)
+
+	def test_faster_rates_are_shorter(self):
+		self.assertAlmostEqual(self.model.estimate("Abrir o arquivo.", rate=20), self.model.estimate("Abrir o arquivo.") / 2)
+		self.assertAlmostEqual(self.model.estimate("Abrir o arquivo.", tempo=2.0), self.model.estimate("Abrir o arquivo.") / 2)
+
+	def test_numbers_count_their_digits_but_not_zeros(self):
+		self.assertGreater(self.model.estimate("1234"), self.model.estimate("12"))
+		self.assertAlmostEqual(self.model.estimate("1000"), self.model.estimate("1"))
+
+	def test_estimate_many_matches_estimate(self):
+		texts = ["Abrir.", "Salvar como.", "Fechar a janela."]
+		self.assertEqual(self.model.estimate_many(texts, 12), [self.model.estimate(text, 12) for text in texts])
+
+	def test_reach_stops_at_a_word_start(self):
+		text = "Abrir o arquivo e salvar as alterações antes de fechar a janela."
+		position = self.model.reach(text, 0, self.model.estimate(text) / 2)
+		self.assertTrue(0 < position < len(text))
+		self.assertEqual(text[position - 1], " ")
+		self.assertEqual(self.model.reach(text, 0, 1e9), len(text))
+
+	def test_recorded_audio_corrects_the_estimates(self):
+		text = "Abrir o arquivo."
+		estimate = self.model.estimate(text, 10)
+		for _ in range(MIN_SAMPLES):
+			self.model.record(10, estimate, estimate * 1.5)
+		self.assertAlmostEqual(self.model.correction(10), 1.5)
+		self.assertAlmostEqual(self.model.estimate(text, 10), estimate * 1.5)
+		# Other rates keep their own corrections
+		self.assertEqual(self.model.correction(11), 1.0)
+
+	def test_corrections_are_bounded(self):
+		for _ in range(MIN_SAMPLES):
+			self.model.record(10, 100, 100 * MAX_CORRECTION * 10)
+		self.assertEqual(self.model.correction(10), MAX_CORRECTION)
+
+
+class EstimatedIndexesTest(unittest.TestCase):
+	def setUp(self):
+		self.reported = []
+		self.event = threading.Event()
+		self.indexes = EstimatedIndexes(self._notify, early=1.0)
+
+	def tearDown(self):
+		self.indexes.close()
+
+	def _notify(self, index):
+		self.reported.append((index, time.monotonic()))
+		self.event.set()
+
+	def test_index_is_reported_once_the_text_before_is_spoken(self):
+		start = time.monotonic()
+		self.indexes.queued(100)
+		self.indexes.bind(1)
+		self.assertTrue(self.event.wait(2.0))
+		index, when = self.reported[0]
+		self.assertEqual(index, 1)
+		self.assertGreaterEqual(when - start, 0.09)
+
+	def test_pause_holds_the_indexes(self):
+		self.indexes.queued(50)
+		self.indexes.bind(1)
+		self.indexes.pause(True)
+		self.assertFalse(self.event.wait(0.2))
+		self.indexes.pause(False)
+		self.assertTrue(self.event.wait(2.0))
+
+	def test_reset_forgets_them(self):
+		self.indexes.queued(100)
+		self.indexes.bind(1)
+		self.indexes.reset()
+		self.assertEqual(self.indexes.pending(), [])
+		self.assertFalse(self.event.wait(0.2))
+
+
+if __name__ == "__main__":
+	unittest.main()
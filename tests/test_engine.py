@@ -0,0 +1,80 @@
+# tests/test_engine.py
+# Multi-block generation on the simulated engine
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.engine import (
+	DSP_MODES,
+	TTS_MEM_ALLOC_ERROR,
+	TTS_PCM_FINISHED,
+	TTS_SUCCESSFUL,
+	EngineError,
+	SimulatedBackend,
+	generate_blocks,
+	render_pcm,
+)
+from _deltatalk.pcm import PCMBuffer
+from _deltatalk.ring import PCMRing
+
+
+class _EmptyBlocks(SimulatedBackend):
+	"""Writes nothing into the first blocks, as the engine does at times before the audio starts."""
+
+	def __init__(self, empty):
+		super().__init__()
+		self.empty = empty
+
+	def gen_audio_buffer(self, instance, text, block_mode, pcm_format, buffer, size):
+		if self.empty:
+			self.empty -= 1
+			return TTS_SUCCESSFUL, 0
+		return TTS_PCM_FINISHED, 0
+
+
+class GenerateBlocksTest(unittest.TestCase):
+	def setUp(self):
+		self.engine = SimulatedBackend(block_size=4096)
+		self.instance = self.engine.init(DSP_MODES["MULTIMEDIA"])
+		self.ring = PCMRing(3)
+
+	def generate(self, text):
+		return generate_blocks(self.engine, self.instance, text, self.ring.acquire, release=self.ring.release)
+
+	def test_buffer_of_the_last_call_is_released(self):
+		for _ in range(10):
+			for block, _length in self.generate(b"Texto curto."):
+				self.ring.release(block)
+		self.assertEqual(self.ring.in_use(), 0)
+
+	def test_buffer_is_released_when_the_engine_fails(self):
+		self.engine.fail("gen_audio_buffer", TTS_MEM_ALLOC_ERROR)
+		with self.assertRaises(EngineError):
+			list(self.generate(b"Texto."))
+		self.assertEqual(self.ring.in_use(), 0)
+
+	def test_empty_blocks_are_released(self):
+		self.engine = _EmptyBlocks(3)
+		self.instance = self.engine.init(DSP_MODES["MULTIMEDIA"])
+		self.assertEqual(list(self.generate(b"Texto.")), [])
+		self.assertEqual(self.ring.in_use(), 0)
+
+	def test_yielded_buffer_belongs_to_the_caller(self):
+		blocks = self.generate(b"Texto longo o bastante para mais de um bloco. " * 4)
+		block, _length = next(blocks)
+		blocks.close()
+		self.assertEqual(self.ring.in_use(), 1)
+		self.ring.release(block)
+
+	def test_render_pcm_joins_the_blocks(self):
+		text = b"Texto longo o bastante para mais de um bloco. " * 4
+		audio = render_pcm(self.engine, self.instance, text, PCMBuffer())
+		self.assertEqual(len(audio), self.engine.audio_bytes(self.instance, text))
+
+
+if __name__ == "__main__":
+	unittest.main()
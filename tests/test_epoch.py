@@ -0,0 +1,25 @@
+# tests/test_epoch.py
+# Cancellation epochs tagging queued work
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.epoch import CancelEpoch
+
+
+class CancelEpochTest(unittest.TestCase):
+	def test_work_queued_before_a_cancel_is_stale(self):
+		epoch = CancelEpoch()
+		queued = epoch.current
+		self.assertFalse(epoch.is_stale(queued))
+		self.assertEqual(epoch.advance(), queued + 1)
+		self.assertTrue(epoch.is_stale(queued))
+		self.assertFalse(epoch.is_stale(epoch.current))
+
+
+if __name__ == "__main__":
+	unittest.main()
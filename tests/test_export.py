@@ -0,0 +1,96 @@
+# tests/test_export.py
+# Batch export of a manifest to WAV files, and resuming it
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import json
+import os
+import struct
+import tempfile
+import unittest
+import wave
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.engine import TTS_MEM_ALLOC_ERROR, SimulatedBackend
+from _deltatalk.export import ManifestError, WaveFileWriter, export, read_manifest
+from _deltatalk.profiles import PROFILES, WAVE_FORMAT_MULAW
+
+ITEMS = [
+	{"id": "ola", "text": "Olá mundo."},
+	{"id": "rapido", "text": "Uma frase dita mais depressa.", "rate": 80, "voice": "br2"},
+	{"text": "Sem identificador."},
+]
+
+
+class ExportTest(unittest.TestCase):
+	def setUp(self):
+		self._folder = tempfile.TemporaryDirectory()
+		self.output = os.path.join(self._folder.name, "audio")
+
+	def tearDown(self):
+		self._folder.cleanup()
+
+	def manifest(self, lines):
+		path = os.path.join(self._folder.name, "manifest.jsonl")
+		with open(path, "w", encoding="utf-8") as f:
+			f.write("# Test manifest\n\n")
+			f.writelines(line if isinstance(line, str) else json.dumps(line) + "\n" for line in lines)
+		return path
+
+	def test_files_are_written_as_wav(self):
+		engine = SimulatedBackend()
+		report = export(read_manifest(self.manifest(ITEMS)), engine, self.output, instances=2)
+		self.assertEqual((report.exported, report.skipped, report.failed), (3, 0, []))
+		self.assertEqual(sorted(os.listdir(self.output)), ["00005.wav", "ola.wav", "rapido.wav"])
+		with wave.open(os.path.join(self.output, "ola.wav")) as f:
+			self.assertEqual((f.getnchannels(), f.getsampwidth()), (1, 2))
+			self.assertGreater(f.getnframes(), 0)
+
+	def test_resume_skips_the_files_written(self):
+		items = read_manifest(self.manifest(ITEMS))
+		export(items[:1], SimulatedBackend(), self.output)
+		report = export(items, SimulatedBackend(), self.output)
+		self.assertEqual((report.exported, report.skipped), (2, 1))
+
+	def test_failed_item_leaves_no_file(self):
+		engine = SimulatedBackend()
+		engine.fail("gen_audio_buffer", TTS_MEM_ALLOC_ERROR)
+		report = export(read_manifest(self.manifest(ITEMS[:1])), engine, self.output)
+		self.assertEqual([item_id for item_id, _error in report.failed], ["ola"])
+		self.assertEqual(os.listdir(self.output), [])
+
+	def test_telephony_mulaw(self):
+		items = read_manifest(self.manifest(ITEMS[:1]), PROFILES["telephony-ulaw"].encoding)
+		export(items, SimulatedBackend(), self.output, profile=PROFILES["telephony-ulaw"])
+		with open(os.path.join(self.output, "ola.wav"), "rb") as f:
+			header = f.read(36)
+		format_tag, channels, rate = struct.unpack_from("<HHI", header, 20)
+		self.assertEqual((format_tag, channels, rate), (WAVE_FORMAT_MULAW, 1, 8000))
+
+	def test_invalid_manifests(self):
+		for line in ('{"text": "Olá", "voice": "br9"}\n', '{"id": "../fora", "text": "Olá"}\n', "{}\n", "não é json\n"):
+			with self.subTest(line=line):
+				with self.assertRaises(ManifestError):
+					read_manifest(self.manifest([line]))
+		with self.assertRaises(ManifestError):
+			read_manifest(self.manifest([{"id": "a", "text": "1"}, {"id": "a", "text": "2"}]))
+
+
+class WaveFileWriterTest(unittest.TestCase):
+	def test_odd_length_is_padded(self):
+		with tempfile.TemporaryDirectory() as folder:
+			path = os.path.join(folder, "odd.wav")
+			writer = WaveFileWriter(path, 8000, WAVE_FORMAT_MULAW, 1)
+			writer.write(b"\xff" * 801)
+			writer.close()
+			self.assertAlmostEqual(writer.duration, 801 / 8000)
+			with open(path, "rb") as f:
+				data = f.read()
+			self.assertEqual(len(data) % 2, 0)
+			self.assertEqual(struct.unpack_from("<I", data, 4)[0], len(data) - 8)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,61 @@
+# tests/test_gate.py
+# One thread at a time on an engine instance
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import threading
+import time
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.gate import EngineGate
+
+
+class EngineGateTest(unittest.TestCase):
+	def setUp(self):
+		self.gate = EngineGate()
+
+	def test_taken_engine_is_refused_without_waiting(self):
+		self.assertTrue(self.gate.acquire())
+		self.assertFalse(self.gate.acquire(blocking=False))
+		self.assertFalse(self.gate.acquire(timeout=0.01))
+		self.gate.release()
+		self.assertFalse(self.gate.busy)
+		self.assertEqual(self.gate.stats.refused, 2)
+
+	def test_waiter_is_woken_by_the_release(self):
+		self.gate.acquire()
+		acquired = threading.Event()
+
+		def wait():
+			with self.gate.hold():
+				acquired.set()
+
+		thread = threading.Thread(target=wait)
+		thread.start()
+		time.sleep(0.05)
+		self.assertFalse(acquired.is_set())
+		self.gate.release()
+		self.assertTrue(acquired.wait(5.0))
+		thread.join(5.0)
+		self.assertEqual((self.gate.stats.acquisitions, self.gate.stats.contended), (2, 1))
+
+	def test_hold_releases_on_errors(self):
+		with self.assertRaises(RuntimeError):
+			with self.gate.hold():
+				raise RuntimeError
+		self.assertFalse(self.gate.busy)
+
+	def test_times_are_measured_with_the_clock(self):
+		now = [0.0]
+		gate = EngineGate(clock=lambda: now[0])
+		gate.acquire()
+		now[0] = 0.25
+		gate.release()
+		self.assertEqual(gate.stats.as_dict()["max_hold_ms"], 250)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,83 @@
+# tests/test_host.py
+# Out-of-process synthesis hosts, their shared-memory slots and their watchdog
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import itertools
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.engine import DSP_MODES, TTS_NO_LICENSE, EngineError, SimulatedBackend
+from _deltatalk.host import HostError, HostPool, SynthesisHost
+
+TEXT = b"Texto longo o bastante para mais de um bloco de audio. " * 4
+
+
+def expected_bytes(text, **options):
+	engine = SimulatedBackend(**options)
+	return engine.audio_bytes(engine.init(DSP_MODES["MULTIMEDIA"]), text)
+
+
+class SynthesisHostTest(unittest.TestCase):
+	def start(self, slots=4, **backend):
+		host = SynthesisHost(("simulated", backend), slots=slots, block_size=4096, hang_timeout=1.0)
+		self.addCleanup(host.close)
+		return host
+
+	def test_render(self):
+		host = self.start()
+		self.assertEqual(len(host.render(TEXT)), expected_bytes(TEXT))
+		host.configure(0, 20, 10, 10)
+		self.assertEqual(len(host.render(TEXT)), expected_bytes(TEXT) // 2)
+
+	def test_host_waits_for_the_slots_it_filled(self):
+		host = self.start(slots=2)
+		blocks = host.synthesize(TEXT)
+		held = [next(blocks), next(blocks)]
+		# Both slots are in the driver's hands, which is not a hang
+		self.assertEqual(len(host._held), 2)
+		lengths = []
+		for slot, length in itertools.chain(held, blocks):
+			host.release(slot)
+			lengths.append(length)
+		self.assertEqual(sum(lengths), expected_bytes(TEXT))
+		self.assertEqual(host.restarts, 0)
+
+	def test_engine_that_cannot_open_an_instance(self):
+		with self.assertRaises(EngineError) as raised:
+			self.start(max_instances=0)
+		self.assertEqual(raised.exception.code, TTS_NO_LICENSE)
+
+	def test_hung_host_is_restarted(self):
+		host = self.start(hang_after=1)
+		with self.assertRaises(HostError):
+			host.render(TEXT)
+		self.assertEqual(host.restarts, 1)
+		self.assertTrue(host.alive)
+
+	def test_dead_host_is_restarted(self):
+		host = self.start()
+		host._process.kill()
+		with self.assertRaises(HostError):
+			host.render(TEXT)
+		self.assertEqual(len(host.render(TEXT)), expected_bytes(TEXT))
+
+
+class HostPoolTest(unittest.TestCase):
+	def test_texts_in_order(self):
+		pool = HostPool(2, ("simulated", {}), slots=4, block_size=4096)
+		self.addCleanup(pool.close)
+		texts = [TEXT[:number * 20] for number in range(1, 6)]
+		self.assertEqual([len(audio) for audio in pool.render(texts)], [expected_bytes(text) for text in texts])
+
+	def test_host_that_cannot_open_the_engine(self):
+		pool = HostPool(1, ("simulated", {"max_instances": 0}))
+		self.addCleanup(pool.close)
+		self.assertEqual(len(pool), 0)
+		self.assertEqual(pool.failures[0].code, TTS_NO_LICENSE)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,45 @@
+# tests/test_indexing.py
+# Indexes bound to the bytes of the PCM stream fed to the player
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.indexing import IndexTracker
+
+
+class IndexTrackerTest(unittest.TestCase):
+	def setUp(self):
+		self.tracker = IndexTracker()
+
+	def test_indexes_are_reached_once_their_audio_has_played(self):
+		self.tracker.fed(100)
+		first = self.tracker.bind(1)
+		self.tracker.fed(50)
+		second = self.tracker.bind(2)
+		third = self.tracker.bind(3)
+		self.assertEqual((first, second, third), (100, 150, 150))
+		self.assertEqual(self.tracker.reached(120), [1])
+		self.assertEqual(self.tracker.pending(), [2, 3])
+		self.assertEqual(self.tracker.reached(150), [2, 3])
+		self.assertEqual(self.tracker.reached(150), [])
+
+	def test_played_bytes_never_go_back(self):
+		self.tracker.fed(100)
+		self.tracker.reached(80)
+		self.tracker.reached(40)
+		self.assertEqual(self.tracker.played_bytes, 80)
+
+	def test_reset_forgets_the_pending_indexes(self):
+		self.tracker.fed(100)
+		self.tracker.bind(1)
+		self.tracker.reset()
+		self.assertEqual((self.tracker.pending(), self.tracker.fed_bytes), ([], 0))
+		self.assertEqual(self.tracker.reached(100), [])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,81 @@
+# tests/test_intonation.py
+# Decoding the intonation tables and their memory-mapped cache
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import os
+import tempfile
+import unittest
+
+import support
+from _deltatalk.intonation import SHIFT, IntonationError, IntonationTable, split_contour_id
+
+TABLE = """NbPitchPoints 2
+NbRules 3
+0 . HH\t1.00\t0.50\t-0.25\t
+1 l HL .\t0.25\t0.00\t0.50\t-0.50\t0.00\t
+0 . HH\t0.75\t0.25\t0.00\t
+"""
+
+
+def encode_table(text):
+	return bytes(byte if byte in b"\t\r\n" else (byte + SHIFT) % 256 for byte in text.encode("cp1252"))
+
+
+class IntonationTableTest(unittest.TestCase):
+	def setUp(self):
+		self._folder = tempfile.TemporaryDirectory()
+		self.table_path = os.path.join(self._folder.name, "brazilf0.HHS")
+		self.cache_path = os.path.join(self._folder.name, "brazilf0.cache")
+		self.write(TABLE)
+
+	def tearDown(self):
+		self._folder.cleanup()
+
+	def write(self, text):
+		with open(self.table_path, "wb") as f:
+			f.write(encode_table(text))
+
+	def load(self):
+		table = IntonationTable.load(self.table_path, self.cache_path)
+		self.addCleanup(table.close)
+		return table
+
+	def test_rules_and_variants(self):
+		table = self.load()
+		self.assertEqual((len(table), table.pitch_points, table.leading_points), (3, 2, 1))
+		self.assertEqual(table.variants("0 . HH"), [0, 2])
+		self.assertEqual(table.variants("9 HH"), [])
+		rule = table.rule(1)
+		self.assertEqual(rule.contour_id, "1 l HL .")
+		self.assertEqual(list(table.syllable_points(rule.points, 1)), [-0.5, 0.0])
+
+	def test_split_contour_id(self):
+		self.assertEqual(split_contour_id("1 l HL ."), (1, ("l", "HL")))
+
+	def test_cache_is_rebuilt_when_the_table_changes(self):
+		self.load().close()
+		self.write(TABLE.replace("NbRules 3", "NbRules 2").rsplit("0 . HH", 1)[0])
+		self.assertEqual(len(self.load()), 2)
+
+	def test_invalid_tables(self):
+		for text in ("NbRules 3\n", TABLE.replace("NbRules 3", "NbRules 4"), TABLE.replace("\t-0.50", "")):
+			with self.subTest(text=text[:30]):
+				self.write(text)
+				with self.assertRaises(IntonationError):
+					IntonationTable.load(self.table_path, self.cache_path)
+
+	def test_shipped_tables(self):
+		for name, leading in (("brazil.f0", 0), ("brazilf0.HHS", 1)):
+			with self.subTest(table=name):
+				table = IntonationTable.load(
+					os.path.join(support.DATA_DIR, name), os.path.join(self._folder.name, name + ".cache"))
+				self.addCleanup(table.close)
+				self.assertEqual(table.leading_points, leading)
+				self.assertGreater(len(table), 0)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,80 @@
+# tests/test_lexicon.py
+# Parsing of brport.lng and its binary index
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import os
+import tempfile
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.lexicon import LEXICON_ENCODING, Lexicon, LexiconError
+
+LEXICON = """apagar\tV\tapag'a%\t0
+casa\t-\tk'aza\t1
+casa\tV\tk'aza\t2
+sé\t-\ts'é\t0
+*
+V\t-\tV
+*
+uem\t3\tar\t'ÿ\tV\t0
+s\t1\t\ts\t-\t0
+"""
+
+
+class LexiconTest(unittest.TestCase):
+	def setUp(self):
+		self._folder = tempfile.TemporaryDirectory()
+		self.lexicon_path = os.path.join(self._folder.name, "brport.lng")
+		self.index_path = os.path.join(self._folder.name, "brport.idx")
+		self.write(LEXICON)
+
+	def tearDown(self):
+		self._folder.cleanup()
+
+	def write(self, text):
+		with open(self.lexicon_path, "w", encoding=LEXICON_ENCODING, newline="") as f:
+			f.write(text)
+
+	def test_homographs_in_file_order(self):
+		lexicon = Lexicon.load(self.lexicon_path, self.index_path)
+		self.assertEqual(len(lexicon), 4)
+		self.assertEqual([entry.word_class for entry in lexicon.lookup("casa")], ["-", "V"])
+		self.assertEqual(lexicon.lookup("Casa")[0].flags, ("1",))
+		self.assertEqual(lexicon.lookup("sé")[0].transcription, "s'é")
+		self.assertEqual(lexicon.lookup("porta"), ())
+		self.assertIn("CASA", lexicon)
+
+	def test_rules(self):
+		lexicon = Lexicon.load(self.lexicon_path, self.index_path)
+		self.assertEqual(lexicon.class_rules, [("V", "-", "V")])
+		match = next(lexicon.match_suffixes("apaguem"))
+		self.assertEqual((match.rule.suffix, match.lemma), ("uem", "apagar"))
+		self.assertEqual([match.lemma for match in lexicon.match_suffixes("casas")], ["casa"])
+
+	def test_index_is_reused_then_rebuilt_when_the_lexicon_changes(self):
+		Lexicon.load(self.lexicon_path, self.index_path)
+		built = os.stat(self.index_path).st_mtime_ns
+		Lexicon.load(self.lexicon_path, self.index_path)
+		self.assertEqual(os.stat(self.index_path).st_mtime_ns, built)
+		self.write(LEXICON.replace("casa\tV\tk'aza\t2\n", ""))
+		self.assertEqual(len(Lexicon.load(self.lexicon_path, self.index_path).lookup("casa")), 1)
+
+	def test_damaged_index(self):
+		Lexicon.load(self.lexicon_path, self.index_path)
+		with open(self.index_path, "r+b") as f:
+			f.truncate(os.path.getsize(self.index_path) - 1)
+		with self.assertRaises(LexiconError):
+			Lexicon(self.index_path)
+		self.assertEqual(len(Lexicon.load(self.lexicon_path, self.index_path)), 4)
+
+	def test_bad_line(self):
+		self.write("casa\t-\n")
+		with self.assertRaises(LexiconError):
+			Lexicon.load(self.lexicon_path, self.index_path)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,74 @@
+# tests/test_pacing.py
+# Pacing block generation on the audio queued in the player
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import threading
+import time
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.pacing import PacingScheduler
+
+BYTES_PER_SECOND = 32000
+
+
+class PacingSchedulerTest(unittest.TestCase):
+	def setUp(self):
+		self.now = 100.0
+		self.pacing = PacingScheduler(low_water_ms=300, clock=lambda: self.now)
+
+	def test_queue_drains_with_time(self):
+		self.pacing.start_utterance(BYTES_PER_SECOND)
+		self.pacing.fed(BYTES_PER_SECOND)
+		self.assertEqual(self.pacing.queued_ms(), 1000)
+		self.now += 0.4
+		self.assertAlmostEqual(self.pacing.queued_ms(), 600)
+
+	def test_pause_freezes_the_queue(self):
+		self.pacing.start_utterance(BYTES_PER_SECOND)
+		self.pacing.fed(BYTES_PER_SECOND)
+		self.pacing.pause(True)
+		self.now += 5
+		self.assertEqual(self.pacing.queued_ms(), 1000)
+		self.pacing.pause(False)
+		self.now += 0.5
+		self.assertAlmostEqual(self.pacing.queued_ms(), 500)
+
+	def test_underruns_and_time_to_first_audio(self):
+		self.pacing.start_utterance(BYTES_PER_SECOND)
+		self.now += 0.05
+		self.pacing.fed(BYTES_PER_SECOND // 10)
+		self.now += 0.2
+		self.pacing.fed(BYTES_PER_SECOND // 10)
+		self.assertAlmostEqual(self.pacing.stats.last_time_to_first_audio_ms(), 50)
+		self.assertEqual(self.pacing.stats.underruns, 1)
+
+	def test_expected_duration(self):
+		self.pacing.start_utterance(BYTES_PER_SECOND, expected_ms=2000)
+		self.pacing.fed(BYTES_PER_SECOND // 2)
+		self.assertAlmostEqual(self.pacing.remaining_ms(), 2000)
+		self.assertEqual(self.pacing.end_utterance(), (2000, 500))
+		self.pacing.start_utterance(BYTES_PER_SECOND, expected_ms=2000)
+		self.pacing.fed(BYTES_PER_SECOND // 2)
+		self.pacing.reset()
+		self.assertIsNone(self.pacing.end_utterance())
+
+	def test_reset_wakes_the_generator(self):
+		pacing = PacingScheduler(low_water_ms=0)
+		pacing.start_utterance(BYTES_PER_SECOND)
+		pacing.fed(BYTES_PER_SECOND * 60)
+		waited = []
+		thread = threading.Thread(target=lambda: waited.append(pacing.wait_for_room()))
+		thread.start()
+		time.sleep(0.05)
+		pacing.reset()
+		thread.join(5.0)
+		self.assertLess(waited[0], 5.0)
+		self.assertEqual(pacing.queued_ms(), 0)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,58 @@
+# tests/test_pcm.py
+# The reused PCM buffer and feeding it to players with or without pointers
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import ctypes
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.pcm import PCMBuffer, make_pcm_feeder
+
+
+class _BytesPlayer:
+	"""An nvwave player from before NVDA 2023.2, taking bytes only."""
+
+	def __init__(self):
+		self.fed = []
+
+	def feed(self, data, onDone=None):
+		self.fed.append(data)
+
+
+class _PointerPlayer:
+	def __init__(self):
+		self.fed = []
+
+	def feed(self, data, size=None, onDone=None):
+		self.fed.append(ctypes.string_at(data, size))
+
+
+class PCMBufferTest(unittest.TestCase):
+	def setUp(self):
+		self.pcm = PCMBuffer(16)
+		self.fill()
+
+	def fill(self):
+		ctypes.memmove(self.pcm.address, b"0123456789abcdef", 16)
+
+	def test_block_is_a_view_of_the_buffer(self):
+		block = self.pcm.block(4)
+		self.assertEqual(bytes(block), b"0123")
+		self.pcm.buffer[0] = ord("x")
+		self.assertEqual(bytes(block), b"x123")
+
+	def test_both_feeders_copy_the_same_bytes(self):
+		for player in (_BytesPlayer(), _PointerPlayer()):
+			with self.subTest(player=type(player).__name__):
+				self.fill()
+				feed = make_pcm_feeder(player)
+				feed(self.pcm, 4, offset=2)
+				self.pcm.buffer[2] = ord("x")
+				self.assertEqual(player.fed, [b"2345"])
+
+
+if __name__ == "__main__":
+	unittest.main()
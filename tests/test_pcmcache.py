@@ -0,0 +1,56 @@
+# tests/test_pcmcache.py
+# Least recently used eviction of the PCM cache of short utterances
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.pcmcache import PCMCache
+
+
+class PCMCacheTest(unittest.TestCase):
+	def setUp(self):
+		self.cache = PCMCache(max_bytes=300, max_text_length=10)
+
+	def test_least_recently_used_is_evicted(self):
+		for name in "abc":
+			self.cache.put(name, bytes(100))
+		self.assertIsNotNone(self.cache.get("a"))
+		self.cache.put("d", bytes(100))
+		self.assertNotIn("b", self.cache)
+		self.assertEqual([name in self.cache for name in "acd"], [True, True, True])
+		self.assertEqual(self.cache.stats()["evictions"], 1)
+		self.assertEqual(self.cache.size_bytes, 300)
+
+	def test_replacing_an_entry_keeps_the_size(self):
+		self.cache.put("a", bytes(100))
+		self.cache.put("a", bytes(50))
+		self.assertEqual((len(self.cache), self.cache.size_bytes), (1, 50))
+
+	def test_larger_than_the_budget_is_not_stored(self):
+		self.cache.put("a", bytes(100))
+		self.cache.put("big", bytes(301))
+		self.assertNotIn("big", self.cache)
+		self.assertIn("a", self.cache)
+
+	def test_hits_and_misses(self):
+		self.cache.put("a", b"\x01\x00")
+		self.assertEqual(self.cache.get("a"), b"\x01\x00")
+		self.assertIsNone(self.cache.get("b"))
+		self.assertEqual(self.cache.stats()["hit_ratio"], 0.5)
+
+	def test_keys_ignore_whitespace(self):
+		self.assertEqual(PCMCache.make_key(" Olá\t mundo ", 0, 10, 10, 10), PCMCache.make_key("Olá mundo", 0, 10, 10, 10))
+		self.assertNotEqual(PCMCache.make_key("Olá", 0, 10, 10, 10), PCMCache.make_key("Olá", 0, 11, 10, 10))
+
+	def test_cacheable(self):
+		self.assertTrue(self.cache.cacheable("botão"))
+		self.assertFalse(self.cache.cacheable("uma frase longa"))
+		self.assertFalse(PCMCache(max_bytes=0).cacheable("botão"))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,64 @@
+# tests/test_phonemes.py
+# The brazil.alp alphabet, transcriptions of words and the durations estimated from them
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import os
+import tempfile
+import unittest
+
+import support
+from _deltatalk.phonemes import Alphabet, AlphabetError, letters_to_symbols, load_phonetizer
+
+
+class AlphabetTest(unittest.TestCase):
+	def test_tokenize_spells_out_the_lexicon_symbols(self):
+		alphabet = Alphabet.read(os.path.join(support.DATA_DIR, "brazil.alp"))
+		self.assertEqual(alphabet.tokenize("abok@ñ'a%"), (["a", "b", "o", "k", "@", "nh", "'", "a", "r2"], []))
+
+	def test_not_an_alphabet(self):
+		with tempfile.TemporaryDirectory() as folder:
+			path = os.path.join(folder, "brazil.alp")
+			with open(path, "w") as f:
+				f.write("a 1 1 80\n")
+			with self.assertRaises(AlphabetError):
+				Alphabet.read(path)
+
+
+class PhonetizerTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls._folder = tempfile.TemporaryDirectory()
+		cls.phonetizer = load_phonetizer(
+			os.path.join(support.DATA_DIR, "brazil.alp"),
+			os.path.join(support.DATA_DIR, "brport.lng"),
+			os.path.join(cls._folder.name, "brport.idx"),
+		)
+
+	@classmethod
+	def tearDownClass(cls):
+		cls._folder.cleanup()
+
+	def test_sources(self):
+		self.assertEqual(self.phonetizer.word("arquivo").source, "lexicon")
+		self.assertEqual(self.phonetizer.word("arquivos").source, "suffix")
+		self.assertEqual(self.phonetizer.word("xpto").source, "letters")
+
+	def test_letter_rules(self):
+		self.assertEqual(letters_to_symbols("chuva"), ["x", "u", "v", "a"])
+		self.assertEqual(letters_to_symbols("casa"), ["k", "a", "z", "a"])
+
+	def test_digits_are_read_by_name(self):
+		estimate = self.phonetizer.estimate_ms
+		self.assertEqual(estimate("2024"), estimate("dois dois quatro"))
+		self.assertEqual(estimate("0"), estimate("zero"))
+		self.assertGreater(estimate("Página 12."), estimate("Página."))
+
+	def test_punctuation_pauses(self):
+		self.assertGreater(self.phonetizer.estimate_ms("casa."), self.phonetizer.estimate_ms("casa"))
+
+
+if __name__ == "__main__":
+	unittest.main()
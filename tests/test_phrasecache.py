@@ -0,0 +1,113 @@
+# tests/test_phrasecache.py
+# Phrase cache files, their fingerprints and closing them while in use
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import os
+import tempfile
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.pcmcache import PCMCache
+from _deltatalk.phrasecache import (
+	PhraseCache,
+	PhraseCacheError,
+	fingerprint_files,
+	fingerprint_settings,
+	fingerprint_stats,
+	write_phrase_cache,
+)
+
+FINGERPRINT = b"\x01" * 20
+ENTRIES = [
+	(PCMCache.make_key("botão", "br1", 10, 10, 20), b"\x10\x00" * 300),
+	(PCMCache.make_key("link", "br1", 10, 10, 20), b"\x20\x00" * 100),
+	(PCMCache.make_key("link", "br2", 11, 10, 20), b"\x30\x00" * 50),
+]
+
+
+class PhraseCacheTest(unittest.TestCase):
+	def setUp(self):
+		self._folder = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self._folder.name, "phrases.dtpc")
+		write_phrase_cache(self.path, FINGERPRINT, ENTRIES)
+
+	def tearDown(self):
+		self._folder.cleanup()
+
+	def test_lookups_find_the_pcm_of_each_key(self):
+		cache = PhraseCache(self.path, FINGERPRINT)
+		self.assertEqual(cache.count, len(ENTRIES))
+		for key, pcm in ENTRIES:
+			offset, length = cache.lookup(key)
+			self.assertEqual(bytes(cache.view[offset:offset + length]), pcm)
+		self.assertIsNone(cache.lookup(PCMCache.make_key("link", "br3", 10, 10, 20)))
+		self.assertEqual((cache.hits, cache.misses), (3, 1))
+		cache.close()
+
+	def test_other_fingerprint_is_refused(self):
+		with self.assertRaises(PhraseCacheError):
+			PhraseCache(self.path, b"\x02" * 20)
+
+	def test_truncated_file_is_refused(self):
+		with open(self.path, "r+b") as f:
+			f.truncate(os.path.getsize(self.path) - 1)
+		with self.assertRaises(PhraseCacheError):
+			PhraseCache(self.path, FINGERPRINT)
+
+	def test_failed_write_leaves_nothing(self):
+		def entries():
+			yield ENTRIES[0]
+			raise PhraseCacheError("cancelled")
+
+		path = os.path.join(self._folder.name, "other.dtpc")
+		with self.assertRaises(PhraseCacheError):
+			write_phrase_cache(path, FINGERPRINT, entries())
+		self.assertEqual(sorted(os.listdir(self._folder.name)), ["phrases.dtpc"])
+
+	def test_close_waits_for_the_last_release(self):
+		cache = PhraseCache(self.path, FINGERPRINT)
+		self.assertTrue(cache.acquire())
+		cache.close()
+		# Still mapped for the block being fed, but no new user gets it
+		key = ENTRIES[0][0]
+		self.assertEqual(bytes(cache.view[:4]), b"DTPC")
+		self.assertFalse(cache.acquire())
+		self.assertIsNone(cache.lookup(key))
+		self.assertNotIn(key, cache)
+		cache.release()
+		self.assertFalse(hasattr(cache, "view"))
+
+
+class FingerprintTest(unittest.TestCase):
+	def setUp(self):
+		self._folder = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self._folder.name, "brazil.alp")
+		with open(self.path, "wb") as f:
+			f.write(b"data")
+
+	def tearDown(self):
+		self._folder.cleanup()
+
+	def test_stats_change_with_the_file(self):
+		before = fingerprint_stats([self.path])
+		self.assertEqual(fingerprint_stats([self.path]), before)
+		with open(self.path, "ab") as f:
+			f.write(b"more")
+		self.assertNotEqual(fingerprint_stats([self.path]), before)
+
+	def test_missing_file_raises(self):
+		with self.assertRaises(OSError):
+			fingerprint_stats([os.path.join(self._folder.name, "missing")])
+
+	def test_settings_are_part_of_the_fingerprint(self):
+		files = fingerprint_files([self.path])
+		settings = ((("br1", 0),), 8, 12, 10, 20, 1)
+		self.assertEqual(fingerprint_settings(files, settings), fingerprint_settings(files, settings))
+		self.assertNotEqual(fingerprint_settings(files, settings), fingerprint_settings(files, settings[:1] + (9, 12, 10, 20, 1)))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,63 @@
+# tests/test_players.py
+# Players kept open across voice switches
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.players import PlayerPool
+
+
+class _Player:
+	def __init__(self, sample_rate):
+		self.sample_rate = sample_rate
+		self.closed = False
+		self.stopped = 0
+		self.paused = None
+
+	def feed(self, data, onDone=None):
+		pass
+
+	def stop(self):
+		self.stopped += 1
+
+	def pause(self, switch):
+		self.paused = switch
+
+	def close(self):
+		self.closed = True
+
+
+class PlayerPoolTest(unittest.TestCase):
+	def setUp(self):
+		self.pool = PlayerPool(_Player)
+
+	def test_switching_voices_reuses_the_players(self):
+		first = self.pool.get(16000)
+		self.pool.get(22050)
+		self.assertIs(self.pool.get(16000), first)
+		self.assertEqual((self.pool.opened, self.pool.reused), (2, 1))
+
+	def test_least_recently_used_player_is_closed(self):
+		first = self.pool.get(16000).player
+		second = self.pool.get(22050).player
+		self.pool.get(16000)
+		third = self.pool.get(8000).player
+		self.assertTrue(second.closed)
+		self.assertEqual(self.pool.players, [first, third])
+
+	def test_commands_reach_every_player(self):
+		players = [self.pool.get(rate).player for rate in (16000, 22050)]
+		self.pool.stop()
+		self.pool.pause(True)
+		self.assertEqual([(player.stopped, player.paused) for player in players], [(1, True), (1, True)])
+		self.pool.close()
+		self.assertTrue(all(player.closed for player in players))
+		self.assertEqual(self.pool.players, [])
+
+
+if __name__ == "__main__":
+	unittest.main()
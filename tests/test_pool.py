@@ -0,0 +1,84 @@
+# tests/test_pool.py
+# Engine instances synthesizing the next chunks in parallel
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import threading
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.engine import TTS_MEM_ALLOC_ERROR, TTS_NO_LICENSE, SimulatedBackend, render_pcm
+from _deltatalk.pcm import PCMBuffer
+from _deltatalk.pool import EnginePool, PoolJob
+
+TEXTS = [f"Trecho número {number} de um texto longo.".encode("cp1252") for number in range(8)]
+
+
+class EnginePoolTest(unittest.TestCase):
+	def setUp(self):
+		self.engine = SimulatedBackend(block_size=1024, max_instances=2)
+		self.pool = EnginePool(self.engine, 3)
+
+	def tearDown(self):
+		self.pool.close()
+
+	def test_license_limit_shrinks_the_pool(self):
+		self.assertEqual(len(self.pool), 2)
+		self.assertEqual(self.pool.failures, [TTS_NO_LICENSE])
+
+	def test_settings_already_applied_are_skipped(self):
+		self.pool.configure(0, 10, 10, 10)
+		self.pool.configure(0, 10, 10, 10)
+		self.assertEqual((self.engine.calls["set_voice"], self.engine.calls["set_mode"]), (2, 2))
+
+	def test_pcm_comes_in_the_order_of_the_texts(self):
+		expected = [bytes(render_pcm(self.engine, self.pool.instances[0], text, PCMBuffer())) for text in TEXTS]
+		self.assertEqual([bytes(audio) for audio in self.pool.render(TEXTS)], expected)
+
+	def test_failed_instance_is_retired_and_its_text_redone(self):
+		self.engine.fail("gen_audio_buffer", TTS_MEM_ALLOC_ERROR)
+		self.assertEqual(len(list(self.pool.render(TEXTS))), len(TEXTS))
+		self.assertEqual(len(self.pool), 1)
+		self.assertEqual(self.pool.failures, [TTS_NO_LICENSE, TTS_MEM_ALLOC_ERROR])
+
+
+class PoolJobTest(unittest.TestCase):
+	def test_error_of_the_last_worker_is_raised(self):
+		def render(worker, pcm, text):
+			raise ValueError(worker)
+
+		with self.assertRaises(ValueError):
+			list(PoolJob(render, ["a", "b"], TEXTS))
+
+	def test_cancel_ends_the_iteration(self):
+		release = threading.Event()
+
+		def render(worker, pcm, text):
+			release.wait(5.0)
+			return text
+
+		job = PoolJob(render, ["a"], TEXTS, lookahead=1)
+		job.cancel()
+		release.set()
+		self.assertEqual(list(job), [])
+		job.join(5.0)
+
+	def test_workers_stay_within_the_lookahead(self):
+		started = []
+
+		def render(worker, pcm, text):
+			started.append(text)
+			return text
+
+		job = PoolJob(render, ["a", "b"], TEXTS, lookahead=2)
+		iterator = iter(job)
+		next(iterator)
+		job.join(0.2)
+		self.assertLessEqual(len(started), 3)
+		self.assertEqual(list(iterator), TEXTS[1:])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,76 @@
+# tests/test_profiles.py
+# Output profiles, audio streamed in frames and the stream sink
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import io
+import threading
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.engine import SimulatedBackend
+from _deltatalk.profiles import ENCODINGS, PROFILES, bytes_per_second, frame_size, stream_frames
+from _deltatalk.sink import FrameSink
+
+TEXT = b"Texto longo o bastante para mais de um bloco de audio. " * 3
+
+
+class _Stream(io.BytesIO):
+	"""Keeps what was written after close."""
+
+	def close(self):
+		self.written = self.getvalue()
+		super().close()
+
+
+class StreamFramesTest(unittest.TestCase):
+	def test_frames_of_one_size_cover_the_audio(self):
+		for name in ("multimedia", "telephony-ulaw"):
+			with self.subTest(profile=name):
+				profile = PROFILES[name]
+				engine = SimulatedBackend(block_size=1000)
+				instance = engine.init(profile.dsp_mode)
+				audio_bytes = engine.audio_bytes(instance, TEXT, ENCODINGS[profile.encoding].pcm_format)
+				frames = list(stream_frames(engine, instance, TEXT, profile, 0))
+				size = frame_size(profile, 0)
+				self.assertEqual({len(frame) for frame in frames}, {size})
+				self.assertLess(len(frames) * size - audio_bytes, size)
+
+	def test_telephony_frames(self):
+		self.assertEqual(frame_size(PROFILES["telephony-ulaw"], 0), 160)
+		self.assertEqual(frame_size(PROFILES["telephony"], 1, frame_ms=10), 160)
+		self.assertEqual(bytes_per_second(PROFILES["multimedia"], 1), 44100)
+
+
+class FrameSinkTest(unittest.TestCase):
+	def setUp(self):
+		self.stream = _Stream()
+		self.sink = FrameSink(self.stream, bytes_per_second=1000000, frame_bytes=100, silence=b"\xff")
+
+	def close(self):
+		self.sink.close()
+		return self.stream.written
+
+	def test_audio_is_written_in_padded_frames(self):
+		done = threading.Event()
+		self.sink.feed(b"\x01" * 150)
+		self.sink.feed(b"", onDone=done.set)
+		self.sink.idle()
+		self.assertTrue(done.wait(5.0))
+		self.assertEqual(self.close(), b"\x01" * 150 + b"\xff" * 50)
+		self.assertEqual(self.sink.frames, 2)
+
+	def test_stop_drops_the_audio_and_its_callbacks(self):
+		self.sink.pause(True)
+		called = []
+		self.sink.feed(b"\x01" * 300, onDone=lambda: called.append(1))
+		self.sink.stop()
+		self.sink.pause(False)
+		self.sink.idle()
+		self.assertEqual((self.close(), called), (b"", []))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,96 @@
+# tests/test_prosody.py
+# Prosody tables, gain and WSOLA time stretching
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import array
+import math
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.prosody import DT_MAX, AudioEffects, EngineProsody, ProsodyMap, TimeStretcher, apply_gain
+from _deltatalk.resample import audioop
+
+SAMPLE_RATE = 11025
+
+
+def tone(seconds, frequency=220, amplitude=12000):
+	count = int(SAMPLE_RATE * seconds)
+	return array.array("h", (int(amplitude * math.sin(2 * math.pi * frequency * i / SAMPLE_RATE)) for i in range(count))).tobytes()
+
+
+class ProsodyMapTest(unittest.TestCase):
+	def test_engine_steps_without_effects(self):
+		prosody = ProsodyMap().lookup(50, 50, 50)
+		self.assertEqual(prosody, EngineProsody(10, 10, 10, 1.0, 1.0))
+
+	def test_values_are_clamped(self):
+		prosodies = ProsodyMap()
+		self.assertEqual(prosodies.lookup(-5, 150, 0), EngineProsody(1, 1, DT_MAX, 1.0, 1.0))
+
+	def test_gain_reaches_the_exact_volume(self):
+		prosody = ProsodyMap(effects=True).lookup(50, 50, 47)
+		self.assertEqual(prosody.volume, 10)
+		self.assertAlmostEqual(prosody.volume * prosody.gain, 47 * DT_MAX / 100)
+
+	def test_rate_boost_speeds_up_past_the_engine(self):
+		prosody = ProsodyMap(effects=True, rate_boost=True).lookup(100, 50, 100)
+		self.assertEqual(prosody.rate, DT_MAX)
+		self.assertEqual(prosody.tempo, 3.0)
+		self.assertEqual(ProsodyMap(rate_boost=True).lookup(100, 50, 100).tempo, 1.0)
+
+
+class ApplyGainTest(unittest.TestCase):
+	def test_unity_gain_returns_the_data(self):
+		data = tone(0.1)
+		self.assertIs(apply_gain(data, 1.0, use_audioop=False), data)
+
+	def test_fallback_scales_every_sample(self):
+		data = array.array("h", [0, 1000, -1000, 32767, -32768, 7]).tobytes()
+		self.assertEqual(array.array("h", apply_gain(data, 0.5, use_audioop=False)).tolist(), [0, 500, -500, 16383, -16384, 3])
+
+	@unittest.skipUnless(audioop, "audioop was removed in Python 3.13")
+	def test_fallback_matches_audioop(self):
+		data = tone(0.2)
+		fallback = array.array("h", apply_gain(data, 0.37, use_audioop=False))
+		native = array.array("h", apply_gain(data, 0.37))
+		self.assertLessEqual(max(abs(a - b) for a, b in zip(fallback, native)), 1)
+
+
+class TimeStretcherTest(unittest.TestCase):
+	def stretch(self, data, tempo, use_audioop, block=2048):
+		stretcher = TimeStretcher(SAMPLE_RATE, tempo, use_audioop)
+		output = b"".join(stretcher.process(data[i:i + block]) for i in range(0, len(data), block))
+		return output + stretcher.flush()
+
+	def test_output_is_shortened_by_the_tempo(self):
+		data = tone(1.0)
+		for use_audioop in (False, bool(audioop)):
+			with self.subTest(use_audioop=use_audioop):
+				output = self.stretch(data, 2.0, use_audioop)
+				self.assertAlmostEqual(len(output) / len(data), 0.5, delta=0.05)
+
+	def test_flush_resets_the_stream(self):
+		stretcher = TimeStretcher(SAMPLE_RATE, 1.5, use_audioop=False)
+		stretcher.process(tone(0.3))
+		stretcher.flush()
+		self.assertEqual(stretcher.flush(), b"")
+
+
+class AudioEffectsTest(unittest.TestCase):
+	def test_needed(self):
+		self.assertFalse(AudioEffects.needed(EngineProsody(10, 10, 10, 1.0, 1.0)))
+		self.assertTrue(AudioEffects.needed(EngineProsody(10, 10, 10, 0.9, 1.0)))
+		self.assertTrue(AudioEffects.needed(EngineProsody(20, 10, 10, 1.0, 1.5)))
+
+	def test_gain_only_keeps_the_length(self):
+		effects = AudioEffects(SAMPLE_RATE, EngineProsody(10, 10, 10, 0.5, 1.0), use_audioop=False)
+		data = tone(0.1)
+		self.assertEqual(len(effects.process(data)), len(data))
+		self.assertEqual(effects.flush(), b"")
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,44 @@
+# tests/test_resample.py
+# Sample rate conversion between the voices and the player
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import array
+import math
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.resample import Resampler, audioop
+
+
+def tone(sample_rate, count, frequency=440):
+	return array.array("h", (int(10000 * math.sin(2 * math.pi * frequency * i / sample_rate)) for i in range(count)))
+
+
+class ResamplerTest(unittest.TestCase):
+	def convert(self, resampler, data, block=3200):
+		return array.array("h", b"".join(resampler.convert(data[i:i + block]) for i in range(0, len(data), block)))
+
+	def test_length_follows_the_rates(self):
+		data = tone(16000, 16000).tobytes()
+		for use_audioop in (False, bool(audioop)):
+			with self.subTest(use_audioop=use_audioop):
+				self.assertAlmostEqual(len(self.convert(Resampler(16000, 22050, use_audioop), data)), 22050, delta=2)
+				self.assertAlmostEqual(len(self.convert(Resampler(22050, 16000, use_audioop), data)), 11610, delta=2)
+
+	def test_blocks_join_without_clicks(self):
+		data = tone(16000, 8000).tobytes()
+		whole = array.array("h", Resampler(16000, 22050, use_audioop=False).convert(data))
+		blocks = self.convert(Resampler(16000, 22050, use_audioop=False), data, block=998)
+		self.assertAlmostEqual(len(blocks), len(whole), delta=1)
+		self.assertLessEqual(max(abs(a - b) for a, b in zip(blocks, whole)), 1)
+		self.assertLess(max(abs(a - b) for a, b in zip(blocks, blocks[1:])), 2000)
+
+	def test_empty_block(self):
+		self.assertEqual(Resampler(16000, 22050, use_audioop=False).convert(b""), b"")
+
+
+if __name__ == "__main__":
+	unittest.main()
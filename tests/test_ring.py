@@ -0,0 +1,48 @@
+# tests/test_ring.py
+# The ring of PCM buffers between synthesis and playback
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import threading
+import time
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.ring import PCMRing
+
+
+class PCMRingTest(unittest.TestCase):
+	def setUp(self):
+		self.ring = PCMRing(2, size=64)
+
+	def acquire_in_thread(self):
+		results = []
+		thread = threading.Thread(target=lambda: results.append(self.ring.acquire()))
+		thread.start()
+		return thread, results
+
+	def test_full_ring_waits_for_a_release(self):
+		first = self.ring.acquire()
+		self.ring.acquire()
+		thread, results = self.acquire_in_thread()
+		time.sleep(0.05)
+		self.assertEqual(results, [])
+		self.ring.release(first)
+		thread.join(5.0)
+		self.assertIs(results[0], first)
+		self.assertEqual((self.ring.in_use(), self.ring.full_waits, self.ring.max_in_use), (2, 1, 2))
+
+	def test_reset_wakes_the_producer(self):
+		self.ring.acquire()
+		self.ring.acquire()
+		thread, results = self.acquire_in_thread()
+		time.sleep(0.05)
+		self.ring.reset()
+		thread.join(5.0)
+		self.assertEqual(results, [None])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,67 @@
+# tests/test_scheduler.py
+# Ordering, bounds and closing of the speech scheduler
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import queue
+import threading
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.scheduler import PRIORITY_BACKGROUND, PRIORITY_FOCUS, PRIORITY_SAY_ALL, SpeechScheduler
+
+
+class SpeechSchedulerTest(unittest.TestCase):
+	def setUp(self):
+		self.scheduler = SpeechScheduler()
+
+	def drain(self):
+		items = []
+		while not self.scheduler.empty():
+			items.append(self.scheduler.get(timeout=0))
+		return items
+
+	def test_focus_preempts(self):
+		self.scheduler.put("line 1", PRIORITY_SAY_ALL)
+		self.scheduler.put("notification", PRIORITY_BACKGROUND)
+		self.scheduler.put("button", PRIORITY_FOCUS)
+		self.assertEqual(self.drain(), ["button", "line 1", "notification"])
+
+	def test_background_keeps_its_place_in_say_all(self):
+		self.scheduler.put("line 1", PRIORITY_SAY_ALL)
+		self.scheduler.put("notification", PRIORITY_BACKGROUND)
+		self.scheduler.put("line 2", PRIORITY_SAY_ALL)
+		self.assertEqual(self.drain(), ["line 1", "notification", "line 2"])
+
+	def test_full_class_drops_its_oldest_item(self):
+		scheduler = self.scheduler = SpeechScheduler({PRIORITY_FOCUS: 2, PRIORITY_SAY_ALL: 2, PRIORITY_BACKGROUND: 2})
+		scheduler.put("line 1", PRIORITY_SAY_ALL)
+		self.assertIsNone(scheduler.put("a", PRIORITY_BACKGROUND))
+		scheduler.put("b", PRIORITY_BACKGROUND)
+		self.assertEqual(scheduler.put("c", PRIORITY_BACKGROUND), "a")
+		self.assertEqual(self.drain(), ["line 1", "b", "c"])
+		self.assertEqual(scheduler.stats()["background"]["dropped"], 1)
+
+	def test_clear_returns_the_items_in_speaking_order(self):
+		self.scheduler.put("line 1", PRIORITY_SAY_ALL)
+		self.scheduler.put("notification", PRIORITY_BACKGROUND)
+		self.scheduler.put("button", PRIORITY_FOCUS)
+		self.scheduler.put("line 2", PRIORITY_SAY_ALL)
+		self.assertEqual(self.scheduler.clear(), ["button", "line 1", "notification", "line 2"])
+		self.assertTrue(self.scheduler.empty())
+
+	def test_get_times_out_and_close_wakes_it(self):
+		with self.assertRaises(queue.Empty):
+			self.scheduler.get(timeout=0.01)
+		results = []
+		waiter = threading.Thread(target=lambda: results.append(self.scheduler.get()))
+		waiter.start()
+		self.scheduler.close()
+		waiter.join(5.0)
+		self.assertEqual(results, [None])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,63 @@
+# tests/test_sequence.py
+# Compiling speech sequences into segments of one prosody
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.sequence import Prosody, Segment, compile_sequence
+
+
+# The attributes of the NVDA commands, which is all compile_sequence looks at
+class Index:
+	def __init__(self, index):
+		self.index = index
+
+
+class Pitch:
+	settingName = "pitch"
+
+	def __init__(self, offset=0, multiplier=1):
+		self.offset = offset
+		self.multiplier = multiplier
+
+
+class CharacterMode:
+	def __init__(self, state):
+		self.state = state
+
+
+BASE = Prosody(50, 50, 100)
+
+
+class CompileSequenceTest(unittest.TestCase):
+	def test_strings_are_joined_between_indexes(self):
+		self.assertEqual(compile_sequence(["Olá", "  ", "mundo", Index(1), "fim", Index(2)], BASE), [
+			Segment("Olá mundo", None, BASE),
+			Segment("fim", 1, BASE),
+			Segment(None, 2, BASE),
+		])
+
+	def test_prosody_is_relative_to_the_base(self):
+		segments = compile_sequence(["a", Pitch(offset=20), "b", Pitch(offset=30), "c", Pitch(), "d"], BASE)
+		self.assertEqual([(segment.text, segment.prosody.pitch) for segment in segments], [
+			("a", 50), ("b", 70), ("c", 80), ("d", 50),
+		])
+
+	def test_values_are_clamped(self):
+		segments = compile_sequence([Pitch(multiplier=3), "alto"], BASE)
+		self.assertEqual(segments[0].prosody.pitch, 100)
+
+	def test_unchanged_prosody_keeps_one_segment(self):
+		self.assertEqual(len(compile_sequence(["a", Pitch(offset=0), "b"], BASE)), 1)
+
+	def test_spelled_characters_are_one_request(self):
+		segments = compile_sequence([CharacterMode(True), "a", "b c", CharacterMode(False), "casa"], BASE)
+		self.assertEqual([segment.text for segment in segments], ["a, b, c casa"])
+
+
+if __name__ == "__main__":
+	unittest.main()
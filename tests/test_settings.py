@@ -0,0 +1,51 @@
+# tests/test_settings.py
+# Lazy TTSENG_SetMode and TTSENG_SetVoice calls of EngineSettings
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.engine import DSP_MODES, TTS_BUSY, TTS_SUCCESSFUL, SimulatedBackend
+from _deltatalk.settings import EngineSettings
+
+
+class EngineSettingsTest(unittest.TestCase):
+	def setUp(self):
+		self.engine = SimulatedBackend()
+		self.settings = EngineSettings(self.engine, self.engine.init(DSP_MODES["MULTIMEDIA"]))
+
+	def test_changes_in_a_row_cost_one_call(self):
+		for rate in (5, 6, 7):
+			self.settings.set_mode(rate, 10, 10)
+		self.assertEqual(self.settings.apply(), TTS_SUCCESSFUL)
+		self.assertEqual(self.engine.calls["set_mode"], 1)
+		self.assertEqual((self.settings.requests, self.settings.calls, self.settings.avoided), (3, 1, 2))
+
+	def test_values_in_effect_cost_nothing(self):
+		self.settings.set_mode(10, 10, 10)
+		self.settings.set_voice(0)
+		self.settings.apply()
+		self.settings.set_mode(12, 10, 10)
+		self.settings.set_mode(10, 10, 10)
+		self.settings.set_voice(0)
+		self.settings.apply()
+		self.settings.apply()
+		self.assertEqual((self.engine.calls["set_mode"], self.engine.calls["set_voice"]), (1, 1))
+
+	def test_failed_values_are_applied_again(self):
+		self.engine.fail("set_mode", TTS_BUSY)
+		self.settings.set_mode(10, 10, 10)
+		self.assertEqual(self.settings.apply(), TTS_BUSY)
+		self.assertEqual(self.settings.apply(), TTS_SUCCESSFUL)
+		self.assertEqual(self.engine.calls["set_mode"], 2)
+
+	def test_nothing_requested(self):
+		self.assertEqual(self.settings.apply(), TTS_SUCCESSFUL)
+		self.assertEqual(self.settings.calls, 0)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,73 @@
+# tests/test_warmup.py
+# Label usage counts and pre-rendering them while speech is idle
+# A part of the deltaTalkTTS driver for NVDA (Non Visual Desktop Access)
+# Copyright (C) 2024-2025 Patrick Barboza <patrickbarboza774@gmail.com> & Wendrill Aksenow Brandão <wendrillaksenow@gmail.com>
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import os
+import tempfile
+import threading
+import unittest
+
+import support  # noqa: F401, makes _deltatalk importable
+from _deltatalk.warmup import CACHED, MAX_ATTEMPTS, REFUSED, RENDERED, UsageCounts, WarmUp
+
+LABELS = ("botão", "caixa de seleção", "link")
+
+
+class UsageCountsTest(unittest.TestCase):
+	def test_counts_survive_a_restart(self):
+		with tempfile.TemporaryDirectory() as folder:
+			path = os.path.join(folder, "deltaTalk", "usage.json")
+			usage = UsageCounts(path, LABELS)
+			usage.record(["link", "link", "botão", "fora do vocabulário"])
+			usage.save()
+			usage = UsageCounts(path, LABELS)
+			self.assertEqual(usage.ranked(), ["link", "botão", "caixa de seleção"])
+			self.assertEqual(usage.count("fora do vocabulário"), 0)
+
+	def test_damaged_file_starts_empty(self):
+		with tempfile.TemporaryDirectory() as folder:
+			path = os.path.join(folder, "usage.json")
+			with open(path, "w", encoding="utf-8") as f:
+				f.write("[1, 2")
+			self.assertEqual(UsageCounts(path, LABELS).ranked(), sorted(LABELS))
+
+
+class WarmUpTest(unittest.TestCase):
+	def run_warm_up(self, render, texts=LABELS):
+		finished = threading.Event()
+		warm_up = WarmUp(texts, render, lambda: False, finished.set, quiet_seconds=0.01)
+		warm_up.start()
+		self.assertTrue(finished.wait(5.0))
+		return warm_up
+
+	def test_every_text_is_covered(self):
+		results = {"botão": RENDERED, "caixa de seleção": CACHED, "link": RENDERED}
+		warm_up = self.run_warm_up(results.get)
+		self.assertEqual(sorted(warm_up.covered), sorted(LABELS))
+		self.assertEqual(warm_up.rendered, 2)
+
+	def test_refused_text_is_tried_again_then_given_up(self):
+		attempts = []
+
+		def render(text):
+			attempts.append(text)
+			return REFUSED if text == "link" else RENDERED
+
+		warm_up = self.run_warm_up(render)
+		self.assertEqual(attempts.count("link"), MAX_ATTEMPTS)
+		self.assertEqual(warm_up.failed, ["link"])
+		self.assertEqual(warm_up.coverage(UsageCounts(os.devnull, LABELS))["labels"], 2)
+
+	def test_stop_while_speech_is_busy(self):
+		warm_up = WarmUp(LABELS, lambda text: RENDERED, lambda: True, quiet_seconds=0.01)
+		warm_up.start()
+		warm_up.stop(5.0)
+		self.assertTrue(warm_up.finished)
+		self.assertEqual(warm_up.covered, [])
+
+
+if __name__ == "__main__":
+	unittest.main()